@@ -0,0 +1,119 @@
+"""
+Import-time benchmark for the dashboard entry points.
+
+Collects the module-level imports of each dashboard script (following local
+modules such as `pages/` and `feb_analytics/`) and times importing them in a
+fresh interpreter, which is what a Streamlit worker pays on cold start. With
+`--rev` the same measurement is made for the sources at another git revision,
+so the effect of a change on start-up time and memory can be compared.
+
+Usage:
+    python benchmarks/import_time.py [--rev BASELINE_REV] [--repeat N]
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Dashboard entry points and the directories their local imports resolve against
+ENTRY_POINTS = {
+    'test_3 dashboard': ('test_3/dashboard/app.py', ['test_3/dashboard', '.']),
+    'test_4 app': ('test_4/app.py', ['test_4', '.']),
+}
+
+_TIMER = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec({statements!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                  'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'modules': len(sys.modules)}}))
+"""
+
+
+def _read(path, rev):
+    if rev is None:
+        full = os.path.join(ROOT_DIR, path)
+        if not os.path.exists(full):
+            return None
+        with open(full) as f:
+            return f.read()
+    result = subprocess.run(['git', 'show', f'{rev}:{path}'], cwd=ROOT_DIR,
+                            capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+def _local_path(name, search_dirs, rev):
+    """Repo path of a local module, or None for third-party modules."""
+    parts = name.split('.')
+    for base in search_dirs:
+        for candidate in (os.path.join(*parts) + '.py', os.path.join(*parts, '__init__.py')):
+            path = os.path.normpath(os.path.join(base, candidate))
+            if _read(path, rev) is not None:
+                return path
+    return None
+
+
+def module_level_imports(entry, search_dirs, rev=None):
+    """Third-party import statements run at module level by `entry` and the local modules it imports."""
+    external, seen, queue = [], set(), [entry]
+    while queue:
+        path = queue.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        source = _read(path, rev)
+        if source is None:
+            continue
+        for node in ast.parse(source).body:
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                # `from pkg import mod` may import local submodules as well
+                names = [node.module] + [f'{node.module}.{alias.name}' for alias in node.names]
+            else:
+                continue
+            local = [_local_path(name, search_dirs, rev) for name in names]
+            if any(local):
+                queue.extend(path for path in local if path)
+            elif ast.unparse(node) not in external:
+                external.append(ast.unparse(node))
+    return external
+
+
+def time_imports(statements, repeat=5):
+    """Median import time (s), peak RSS (MB) and module count over `repeat` fresh interpreters."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _TIMER.format(statements='\n'.join(statements))],
+                             capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out))
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rev', help='git revision to compare against (e.g. HEAD~1)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entry point':<18} {'revision':<12} {'import s':>9} {'RSS MB':>8} {'modules':>8}  heavy imports")
+    for label, (entry, search_dirs) in ENTRY_POINTS.items():
+        for rev in ([args.rev] if args.rev else []) + [None]:
+            statements = module_level_imports(entry, search_dirs, rev)
+            stats = time_imports(statements, args.repeat)
+            heavy = [s.split()[1] for s in statements if s.split()[1].split('.')[0] in
+                     ('sklearn', 'scipy', 'seaborn', 'matplotlib', 'PIL', 'statsmodels')]
+            print(f"{label:<18} {rev or 'working tree':<12} {stats['seconds']:>9.2f} "
+                  f"{stats['max_rss_mb']:>8.0f} {stats['modules']:>8.0f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Scaling benchmark for the analytics functions of every prototype.
+
+The bundled datasets (a few hundred to a few thousand rows) hide quadratic
+paths, so each function is timed on synthetic data at 1x, 10x, 100x and
+1000x the size of the simulator output:
+
+    test_1  fusionar_datos_con_acciones, detectar_combinaciones
+            (bundled session repeated back-to-back in time)
+    test_2  spacing_per_frame, voronoi_areas
+            (simulate_data.build_positions repeated over consecutive frames)
+    test_3  generate_biometrics (simulate_possession with more players),
+            integrate_datasets (generate_biometrics output repeated in time)
+    test_3 / test_4  dashboard load_data: load_features on the integrated
+            dataset, with a cold and a warm feature store
+
+Every case reports the best wall time of `--repeat` runs and the peak Python
+heap of one extra run under tracemalloc. A scale is skipped when the time
+extrapolated from the previous scales exceeds `--budget` seconds, so
+quadratic functions stop early instead of running for hours.
+
+Results are compared against the stored baseline (benchmarks/baseline.json);
+`--save` replaces it and `--check` exits non-zero on a regression.
+
+Usage:
+    python benchmarks/scaling.py [--scales 1 10 100 1000] [--only NAME ...]
+                                 [--budget 60] [--repeat 3] [--save | --check]
+"""
+
+import argparse
+import ast
+import gc
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+BASELINE_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_SCALES = (1, 10, 100, 1000)
+
+# Slowdown (time or peak memory) over the baseline reported as a regression
+REGRESSION_RATIO = 1.25
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 1.0
+
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, 'test_1'), os.path.join(ROOT_DIR, 'test_2', 'src'),
+             os.path.join(ROOT_DIR, 'test_3', 'simulation'), os.path.join(ROOT_DIR, 'test_3', 'analysis')):
+    if path not in sys.path:
+        sys.path.append(path)
+
+
+def _repeat_in_time(df, copies, time_cols, period):
+    """Concatenates `copies` of `df` with `time_cols` shifted by `period` per copy."""
+    if copies == 1:
+        return df.copy()
+    out = pd.concat([df] * copies, ignore_index=True)
+    offset = np.repeat(np.arange(copies), len(df)) * period
+    for col in time_cols:
+        out[col] = out[col] + offset.astype(out[col].dtype)
+    return out
+
+
+def _dashboard_steps():
+    """DASHBOARD_STEPS of test_4/pages, read without importing the test_4 pages."""
+    with open(os.path.join(ROOT_DIR, 'test_4', 'pages', '__init__.py')) as f:
+        for node in ast.parse(f.read()).body:
+            if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'DASHBOARD_STEPS' for t in node.targets):
+                return ast.literal_eval(node.value)
+    return None
+
+
+class Datasets:
+    """Synthetic inputs per scale, built once from the simulators and cached."""
+
+    def __init__(self, workdir):
+        self.workdir = workdir
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    # --- test_1 -----------------------------------------------------------
+    def test_1(self, scale):
+        def build():
+            from scripts.load_data import cargar_datos_fisicos, cargar_etiquetas_tacticas
+            data_dir = os.path.join(ROOT_DIR, 'test_1', 'data')
+            fisicos = cargar_datos_fisicos(os.path.join(data_dir, 'datos_fisicos_realistas.csv'))
+            etiquetas = cargar_etiquetas_tacticas(os.path.join(data_dir, 'etiquetas_tacticas_realistas.csv'))
+            period = int(fisicos['tiempo'].max()) + 1
+            return (_repeat_in_time(fisicos, scale, ['tiempo'], period),
+                    _repeat_in_time(etiquetas, scale, ['inicio', 'fin'], period))
+        return self._get(('test_1', scale), build)
+
+    # --- test_2 -----------------------------------------------------------
+    def test_2(self, scale):
+        def build():
+            import simulate_data
+            positions = simulate_data.build_positions()
+            frames = int(positions['frame'].max()) + 1
+            return _repeat_in_time(positions, scale, ['frame'], frames)
+        return self._get(('test_2', scale), build)
+
+    # --- test_3 -----------------------------------------------------------
+    def possession(self, scale):
+        def build():
+            from possession_simulator import simulate_possession
+            possession = simulate_possession()
+            if scale == 1:
+                return possession
+            # generate_biometrics covers a fixed 24 s per player: scale the squad
+            copies = [possession.assign(player=possession['player'] + (f'_{k}' if k else ''))
+                      for k in range(scale)]
+            return pd.concat(copies, ignore_index=True)
+        return self._get(('possession', scale), build)
+
+    def biometrics_csv(self, scale):
+        def build():
+            from biometric_simulator import generate_biometrics
+            from possession_simulator import simulate_possession
+            base = self._get('biometrics', lambda: generate_biometrics(simulate_possession()))
+            period = float(base['time'].max()) + 0.5
+            path = os.path.join(self.workdir, f'biometric_data_{scale}x.csv')
+            _repeat_in_time(base, scale, ['time'], period).to_csv(path, index=False, float_format='%.2f')
+            return path
+        return self._get(('biometrics_csv', scale), build)
+
+    def integrated_csv(self, scale):
+        def build():
+            from data_integration import integrate_datasets
+            path = os.path.join(self.workdir, f'integrated_dataset_{scale}x.csv')
+            integrate_datasets(self.biometrics_csv(scale), os.path.join(self.workdir, f'integrated_{scale}x'),
+                               csv_path=path)
+            return path
+        return self._get(('integrated_csv', scale), build)
+
+
+def _load_data_case(steps, warm):
+    """Body of a dashboard `load_data` (load_features) with a cold or warm feature store."""
+    def setup(data, scale):
+        path = data.integrated_csv(scale)
+        store_dir = os.path.join(data.workdir, f'store_{scale}x_{"all" if steps is None else len(steps)}')
+        if warm:
+            from feb_analytics.feature_store import load_features
+            load_features(path, steps=steps, store_dir=store_dir)
+        return path, store_dir
+
+    def run(args):
+        from feb_analytics.feature_store import load_features
+        path, store_dir = args
+        if not warm:
+            shutil.rmtree(store_dir, ignore_errors=True)
+        return load_features(path, steps=steps, store_dir=store_dir)
+    return setup, run
+
+
+def _cases():
+    """Benchmark name -> (setup(datasets, scale) -> args, run(args))."""
+    def fusionar(args):
+        from scripts.merge_datasets import fusionar_datos_con_acciones
+        return fusionar_datos_con_acciones(*args)
+
+    def combinaciones(args):
+        from scripts.analytics import detectar_combinaciones
+        return detectar_combinaciones(args[1])
+
+    def spacing(positions):
+        from tactical_metrics import spacing_per_frame
+        return spacing_per_frame(positions)
+
+    def voronoi(positions):
+        from tactical_metrics import voronoi_areas
+        return voronoi_areas(positions)
+
+    def biometrics(possession):
+        from biometric_simulator import generate_biometrics
+        return generate_biometrics(possession)
+
+    def integrate(args):
+        from data_integration import integrate_datasets
+        source, output_dir, csv_path = args
+        return integrate_datasets(source, output_dir, csv_path=csv_path)
+
+    def integrate_setup(data, scale):
+        return (data.biometrics_csv(scale), os.path.join(data.workdir, f'bench_integrated_{scale}x'),
+                os.path.join(data.workdir, f'bench_integrated_{scale}x.csv'))
+
+    dashboard_steps = _dashboard_steps()
+    return {
+        'test_1.fusionar_datos_con_acciones': (lambda data, scale: data.test_1(scale), fusionar),
+        'test_1.detectar_combinaciones': (lambda data, scale: data.test_1(scale), combinaciones),
+        'test_2.spacing_per_frame': (lambda data, scale: data.test_2(scale), spacing),
+        'test_2.voronoi_areas': (lambda data, scale: data.test_2(scale), voronoi),
+        'test_3.generate_biometrics': (lambda data, scale: data.possession(scale), biometrics),
+        'test_3.integrate_datasets': (integrate_setup, integrate),
+        'test_3.load_data (cold store)': _load_data_case(None, warm=False),
+        'test_3.load_data (warm store)': _load_data_case(None, warm=True),
+        'test_4.load_data (cold store)': _load_data_case(dashboard_steps, warm=False),
+        'test_4.load_data (warm store)': _load_data_case(dashboard_steps, warm=True),
+    }
+
+
+def _rows(args):
+    """Input rows of a case, for the report."""
+    if isinstance(args, pd.DataFrame):
+        return len(args)
+    if isinstance(args, tuple) and args and isinstance(args[0], pd.DataFrame):
+        return sum(len(arg) for arg in args if isinstance(arg, pd.DataFrame))
+    path = args[0] if isinstance(args, tuple) else args
+    if isinstance(path, str) and path.endswith('.csv'):
+        with open(path) as f:
+            return sum(1 for _ in f) - 1
+    return None
+
+
+def measure(run, args, repeat):
+    """Best wall time (s) over `repeat` runs and the tracemalloc peak (MB) of one more."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(args)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 2 ** 20
+
+
+def _predict(points, scale):
+    """Extrapolates the time at `scale` from the last two (scale, seconds) points."""
+    if not points:
+        return 0.0
+    (s1, t1) = points[-1]
+    exponent = 1.0
+    if len(points) > 1:
+        (s0, t0) = points[-2]
+        if t0 > 0 and t1 > 0:
+            exponent = max(1.0, math.log(t1 / t0) / math.log(s1 / s0))
+    return t1 * (scale / s1) ** exponent
+
+
+def run_benchmarks(scales, only=None, budget=60.0, repeat=3, log=print):
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='feb_bench_')
+    try:
+        data = Datasets(workdir)
+        for name, (setup, run) in _cases().items():
+            if only and not any(key in name for key in only):
+                continue
+            points = []
+            for scale in scales:
+                predicted = _predict(points, scale) * (repeat + 1)
+                key = f'{name} @ {scale}x'
+                if predicted > budget:
+                    log(f"{key:<48} skipped (~{predicted:.0f} s predicted > {budget:.0f} s budget)")
+                    results[key] = {'name': name, 'scale': scale, 'skipped': True}
+                    continue
+                args = setup(data, scale)
+                seconds, peak_mb = measure(run, args, repeat)
+                points.append((scale, seconds))
+                rows = _rows(args)
+                results[key] = {'name': name, 'scale': scale, 'rows': rows,
+                                'seconds': seconds, 'peak_mb': peak_mb}
+                log(f"{key:<48} {rows or '-':>10} rows {seconds:>10.4f} s {peak_mb:>9.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline):
+    """Cases slower or heavier than the baseline by more than REGRESSION_RATIO."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous or current.get('skipped') or previous.get('skipped'):
+            continue
+        for metric, floor in (('seconds', MIN_SECONDS), ('peak_mb', MIN_PEAK_MB)):
+            if (current[metric] > previous[metric] * REGRESSION_RATIO
+                    and current[metric] - previous[metric] > floor):
+                regressions.append(f"{key}: {metric} {previous[metric]:.3f} -> {current[metric]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES))
+    parser.add_argument('--only', nargs='+', help='run only cases whose name contains one of these')
+    parser.add_argument('--budget', type=float, default=60.0, help='max predicted seconds per case and scale')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    group.add_argument('--check', action='store_true', help='exit with status 1 on regressions')
+    args = parser.parse_args()
+
+    results = run_benchmarks(sorted(args.scales), args.only, args.budget, args.repeat)
+
+    if args.save:
+        payload = {'machine': platform.platform(), 'python': platform.python_version(),
+                   'pandas': pd.__version__, 'numpy': np.__version__, 'results': results}
+        with open(args.baseline, 'w') as f:
+            json.dump(payload, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet; run with --save to store one.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline)
+    print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+    for line in regressions:
+        print(f"  {line}")
+    if regressions and args.check:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Shared analytics building blocks used by the test_1, test_3 and test_4 apps."""
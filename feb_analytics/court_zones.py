@@ -0,0 +1,214 @@
+"""
+Rasterized court-zone lookup shared by the integration stage and dashboards.
+
+Every zoning scheme is evaluated once on a fine grid covering the FIBA court
+(28m x 15m). Classifying a point is then a single integer index gather into
+that raster instead of a cascade of boolean masks per row.
+
+Each cell holds the label of its center and a flag telling whether any of
+its corners has another label. Points in uniform cells take the raster
+label; points in boundary cells (a strict `>` bound running along a grid
+line included) and points outside the court are classified with the exact
+rule, so results match the rules everywhere. Only a region thinner than a
+cell that touches neither its corners nor its center could be missed.
+
+Usage (parity of every scheme against its exact rule):
+    python -m feb_analytics.court_zones [--points 1000000]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+COURT_LENGTH = 28.0  # m
+COURT_WIDTH = 15.0   # m
+RESOLUTION = 0.05    # m (5 cm)
+
+_SCHEMES = {}
+
+
+def register_zone_scheme(name, rule, default, resolution=RESOLUTION):
+    """
+    Registers a zoning scheme.
+
+    Args:
+        name: Scheme identifier used by `classify_zones`.
+        rule: Callable taking court coordinate arrays (x, y) and returning
+            a list of (condition mask, label) pairs, evaluated like np.select.
+        default: Label for cells that match no condition.
+        resolution: Raster cell size in meters.
+    """
+    _SCHEMES[name] = {'rule': rule, 'default': default, 'resolution': resolution, 'raster': None}
+
+
+def _evaluate(scheme, x, y):
+    # Exact zone codes of the rule (np.select semantics)
+    pairs = scheme['rule'](x, y)
+    labels = scheme['labels']
+    return np.select(
+        [cond for cond, _ in pairs],
+        [labels.index(label) for _, label in pairs],
+        default=labels.index(scheme['default'])
+    ).astype(np.uint8)
+
+
+def _build_raster(scheme):
+    res = scheme['resolution']
+    nx = int(round(COURT_LENGTH / res))
+    ny = int(round(COURT_WIDTH / res))
+    labels = []
+    for _, label in scheme['rule'](np.zeros(1), np.zeros(1)):
+        if label not in labels:
+            labels.append(label)
+    if scheme['default'] not in labels:
+        labels.append(scheme['default'])
+    scheme['labels'] = labels
+
+    # Round the coordinates so grid-aligned thresholds compare exactly
+    corners = _evaluate(scheme, *np.meshgrid(np.round(np.arange(nx + 1) * res, 9),
+                                             np.round(np.arange(ny + 1) * res, 9), indexing='ij'))
+    centers = _evaluate(scheme, *np.meshgrid(np.round((np.arange(nx) + 0.5) * res, 9),
+                                             np.round((np.arange(ny) + 0.5) * res, 9), indexing='ij'))
+    mixed = np.zeros(centers.shape, dtype=bool)
+    for dx in (0, 1):
+        for dy in (0, 1):
+            mixed |= corners[dx:dx + nx, dy:dy + ny] != centers
+    scheme['raster'] = centers
+    scheme['mixed'] = mixed
+    return scheme
+
+
+def _get_scheme(name):
+    if name not in _SCHEMES:
+        raise KeyError(f"Unknown zone scheme '{name}'. Registered: {sorted(_SCHEMES)}")
+    scheme = _SCHEMES[name]
+    if scheme['raster'] is None:
+        _build_raster(scheme)
+    return scheme
+
+
+def zone_labels(scheme):
+    """Returns the zone-code table of a scheme (code -> label)."""
+    return list(_get_scheme(scheme)['labels'])
+
+
+def zone_codes(x, y, scheme):
+    """Returns the integer zone code of every (x, y) point."""
+    s = _get_scheme(scheme)
+    res = s['resolution']
+    raster = s['raster']
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        ix = np.clip(np.floor(x / res), 0, raster.shape[0] - 1).astype(np.int64)
+        iy = np.clip(np.floor(y / res), 0, raster.shape[1] - 1).astype(np.int64)
+    codes = raster[ix, iy]
+    # Boundary cells and points off the court (or NaN) follow the exact rule
+    exact = s['mixed'][ix, iy] | ~((x >= 0) & (x <= COURT_LENGTH) & (y >= 0) & (y <= COURT_WIDTH))
+    if exact.any():
+        codes[exact] = _evaluate(s, x[exact], y[exact])
+    return codes
+
+
+def classify_zones(x, y, scheme):
+    """Classifies (x, y) points into zones, returned as a pandas Categorical."""
+    return pd.Categorical.from_codes(zone_codes(x, y, scheme), categories=zone_labels(scheme))
+
+
+# --- Registered schemes ---
+
+def _tactical_zones(x, y):
+    # Court zone definitions used by the integration stage:
+    # 1. Backcourt: Offensive half (x < 14m)
+    # 2. Frontcourt: Defensive half (x >= 14m)
+    # 3. Paint/Key: The rectangular area near the basket
+    # 4. Perimeter: Areas beyond the paint but inside three-point line
+    # 5. Corners: The corner three-point areas
+    # 6. Top of Key: Area around the top of the three-point arc
+    # 7. Wings: Areas along the sides of the court
+    # 8. Dunker Spot: Specific low post positions
+    #
+    # FIBA court dimensions reference:
+    # - Paint: 4.9m wide (from y=5.3 to y=9.7 at center y=7.5)
+    # - Three-point line: 6.75m from basket at top, 6.6m in corners
+    # - Basket located at (28, 7.5)
+    return [
+        ((x < 14), 'backcourt'),
+        ((x >= 22) & (x <= 28) & (y >= 5.3) & (y <= 9.7), 'paint'),
+        ((x >= 22) & (y < 5.3), 'left_corner'),
+        ((x >= 22) & (y > 9.7), 'right_corner'),
+        ((x >= 18) & (x < 22) & (y >= 6.0) & (y <= 9.0), 'top_key'),
+        ((x >= 14) & (x < 22) & (y < 7.5) & (y >= 3.0), 'left_wing'),
+        ((x >= 14) & (x < 22) & (y > 7.5) & (y <= 12.0), 'right_wing'),
+        ((x >= 25) & (x <= 28) & (y >= 3.0) & (y < 5.3), 'dunker_left'),
+        ((x >= 25) & (x <= 28) & (y > 9.7) & (y <= 12.0), 'dunker_right'),
+        ((x >= 20) & (x < 22) & (y >= 5.3) & (y <= 9.7), 'high_post'),
+        ((x >= 14) & (x < 18) & (y >= 5.0) & (y <= 10.0), 'mid_range'),
+    ]
+
+
+def _shot_zones(x, y):
+    # Shot zones used by the dashboards for success probabilities
+    return [
+        ((x >= 25) & (y >= 5) & (y <= 10), 'Paint'),
+        ((x >= 22) & ((y < 5) | (y > 10)), 'Mid-Range'),
+        ((x < 22), 'Three-Pointer'),
+    ]
+
+
+def _gps_zones(x, y):
+    # Simplified GPS zones of the test_1 tactical map (Spanish labels)
+    central = (x > 10) & (x < 18)
+    return [
+        ((x < 6), 'esquina izquierda'),
+        ((x > 22), 'esquina derecha'),
+        (central & (y < 5), 'zona'),
+        (central & (y > 10), 'zona'),
+        (central & (y >= 5) & (y <= 10), 'zona central'),
+        ((y < 7), 'media distancia izquierda'),
+        ((y > 8), 'media distancia derecha'),
+    ]
+
+
+register_zone_scheme('tactical', _tactical_zones, default='other_frontcourt')
+register_zone_scheme('shot', _shot_zones, default='Other')
+register_zone_scheme('gps', _gps_zones, default='perímetro')
+
+
+def check_scheme(scheme, x, y):
+    """Indices of the points whose raster lookup differs from the exact rule."""
+    s = _get_scheme(scheme)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return np.flatnonzero(zone_codes(x, y, scheme) != _evaluate(s, x, y))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks the raster lookup of every zone scheme against its rule.")
+    parser.add_argument('--points', type=int, default=1_000_000, help='random points per scheme')
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    def near_lines(length):
+        # Coordinates on every 5 cm grid line and just either side of it
+        lines = np.arange(0, length + RESOLUTION / 2, RESOLUTION)
+        return (lines[:, None] + np.array([-1e-9, 0.0, 1e-9])).ravel()
+
+    # Random points (with a margin off the court), and points on or next to the grid lines
+    lines_x, lines_y = near_lines(COURT_LENGTH), near_lines(COURT_WIDTH)
+    x = np.concatenate([rng.uniform(-1, COURT_LENGTH + 1, args.points), lines_x,
+                        rng.uniform(0, COURT_LENGTH, len(lines_y))])
+    y = np.concatenate([rng.uniform(-1, COURT_WIDTH + 1, args.points),
+                        rng.uniform(0, COURT_WIDTH, len(lines_x)), lines_y])
+    failed = False
+    for name in sorted(_SCHEMES):
+        mismatches = check_scheme(name, x, y)
+        print(f"{name}: {len(mismatches)} of {len(x)} points differ from the rule")
+        failed |= len(mismatches) > 0
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
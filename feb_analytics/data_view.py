@@ -0,0 +1,72 @@
+"""
+Pre-indexed (player, time) view for the dashboard sidebar filters.
+
+The dataset is sorted once by (player, time) and the row offsets of every
+player are stored, so a player / time-range selection is resolved with a
+binary search per player instead of boolean masks over the full frame. A
+single player (or a selection covering a contiguous block of rows) is
+returned as a zero-copy slice of the sorted frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+ALL_PLAYERS = 'All Players'
+
+
+class PlayerTimeIndex:
+    """Sorted (player, time) view of a dataset with per-player row offsets."""
+
+    def __init__(self, df, by='player', time='time'):
+        self.by = by
+        self.time = time
+        # Stable sort on integer player codes (much faster than sorting strings)
+        codes, uniques = pd.factorize(df[by], sort=True)
+        order = np.lexsort((df[time].to_numpy(np.float64), codes))
+        self.frame = df.take(order)
+        self.times = self.frame[time].to_numpy(np.float64)
+
+        # Rows without a player (code -1) sort first and belong to no block
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        ends = np.count_nonzero(codes < 0) + np.cumsum(counts)
+        self.players = [player for player, count in zip(uniques, counts) if count]
+        self.offsets = {player: (int(end - count), int(end))
+                        for player, count, end in zip(uniques, counts, ends) if count}
+
+    def _bounds(self, player, time_range):
+        start, end = self.offsets[player]
+        if time_range is None:
+            return start, end
+        times = self.times[start:end]
+        lo = start + np.searchsorted(times, time_range[0], side='left')
+        hi = start + np.searchsorted(times, time_range[1], side='right')
+        return int(lo), int(hi)
+
+    def select(self, players=None, time_range=None):
+        """
+        Rows of `players` (a name, a list, or None / 'All Players' for all)
+        with `time_range[0] <= time <= time_range[1]`, in (player, time) order.
+        """
+        if players is None or (isinstance(players, str) and players == ALL_PLAYERS):
+            players = self.players
+        elif isinstance(players, str):
+            players = [players]
+
+        # Merge adjacent row ranges so contiguous selections stay a single slice
+        runs = []
+        for player in players:
+            if player not in self.offsets:
+                continue
+            lo, hi = self._bounds(player, time_range)
+            if hi <= lo:
+                continue
+            if runs and runs[-1][1] == lo:
+                runs[-1][1] = hi
+            else:
+                runs.append([lo, hi])
+
+        if not runs:
+            return self.frame.iloc[0:0]
+        if len(runs) == 1:
+            return self.frame.iloc[runs[0][0]:runs[0][1]]
+        return pd.concat([self.frame.iloc[lo:hi] for lo, hi in runs])
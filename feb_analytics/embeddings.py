@@ -0,0 +1,167 @@
+"""
+Fit-once model results for the AI Player Clustering panels.
+
+Models are described by a (kind, hyperparameters) spec instead of being
+constructed on every Streamlit rerun. Results (cluster labels or 2-D
+embeddings) are cached on disk, and the most recent MAX_RESULTS in memory, under
+a key built from the model kind, its hyperparameters and a hash of the feature
+matrix, so a fit is shared across reruns, sessions and both dashboards.
+
+Expensive models (t-SNE) are fitted in a background worker; until the new
+result is ready, callers get the last result computed for the same spec.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from feb_analytics.feature_store import DEFAULT_STORE_DIR, _read_arrow, _write_arrow
+from feb_analytics.lazy import lazy_import
+
+# sklearn is only imported once a model is actually fitted
+cluster = lazy_import('sklearn.cluster')
+decomposition = lazy_import('sklearn.decomposition')
+manifold = lazy_import('sklearn.manifold')
+
+# kind -> (estimator module, class name, output type)
+MODELS = {
+    'kmeans': (cluster, 'KMeans', 'labels'),
+    'dbscan': (cluster, 'DBSCAN', 'labels'),
+    'pca': (decomposition, 'PCA', 'embedding'),
+    'tsne': (manifold, 'TSNE', 'embedding'),
+}
+BACKGROUND_MODELS = {'tsne'}
+# Results kept in memory per process; older ones are reloaded from disk
+MAX_RESULTS = 64
+
+_lock = threading.Lock()
+_results = OrderedDict()   # key -> result frame, least recently used first
+_latest = {}    # spec -> key of the last finished result
+_pending = {}   # key -> future
+_executor = None
+
+
+def _spec_id(kind, params):
+    return f"{kind}:{json.dumps(params, sort_keys=True)}"
+
+
+def model_key(kind, params, X, rows):
+    """Cache key of a model fit: kind, hyperparameters, feature matrix and row labels."""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_spec_id(kind, params).encode())
+    digest.update(str(X.shape).encode())
+    digest.update(X.tobytes())
+    digest.update('|'.join(map(str, rows)).encode())
+    return digest.hexdigest()
+
+
+def fit_model(kind, params, X, rows):
+    """
+    Fits a model and returns its result as a frame indexed by `rows`, with
+    columns `dim1`/`dim2` (embeddings) or `cluster` (labels).
+    """
+    module, name, output = MODELS[kind]
+    model = getattr(module, name)(**params)
+    if output == 'embedding':
+        transformed = model.fit_transform(X)
+        result = pd.DataFrame({'dim1': transformed[:, 0], 'dim2': transformed[:, 1]}, index=rows)
+    else:
+        result = pd.DataFrame({'cluster': model.fit_predict(X)}, index=rows)
+    result.index.name = 'row'
+    return result
+
+
+def _cache_path(key, store_dir):
+    return os.path.join(store_dir, 'models', f"{key}.arrow")
+
+
+def _remember(key, result):
+    # Caller holds _lock
+    _results[key] = result
+    _results.move_to_end(key)
+    while len(_results) > MAX_RESULTS:
+        _results.popitem(last=False)
+
+
+def _load_cached(key, store_dir):
+    if key is None:
+        return None
+    with _lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key]
+    path = _cache_path(key, store_dir)
+    if not os.path.exists(path):
+        return None
+    result = _read_arrow(path).set_index('row')
+    with _lock:
+        _remember(key, result)
+    return result
+
+
+def _fit_and_store(kind, params, X, rows, key, store_dir):
+    result = fit_model(kind, params, X, rows)
+    os.makedirs(os.path.join(store_dir, 'models'), exist_ok=True)
+    _write_arrow(result.reset_index(), _cache_path(key, store_dir))
+    with _lock:
+        _remember(key, result)
+        _latest[_spec_id(kind, params)] = key
+    return result
+
+
+def get_model_result(kind, params, X, rows, store_dir=DEFAULT_STORE_DIR, background=None):
+    """
+    Returns `(result, pending)` for a model fit.
+
+    Cached results are returned directly. Otherwise models in
+    `BACKGROUND_MODELS` (or all models when `background` is True) are
+    submitted to a background worker and the last finished result of the same
+    spec is returned with `pending=True` (None if there is none yet); other
+    models are fitted inline. Errors raised by a background fit are re-raised
+    by the call that collects it.
+    """
+    global _executor
+    rows = [str(row) for row in rows]
+    key = model_key(kind, params, X, rows)
+    spec = _spec_id(kind, params)
+
+    result = _load_cached(key, store_dir)
+    if result is not None:
+        with _lock:
+            _latest[spec] = key
+        return result, False
+
+    if background is None:
+        background = kind in BACKGROUND_MODELS
+    if not background:
+        return _fit_and_store(kind, params, X, rows, key, store_dir), False
+
+    with _lock:
+        future = _pending.get(key)
+        if future is None:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embeddings')
+            future = _executor.submit(_fit_and_store, kind, params, np.array(X), rows, key, store_dir)
+            _pending[key] = future
+        latest = _latest.get(spec)
+
+    if future.done():
+        with _lock:
+            _pending.pop(key, None)
+        return future.result(), False
+    return _load_cached(latest, store_dir), True
+
+
+def is_pending(kind, params, X, rows):
+    """True while a background fit for these inputs is still running."""
+    key = model_key(kind, params, X, [str(row) for row in rows])
+    with _lock:
+        future = _pending.get(key)
+    return future is not None and not future.done()
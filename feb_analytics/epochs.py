@@ -0,0 +1,118 @@
+"""
+Event-aligned epoching of biometric signals (peri-event time histograms).
+
+`epoch_signal` cuts a signal around every event for every player into an
+(event x player x lag) array. Samples are sorted once by (player, time) and
+the sample nearest to each event time + lag is found with a single
+searchsorted over a combined key, so building the epochs is one gather with
+no per-event Python loops. The epochs can then be averaged per event type
+(`peri_event_average`), clustered or plotted directly.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def epoch_signal(samples, events, value, lags, by='player', time='time', players=None, tolerance=None):
+    """
+    Builds an (event x player x lag) array of `value` around every event.
+
+    Args:
+        samples: Frame with the signal, the entity column `by` and `time`.
+        events: Frame with the `time` of every event.
+        lags: Offsets in seconds relative to the event time.
+        players: Entities on the player axis (default: sorted unique `by`).
+        tolerance: Maximum distance in seconds to the nearest sample; defaults
+            to half the median sampling interval. Lags without a sample
+            that close are NaN.
+
+    Returns:
+        (epochs, players): the float array and the player axis labels.
+    """
+    lags = np.asarray(lags, dtype=np.float64)
+    players = list(players) if players is not None else sorted(pd.unique(samples[by]))
+    codes = pd.Categorical(samples[by], categories=players).codes.astype(np.int64)
+    keep = codes >= 0
+    order = np.lexsort((samples[time].to_numpy(np.float64)[keep], codes[keep]))
+    t = samples[time].to_numpy(np.float64)[keep][order]
+    v = samples[value].to_numpy(np.float64)[keep][order]
+    codes = codes[keep][order]
+    event_t = events[time].to_numpy(np.float64)
+
+    epochs = np.full((len(event_t), len(players), len(lags)), np.nan)
+    if len(t) == 0 or len(event_t) == 0 or len(lags) == 0:
+        return epochs, players
+
+    if tolerance is None:
+        gaps = np.diff(t)[np.diff(codes) == 0]
+        gaps = gaps[gaps > 0]
+        tolerance = np.median(gaps) / 2 if len(gaps) else 0.0
+
+    # Combined key: each player owns a block wider than any target time plus
+    # the tolerance, so the nearest sample is always one of the same player
+    origin = min(t.min(), event_t.min() + lags.min())
+    span = max(t.max(), event_t.max() + lags.max()) - origin + 2 * tolerance + 1.0
+    key = codes * span + (t - origin)
+    target = (np.arange(len(players))[None, :, None] * span
+              + (event_t[:, None, None] + lags[None, None, :] - origin))
+
+    right = np.searchsorted(key, target.ravel()).reshape(target.shape)
+    right = np.minimum(right, len(key) - 1)
+    left = np.maximum(right - 1, 0)
+    dist_left = np.abs(key[left] - target)
+    dist_right = np.abs(key[right] - target)
+    nearest = np.where(dist_left <= dist_right, left, right)
+    dist = np.minimum(dist_left, dist_right)
+
+    # Absorbs float error of the combined key
+    eps = 1e-9 * max(1.0, span * len(players))
+    epochs[:] = np.where(dist <= tolerance + eps, v[nearest], np.nan)
+    return epochs, players
+
+
+def own_epochs(epochs, events, players, by='player'):
+    """(event x lag) epochs of the player performing each event."""
+    index = pd.Categorical(events[by], categories=players).codes
+    own = np.full((epochs.shape[0], epochs.shape[2]), np.nan)
+    valid = index >= 0
+    own[valid] = epochs[np.flatnonzero(valid), index[valid]]
+    return own
+
+
+def peri_event_average(epochs, labels, lags, baseline=None):
+    """
+    Mean response per event label and lag.
+
+    Args:
+        epochs: (event x lag) or (event x player x lag) array.
+        labels: Event label of every epoch (e.g. the action).
+        baseline: Optional (start, end) lag window whose mean is subtracted
+            from every epoch before averaging.
+
+    Returns:
+        Long frame with `label`, `lag`, `mean`, `sem` and `n` (epochs averaged).
+    """
+    lags = np.asarray(lags, dtype=np.float64)
+    data = epochs.reshape(epochs.shape[0], -1, epochs.shape[-1])
+    if baseline is not None:
+        in_baseline = (lags >= baseline[0]) & (lags <= baseline[1])
+        window = data[..., in_baseline]
+        count = np.isfinite(window).sum(axis=-1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            level = np.where(count > 0, np.nansum(window, axis=-1, keepdims=True) / count, np.nan)
+        data = data - level
+
+    labels = np.asarray(labels)
+    frames = []
+    for label in pd.unique(labels):
+        group = data[labels == label].reshape(-1, len(lags))
+        n = np.isfinite(group).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            total = np.nansum(group, axis=0)
+            mean = np.where(n > 0, total / np.maximum(n, 1), np.nan)
+            var = np.nansum((group - mean) ** 2, axis=0) / np.maximum(n - 1, 1)
+            sem = np.where(n > 1, np.sqrt(var / n), np.nan)
+        frames.append(pd.DataFrame({'label': label, 'lag': lags, 'mean': mean, 'sem': sem, 'n': n}))
+    if not frames:
+        return pd.DataFrame(columns=['label', 'lag', 'mean', 'sem', 'n'])
+    return pd.concat(frames, ignore_index=True)
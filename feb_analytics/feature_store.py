@@ -0,0 +1,221 @@
+"""
+Persistent derived-feature store shared by the dashboards.
+
+Derived columns are stored on disk as uncompressed Arrow IPC files, which can
+be memory-mapped, under a directory keyed by the content hash of the source
+file. Each pipeline step from `features.FEATURE_STEPS` is stored separately
+and keyed by its code version (and the versions of the steps it depends on),
+so a dashboard cold start only recomputes the steps whose definition changed.
+
+Layout:
+    <store>/sources.json                  path -> (size, mtime, hash) cache
+    <store>/<source hash>/base.arrow      parsed source columns
+    <store>/<source hash>/<step>-<key>.arrow
+"""
+
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+
+from feb_analytics import partitioned, schema, warehouse
+from feb_analytics.features import FEATURE_STEPS
+from feb_analytics.profiling import current_profile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_STORE_DIR = os.environ.get('FEB_FEATURE_STORE', os.path.join(ROOT_DIR, 'feature_store'))
+WAREHOUSE = 'warehouse'
+
+
+def _write_arrow(df, path):
+    """Writes a frame as an uncompressed Arrow IPC file, atomically."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _read_arrow(path):
+    """Memory-maps an Arrow IPC file and returns it as a DataFrame."""
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _load_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, 'sources.json')) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, 'sources.json')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def source_hash(path, store_dir=DEFAULT_STORE_DIR):
+    """
+    Content hash of a source file.
+
+    The hash is cached against the file size and modification time, so an
+    unchanged file is not re-read on every attach.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    manifest = _load_manifest(store_dir)
+    entry = manifest.get(path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['hash']
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    manifest[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+    _save_manifest(store_dir, manifest)
+    return digest.hexdigest()
+
+
+def step_key(name):
+    """Version key of a step, covering the versions of the steps it depends on."""
+    step = FEATURE_STEPS[name]
+    parts = [f"{name}:{step['version']}"] + [step_key(dep) for dep in step['depends']]
+    return hashlib.blake2b('|'.join(parts).encode(), digest_size=6).hexdigest()
+
+
+def resolve_steps(steps=None):
+    """Names of `steps` and of every step they depend on, in FEATURE_STEPS order (all when None)."""
+    if steps is None:
+        return list(FEATURE_STEPS)
+    needed = set()
+    pending = list(steps)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(FEATURE_STEPS[name]['depends'])
+    return [name for name in FEATURE_STEPS if name in needed]
+
+
+def load_features(source_path, steps=None, store_dir=DEFAULT_STORE_DIR, read_source=schema.read_csv, source_key=None):
+    """
+    Returns the source data with the derived columns of `steps` (all by default).
+
+    Steps the requested ones depend on are included, so a step is always
+    computed on the columns it expects. Columns already persisted for this
+    source hash and step version are
+    memory-mapped from the store; missing or outdated steps are computed,
+    persisted and reused by every dashboard that attaches afterwards.
+
+    `source_key` identifies sources that are not files (e.g. a warehouse
+    game) and replaces the content hash of `source_path`.
+
+    Source and derived columns are kept in their compact `schema` dtypes
+    (categoricals are stored as Arrow dictionaries).
+    """
+    profile = current_profile()
+    os.makedirs(store_dir, exist_ok=True)
+    if source_key is None:
+        digest = source_hash(source_path, store_dir)
+    else:
+        digest = hashlib.blake2b(source_key.encode(), digest_size=16).hexdigest()
+    entry_dir = os.path.join(store_dir, digest)
+    os.makedirs(entry_dir, exist_ok=True)
+
+    base_path = os.path.join(entry_dir, 'base.arrow')
+    with profile.stage('load:source', cached=os.path.exists(base_path)):
+        if os.path.exists(base_path):
+            df = _read_arrow(base_path)
+        else:
+            df = schema.enforce_schema(read_source(source_path))
+            _write_arrow(df, base_path)
+
+    steps = resolve_steps(steps)
+    for name in steps:
+        step = FEATURE_STEPS[name]
+        path = os.path.join(entry_dir, f"{name}-{step_key(name)}.arrow")
+        if os.path.exists(path):
+            with profile.stage(f"features:{name}", cached=True):
+                stored = _read_arrow(path)
+                for col in stored.columns:
+                    # `.array` keeps categoricals (to_numpy would expand them to objects)
+                    df[col] = stored[col].array
+            continue
+
+        with profile.stage(f"features:{name}", cached=False):
+            before = set(df.columns)
+            step['fn'](df)
+            outputs = [col for col in df.columns if col not in before or col in step['overwrites']]
+            schema.enforce_schema(df, outputs)
+            _write_arrow(df[outputs], path)
+
+    with profile.stage('schema') as record:
+        # No-op for compact columns; narrows files persisted before the schema existed
+        schema.enforce_schema(df)
+        if profile.enabled:
+            record['mb'] = schema.memory_mb(df)
+
+    # Identifies this exact data (source content and step versions) for downstream caches
+    keys = [f"{name}-{step_key(name)}" for name in steps]
+    df.attrs['data_version'] = f"{digest}:{','.join(keys)}"
+    return df
+
+
+def available_games(partitioned_root=None, db_path=None):
+    """
+    Games that can be attached with `load_game_features`: game id -> source,
+    either WAREHOUSE (the `samples` table) or a partitioned dataset root.
+    """
+    games = {game: WAREHOUSE for game in warehouse.list_games('samples', db_path)}
+    if partitioned_root is not None:
+        for game in partitioned.list_games(partitioned_root):
+            games.setdefault(game, partitioned_root)
+    return games
+
+
+def game_version(game, source=WAREHOUSE, db_path=None):
+    """
+    Identifies the current import of a game of the warehouse or of a
+    partitioned dataset; changes when the game is re-imported or rewritten.
+    """
+    if source == WAREHOUSE:
+        return warehouse.game_version('samples', game, db_path)
+    return partitioned.game_version(source, game)
+
+
+def load_game_features(game, steps=None, source=WAREHOUSE, db_path=None, store_dir=DEFAULT_STORE_DIR):
+    """
+    `load_features` for one game of the warehouse or of a partitioned dataset.
+
+    Only the partitions (or rows) of that game are read; the features are
+    computed on the whole game since several of them need the team context.
+    """
+    if source == WAREHOUSE:
+        read = lambda _: warehouse.query('samples', game, db_path=db_path)
+    else:
+        read = lambda _: partitioned.read_partitioned(source, game)
+    return load_features(f"{source}/{game}", steps, store_dir, read_source=read,
+                         source_key=game_version(game, source, db_path))
+
+
+def prune_store(store_dir=DEFAULT_STORE_DIR):
+    """Removes step files whose version is no longer current. Returns the number removed."""
+    current = {f"{name}-{step_key(name)}.arrow" for name in FEATURE_STEPS}
+    removed = 0
+    if not os.path.isdir(store_dir):
+        return removed
+    for entry in os.scandir(store_dir):
+        if not entry.is_dir():
+            continue
+        for f in os.scandir(entry.path):
+            if f.name.endswith('.arrow') and f.name != 'base.arrow' and f.name not in current:
+                os.remove(f.path)
+                removed += 1
+    return removed
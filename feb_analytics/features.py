@@ -0,0 +1,183 @@
+"""
+Vectorized feature engineering for the biometric-tactical dashboards.
+
+Every step takes the integrated dataset (one row per player and sample) and
+adds derived columns without per-row or per-time Python loops. Randomness is
+drawn from explicitly seeded generators so results do not depend on caching.
+"""
+
+import numpy as np
+import pandas as pd
+
+from feb_analytics.court_zones import classify_zones
+from feb_analytics.possession import ball_handler_flags, carrier_timeline, possession_segments, segment_ids
+from feb_analytics.proximity import nearest_distances
+from feb_analytics.schema import enforce_schema
+
+POSITIONS = {
+    'A1': 'Guard', 'A2': 'Guard', 'A3': 'Forward', 'A4': 'Forward', 'A5': 'Center',
+    'D1': 'Guard', 'D2': 'Guard', 'D3': 'Forward', 'D4': 'Forward', 'D5': 'Center'
+}
+BODY_WEIGHTS = {'Guard': 85, 'Forward': 100, 'Center': 110}  # kg
+
+# Zone-based success probabilities
+SHOT_ZONE_PROBS = {'Paint': 0.65, 'Mid-Range': 0.45, 'Three-Pointer': 0.38, 'Other': 0.25}
+
+SHOT_SEED = 42
+
+
+def add_position_metrics(df):
+    """Position, metabolic power and high-intensity bursts."""
+    df['position'] = df['player'].map(POSITIONS)
+    df['metabolic_power'] = (df['velocity'] * df['acceleration']) / df['position'].map(BODY_WEIGHTS)
+    df['high_intensity_burst'] = (df['acceleration'] > 3).astype(int)
+    return df
+
+
+def add_shot_outcomes(df, seed=SHOT_SEED):
+    """
+    Classifies shots into zones and simulates their success.
+
+    Adds `success` (-1 = not a shot; one simulated outcome per shot), the make
+    probability `shot_prob` (NaN when not a shot) used by `shot_simulation`
+    for expected FG%, and the shot zone, stored as `zone_shot` when the frame
+    already has a tactical `zone` column.
+    """
+    is_shot = (df['action'] == 'shot').to_numpy()
+    zones = classify_zones(df['x'].to_numpy()[is_shot], df['y'].to_numpy()[is_shot], 'shot').astype(str)
+    rng = np.random.default_rng(seed)
+    probs = pd.Series(zones).map(SHOT_ZONE_PROBS).to_numpy(np.float64)
+
+    success = np.full(len(df), -1.0)
+    success[is_shot] = rng.binomial(1, probs)
+    shot_prob = np.full(len(df), np.nan)
+    shot_prob[is_shot] = probs
+    shot_zone = np.full(len(df), np.nan, dtype=object)
+    shot_zone[is_shot] = zones
+
+    df['success'] = success
+    df['shot_prob'] = shot_prob
+    df['zone_shot' if 'zone' in df.columns else 'zone'] = shot_zone
+    return df
+
+
+def add_tactical_context(df):
+    """Tactical situation by possession time and offensive/defensive role."""
+    df['tactical_situation'] = np.select(
+        [df['time'] >= 15, df['time'].between(11, 15), df['time'].between(7, 10)],
+        ['Shot Outcome', 'Second Action', 'Pick-and-Roll'],
+        default='Initial Setup'
+    )
+    df['role'] = np.where(df['player'].str.startswith('A'), 'Offense', 'Defense')
+    return df
+
+
+def add_recovery_phase(df):
+    """Exertion index and recovery phase relative to each player's mean."""
+    df['exertion_index'] = 0.4 * df['heart_rate'] + 0.3 * df['velocity'] + 0.3 * df['acceleration']
+    player_mean = df.groupby('player')['exertion_index'].transform('mean')
+    df['recovery_phase'] = np.select(
+        [df['exertion_index'] > player_mean + 15, df['exertion_index'] < player_mean - 10],
+        ['High Exertion', 'Recovery Phase'],
+        default='Normal'
+    )
+    return df
+
+
+def add_efficiency(df):
+    """PlayerLoad efficiency metrics per role."""
+    df['offensive_eff'] = np.where(df['role'] == 'Offense', df['player_load'] / (df['velocity'] + 0.1), np.nan)
+    df['defensive_eff'] = np.where(df['role'] == 'Defense', df['player_load'] / (df['acceleration'] + 0.1), np.nan)
+    return df
+
+
+def add_ball_handler(df, initial_handler='A1'):
+    """Ball-handler flag and possession segment id (see `possession`) of every sample."""
+    timeline = carrier_timeline(df, initial_handler)
+    df['ball_handler'] = ball_handler_flags(df, timeline=timeline)
+    df['possession_id'] = segment_ids(df, possession_segments(timeline=timeline))
+    return df
+
+
+def add_load_metrics(df):
+    """HR stress, effective distance and offensive spacing index."""
+    hr = df.groupby('player')['heart_rate']
+    df['hr_stress_index'] = (hr.transform('max') - hr.transform('min')) / hr.transform('size')
+
+    in_paint = (df['x'] >= 25) & (df['y'] >= 5) & (df['y'] <= 10)
+    df['effective_distance'] = np.where(in_paint, df['velocity'], 0)
+
+    spacing = df[df['role'] == 'Offense'].groupby('time')['dist_to_basket'].std()
+    df['spacing_index'] = df['time'].map(spacing)
+    return df
+
+
+def add_proximity(df):
+    """
+    Nearest-opponent and nearest-teammate distances of every sample (see
+    `proximity`), and the closeout distance: the nearest defender of the
+    shooter at every shot.
+    """
+    nearest = nearest_distances(df)
+    df['nearest_opponent'] = nearest['nearest_opponent']
+    df['nearest_teammate'] = nearest['nearest_teammate']
+    df['closeout_distance'] = df['nearest_opponent'].where(df['action'] == 'shot')
+    return df
+
+
+def add_rebound_scores(df):
+    """Rebound positioning score of every player at shot times."""
+    at_shot = df['time'].isin(df.loc[df['action'] == 'shot', 'time'].unique())
+    score = 1 / (df['dist_to_basket'] + df['nearest_opponent'] + 0.1)
+    df['rebound_score'] = score.where(at_shot)
+    return df
+
+
+def add_time_features(df):
+    """Fatigue, recovery rate and PlayerLoad rate derived from each player's timeline."""
+    by_player = df.groupby('player')
+    hr_diff = by_player['heart_rate'].diff()
+    df['fatigue_slope'] = hr_diff / by_player['time'].diff()
+    df['fatigue_index'] = by_player['player_load'].cumsum() / 100
+    df['recovery_rate'] = (
+        hr_diff.groupby(df['player']).rolling(5, min_periods=1).mean().reset_index(level=0, drop=True)
+    )
+    df['player_load_per_min'] = df['player_load'] / (df['time'] / 60)
+    return df
+
+
+# Pipeline registry: bump a step's version whenever its definition changes so
+# persisted copies of its columns are recomputed. `depends` lists the steps
+# whose outputs it reads and `overwrites` the source columns it replaces.
+FEATURE_STEPS = {
+    'position_metrics': {'fn': add_position_metrics, 'version': 1, 'depends': [], 'overwrites': []},
+    'shot_outcomes': {'fn': add_shot_outcomes, 'version': 2, 'depends': [], 'overwrites': []},
+    'tactical_context': {'fn': add_tactical_context, 'version': 1, 'depends': [], 'overwrites': ['role']},
+    'recovery_phase': {'fn': add_recovery_phase, 'version': 1, 'depends': [], 'overwrites': []},
+    'efficiency': {'fn': add_efficiency, 'version': 2, 'depends': ['tactical_context'], 'overwrites': []},
+    'ball_handler': {'fn': add_ball_handler, 'version': 2, 'depends': [], 'overwrites': []},
+    'load_metrics': {'fn': add_load_metrics, 'version': 2, 'depends': ['tactical_context'], 'overwrites': []},
+    'proximity': {'fn': add_proximity, 'version': 1, 'depends': [], 'overwrites': []},
+    'rebound_scores': {'fn': add_rebound_scores, 'version': 2, 'depends': ['proximity'], 'overwrites': []},
+    'time_features': {'fn': add_time_features, 'version': 1, 'depends': [], 'overwrites': []},
+}
+
+
+def build_features(df, seed=SHOT_SEED, steps=None, compact=True):
+    """
+    Runs the dashboard feature pipeline (or a subset of steps) on a copy of the
+    integrated dataset. With `compact`, the outputs of every step are stored
+    in their `schema` dtypes.
+    """
+    df = df.copy()
+    for name, step in FEATURE_STEPS.items():
+        if steps is not None and name not in steps:
+            continue
+        before = set(df.columns)
+        if name == 'shot_outcomes':
+            step['fn'](df, seed)
+        else:
+            step['fn'](df)
+        if compact:
+            enforce_schema(df, [col for col in df.columns if col not in before or col in step['overwrites']])
+    return df
@@ -0,0 +1,137 @@
+"""
+Figure-level memoization for the dashboard pages.
+
+Built Plotly figures are stored as serialized JSON in a process-wide LRU
+cache, keyed by (page, chart id, filter state, data version). Revisiting a
+tab or a player that was already viewed rebuilds the figure from its JSON,
+skipping both the data preparation and the Plotly Express construction
+(trendlines, facets, density contours...).
+
+The filter state of a chart is derived from the frame it is built from: the
+data version attached by the feature store plus a hash of the row labels of
+the (pre-filtered) frame, so pages do not need to thread widget values
+through. Extra chart inputs (e.g. a selectbox value) go in `state`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.io as pio
+
+from feb_analytics.profiling import current_profile
+from feb_analytics.report import show_figure
+
+DEFAULT_MAX_MB = float(os.environ.get('FEB_FIGURE_CACHE_MB', 256))
+
+
+def frame_key(df):
+    """Identifies the rows of a frame: data version plus a hash of its index."""
+    digest = hashlib.blake2b(digest_size=16)
+    version = df.attrs.get('data_version')
+    if version is None:
+        # Frames not loaded through the feature store are hashed in full
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    else:
+        digest.update(str(version).encode())
+        digest.update(str(df.shape).encode())
+        digest.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def figure_key(page, chart_id, state=(), data_key=None):
+    """Cache key of a chart from its page, id, extra state and `frame_key` of its data."""
+    payload = json.dumps([page, chart_id, state, data_key], default=str, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU cache of figure JSON with a memory cap."""
+
+    def __init__(self, max_mb=DEFAULT_MAX_MB):
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the figure stored under `key`, or None."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pio.from_json(payload, skip_invalid=True)
+
+    def put(self, key, fig):
+        payload = fig.to_json()
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = payload
+            self._bytes += size
+            # Evict least recently used figures beyond the memory cap
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def payload_size(self, key):
+        """Bytes of the JSON stored under `key`, or None."""
+        with self._lock:
+            payload = self._entries.get(key)
+        return None if payload is None else len(payload)
+
+    def get_or_build(self, key, build):
+        """Returns the cached figure for `key`, building and storing it on a miss."""
+        fig = self.get(key)
+        if fig is None:
+            fig = build()
+            self.put(key, fig)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'mb': self._bytes / 2 ** 20,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+figure_cache = FigureCache()
+
+
+def cached_plotly_chart(df, page, chart_id, build, state=(), cache=None, **kwargs):
+    """
+    Renders `build()` with st.plotly_chart, memoized per page, chart and filter state.
+
+    In a headless report (`report.capture_figures`) the figure is collected instead.
+
+    `df` is the frame the chart is built from and `build` a zero-argument
+    function returning the figure; it only runs on a cache miss.
+    """
+    cache = cache or figure_cache
+    key = figure_key(page, chart_id, state, frame_key(df))
+    with current_profile().chart(f"{page}/{chart_id}") as record:
+        fig = cache.get(key)
+        record['cached'] = fig is not None
+        if fig is None:
+            start = time.perf_counter()
+            fig = build()
+            record['build_seconds'] = time.perf_counter() - start
+            cache.put(key, fig)
+        record['bytes'] = cache.payload_size(key)
+        show_figure(fig, name=f"{page}/{chart_id}", **kwargs)
@@ -0,0 +1,199 @@
+"""
+Incremental ingest of the data directories.
+
+New games land in a data directory as a sub-directory per game with the CSV
+layouts of the prototypes (`<data>/<game>/integrated_dataset.csv`,
+`positions.csv`, ...); the bundled CSVs at the top level can also be
+replaced. `ingest` compares every file with the state of the previous pass
+(size and modification time first, content hash only when those differ) and
+processes only the new, changed or removed files:
+
+    <data>/<game>/<dataset>.csv   rewritten as that game's partitions of the
+                                  game=/player= layout (`partitioned`); for the
+                                  integrated dataset the feature store is warmed
+    <data>/integrated_dataset.csv feature store warmed for the new content
+
+The feature store holds the derived features and per-player aggregates of
+`features.FEATURE_STEPS`, keyed by source content, so untouched games keep
+their entries and nothing is recomputed for them.
+
+When a pass changed anything, the data version of the directory is bumped
+by atomically replacing `<data>/_data_version.json`, after every artifact is
+in place. Dashboards pass `data_version(data_dir)` to their cached loaders,
+so the next rerun reads the new data without a cache TTL or a restart.
+
+Usage:
+    python -m feb_analytics.ingest test_2/data test_3/data test_4/data [--watch]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from feb_analytics import feature_store, partitioned, schema
+
+VERSION_FILE = '_data_version.json'
+STATE_FILE = '.ingest_state.json'
+POLL_SECONDS = 2.0
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path, payload):
+    """Writes a JSON file atomically (readers see the old or the new file)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def data_version(data_dir):
+    """
+    Current data version of a directory, 0 before the first ingest.
+
+    Cheap enough to call on every rerun (one small file read).
+    """
+    return _read_json(os.path.join(data_dir, VERSION_FILE), {}).get('version', 0)
+
+
+def _file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan(data_dir):
+    """
+    CSV files of the known layouts: relative path -> (game, dataset).
+
+    `game` is None for the bundled files at the top level.
+    """
+    files = {}
+    for entry in os.scandir(data_dir):
+        if entry.name.startswith(('.', '_')) or entry.name == partitioned.PARTITIONED_DIR:
+            continue
+        if entry.is_file() and entry.name.endswith('.csv'):
+            files[entry.name] = (None, entry.name[:-len('.csv')])
+        elif entry.is_dir():
+            for sub in os.scandir(entry.path):
+                name = sub.name[:-len('.csv')]
+                if sub.is_file() and sub.name.endswith('.csv') and name in partitioned.DATASETS:
+                    files[f"{entry.name}/{sub.name}"] = (entry.name, name)
+    return files
+
+
+def changed_files(data_dir, state):
+    """
+    Compares the files of `data_dir` with the state of the previous pass.
+
+    Returns:
+        (changed, removed, entries): relative paths of new or modified files,
+        of files that disappeared, and the state entries of the current files.
+    """
+    changed, entries = [], {}
+    for rel in scan(data_dir):
+        stat = os.stat(os.path.join(data_dir, rel))
+        entry = state.get(rel)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            entries[rel] = entry
+            continue
+        digest = _file_hash(os.path.join(data_dir, rel))
+        entries[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+        # A touched file with the same content needs no processing
+        if not entry or entry['hash'] != digest:
+            changed.append(rel)
+    removed = [rel for rel in state if rel not in entries]
+    return sorted(changed), sorted(removed), entries
+
+
+def _split(rel):
+    # (game, dataset) of a relative path returned by `scan`
+    game, _, name = rel.rpartition('/')
+    return game or None, name[:-len('.csv')]
+
+
+def _process(data_dir, rel, game, dataset, store_dir):
+    path = os.path.join(data_dir, rel)
+    if game is None:
+        if dataset == 'integrated_dataset':
+            feature_store.load_features(path, store_dir=store_dir)
+        return
+    spec = partitioned.DATASETS[dataset]
+    root = partitioned.dataset_dir(data_dir, dataset)
+    partitioned.write_partitioned(schema.read_csv(path), root, game, spec['player'], spec['time'])
+    if dataset == 'integrated_dataset':
+        feature_store.load_game_features(game, source=root, store_dir=store_dir)
+
+
+def ingest(data_dir, store_dir=feature_store.DEFAULT_STORE_DIR):
+    """
+    Processes the new, changed and removed files of a data directory.
+
+    Returns:
+        {'version': current version, 'changed': [...], 'removed': [...]}
+    """
+    state_path = os.path.join(data_dir, STATE_FILE)
+    state = _read_json(state_path, {})
+    changed, removed, entries = changed_files(data_dir, state)
+
+    for rel in changed:
+        game, dataset = _split(rel)
+        _process(data_dir, rel, game, dataset, store_dir)
+    for rel in removed:
+        game, dataset = _split(rel)
+        if game is not None and dataset in partitioned.DATASETS:
+            partitioned.remove_game(partitioned.dataset_dir(data_dir, dataset), game)
+
+    version = data_version(data_dir)
+    if changed or removed or entries != state:
+        _write_json(state_path, entries)
+    if changed or removed:
+        # Bumped last, so a dashboard seeing the new version finds every artifact
+        version += 1
+        _write_json(os.path.join(data_dir, VERSION_FILE),
+                    {'version': version, 'updated_at': time.time(), 'changed': changed, 'removed': removed})
+    return {'version': version, 'changed': changed, 'removed': removed}
+
+
+def watch(data_dirs, interval=POLL_SECONDS, store_dir=feature_store.DEFAULT_STORE_DIR):
+    """Polls the data directories and ingests their changes until interrupted."""
+    while True:
+        for data_dir in data_dirs:
+            result = ingest(data_dir, store_dir)
+            if result['changed'] or result['removed']:
+                print(f"{data_dir}: version {result['version']} "
+                      f"(changed {result['changed']}, removed {result['removed']})", flush=True)
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingests new or changed files of data directories.")
+    parser.add_argument('data_dirs', nargs='+', help='data directories (e.g. test_3/data)')
+    parser.add_argument('--watch', action='store_true', help='keep polling for changes')
+    parser.add_argument('--interval', type=float, default=POLL_SECONDS, help='seconds between polls')
+    parser.add_argument('--store', default=feature_store.DEFAULT_STORE_DIR, help='feature store directory')
+    args = parser.parse_args()
+    if args.watch:
+        try:
+            watch(args.data_dirs, args.interval, args.store)
+        except KeyboardInterrupt:
+            pass
+        return
+    for data_dir in args.data_dirs:
+        result = ingest(data_dir, args.store)
+        print(f"{data_dir}: version {result['version']}, {len(result['changed'])} changed, "
+              f"{len(result['removed'])} removed")
+
+
+if __name__ == '__main__':
+    main()
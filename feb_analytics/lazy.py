@@ -0,0 +1,49 @@
+"""
+Lazy imports for the heavy analytics backends (sklearn, scipy, seaborn...).
+
+Streamlit re-executes the dashboard scripts on every interaction and each
+server worker imports them at start-up, so module-level imports of the
+analytics stacks cost cold-start time and memory even when no page uses them.
+`lazy_import` returns a placeholder module that performs the real import on
+first attribute access:
+
+    cluster = lazy_import('sklearn.cluster')
+    ...
+    kmeans = cluster.KMeans(n_clusters=3)   # sklearn is imported here
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """Returns `name` if it is already imported, otherwise a lazy placeholder for it."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
@@ -0,0 +1,217 @@
+"""
+Hive-partitioned columnar layout for the data directories.
+
+The CSVs of a data directory are converted into Parquet datasets partitioned
+by game and player:
+
+    <data>/partitioned/<dataset>/_layout.json
+    <data>/partitioned/<dataset>/game=<game>/player=<player>/part-0.parquet
+
+Each player file is sorted by time and written in row groups, so a reader
+asking for one game and player opens a single directory, and a time range
+only decodes the row groups whose min/max statistics overlap it. Neither
+the other games of the season nor the other players are listed or parsed.
+
+The player column is stored as the `player` partition key (not inside the
+files); `_layout.json` keeps the original column order and dtypes so
+`read_partitioned` returns the same frame as reading the CSV and filtering.
+
+Usage:
+    python -m feb_analytics.partitioned test_3/data --game <id>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import urllib.parse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from feb_analytics import schema
+
+PARTITIONED_DIR = 'partitioned'
+LAYOUT_FILE = '_layout.json'
+ROW_GROUP_ROWS = 8192
+
+# Datasets converted from the data directories: player and time columns
+DATASETS = {
+    'integrated_dataset': {'player': 'player', 'time': 'time'},  # test_3 / test_4
+    'positions': {'player': 'player_id', 'time': 'time'},        # test_2
+    'ball': {'player': None, 'time': 'time'},                    # test_2
+    'metrics': {'player': 'player_id', 'time': None},            # test_2
+}
+
+_PARTITIONING = ds.partitioning(pa.schema([('game', pa.string()), ('player', pa.string())]), flavor='hive')
+
+
+def dataset_dir(data_dir, name):
+    """Root of the partitioned dataset `name` of a data directory."""
+    return os.path.join(data_dir, PARTITIONED_DIR, name)
+
+
+def _segment(key, value):
+    return f"{key}={urllib.parse.quote(str(value), safe='')}"
+
+
+def _load_layout(root):
+    with open(os.path.join(root, LAYOUT_FILE)) as f:
+        return json.load(f)
+
+
+def write_partitioned(df, root, game, player=None, time=None, row_group_rows=ROW_GROUP_ROWS):
+    """
+    Writes the rows of one game, replacing a previous write of that game.
+
+    The new game directory is written under a hidden name and swapped in,
+    so concurrent readers see either the old or the new partitions.
+    """
+    os.makedirs(root, exist_ok=True)
+    layout = {'player': player, 'time': time, 'columns': list(df.columns),
+              'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}}
+    with open(os.path.join(root, LAYOUT_FILE), 'w') as f:
+        json.dump(layout, f, indent=2)
+
+    final_dir = os.path.join(root, _segment('game', game))
+    # Dot-prefixed directories are ignored by dataset discovery
+    tmp_dir = os.path.join(root, f".{_segment('game', game)}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    groups = df.groupby(player, sort=True, observed=True) if player else [(None, df)]
+    for value, part in groups:
+        part_dir = tmp_dir if player is None else os.path.join(tmp_dir, _segment('player', value))
+        os.makedirs(part_dir, exist_ok=True)
+        if player:
+            part = part.drop(columns=player)
+        if time:
+            part = part.sort_values(time, kind='stable')
+        pq.write_table(pa.Table.from_pandas(part, preserve_index=False),
+                       os.path.join(part_dir, 'part-0.parquet'), row_group_size=row_group_rows)
+
+    old_dir = f"{tmp_dir}.old"
+    if os.path.exists(final_dir):
+        os.replace(final_dir, old_dir)
+    os.replace(tmp_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def remove_game(root, game):
+    """Removes the partitions of one game. Returns True if it existed."""
+    game_dir = os.path.join(root, _segment('game', game))
+    if not os.path.isdir(game_dir):
+        return False
+    old_dir = os.path.join(root, f".{_segment('game', game)}.{os.getpid()}.old")
+    os.replace(game_dir, old_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return True
+
+
+def convert_dir(data_dir, game):
+    """Converts the known CSVs of a data directory. Returns {dataset: rows}."""
+    converted = {}
+    for name, spec in DATASETS.items():
+        path = os.path.join(data_dir, f"{name}.csv")
+        if os.path.exists(path):
+            df = schema.read_csv(path)
+            write_partitioned(df, dataset_dir(data_dir, name), game, spec['player'], spec['time'])
+            converted[name] = len(df)
+    return converted
+
+
+def list_games(root):
+    """Games of a partitioned dataset (from the directory names only)."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(urllib.parse.unquote(entry.name[len('game='):]) for entry in os.scandir(root)
+                  if entry.is_dir() and entry.name.startswith('game='))
+
+
+def list_players(root, game):
+    game_dir = os.path.join(root, _segment('game', game))
+    return sorted(urllib.parse.unquote(entry.name[len('player='):]) for entry in os.scandir(game_dir)
+                  if entry.is_dir() and entry.name.startswith('player='))
+
+
+def game_version(root, game):
+    """Identifies the current files of a game (changes when it is rewritten)."""
+    digest = hashlib.blake2b(digest_size=16)
+    game_dir = os.path.join(root, _segment('game', game))
+    for dirpath, dirnames, filenames in sorted(os.walk(game_dir)):
+        dirnames.sort()
+        for name in sorted(filenames):
+            stat = os.stat(os.path.join(dirpath, name))
+            digest.update(f"{os.path.relpath(os.path.join(dirpath, name), root)}:{stat.st_size}:"
+                          f"{stat.st_mtime_ns}".encode())
+    return f"{os.path.abspath(root)}:{game}:{digest.hexdigest()}"
+
+
+def _files(root, game, players):
+    """Parquet files of the requested partitions, listing only their directories."""
+    games = [game] if game is not None else list_games(root)
+    files = []
+    for g in games:
+        game_dir = os.path.join(root, _segment('game', g))
+        if not os.path.isdir(game_dir):
+            continue
+        if players is None:
+            dirs = [entry.path for entry in os.scandir(game_dir) if entry.is_dir()] or [game_dir]
+        else:
+            dirs = [os.path.join(game_dir, _segment('player', p)) for p in players]
+        for d in dirs:
+            if os.path.isdir(d):
+                files.extend(entry.path for entry in os.scandir(d)
+                             if entry.is_file() and entry.name.endswith('.parquet'))
+    return sorted(files)
+
+
+def read_partitioned(root, game=None, players=None, time_range=None, columns=None):
+    """
+    Rows of a partitioned dataset matching the predicates.
+
+    Args:
+        game: Game id; all games when None.
+        players: Player ids to keep; only their partitions are opened.
+        time_range: (start, end) inclusive; row groups outside it are skipped.
+        columns: Columns to read (all by default).
+
+    Returns:
+        Frame with the original columns (no `game` column), sorted by
+        player and time.
+    """
+    layout = _load_layout(root)
+    player, time = layout['player'], layout['time']
+    columns = list(columns) if columns is not None else layout['columns']
+    files = _files(root, game, players)
+    if not files:
+        return pd.DataFrame({col: pd.Series(dtype=layout['dtypes'][col]) for col in columns})
+
+    dataset = ds.dataset(files, format='parquet', partitioning=_PARTITIONING, partition_base_dir=root)
+    predicate = None
+    if time_range is not None and time is not None:
+        predicate = (ds.field(time) >= time_range[0]) & (ds.field(time) <= time_range[1])
+    read_cols = [('player' if col == player else col) for col in columns]
+    df = dataset.to_table(columns=read_cols, filter=predicate).to_pandas()
+    if player is not None and player in columns:
+        df = df.rename(columns={'player': player})
+        df[player] = df[player].astype(layout['dtypes'][player])
+    return df[columns]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converts the CSVs of data directories into the game=/player= layout.")
+    parser.add_argument('data_dirs', nargs='+', help='data directories (e.g. test_3/data)')
+    parser.add_argument('--game', required=True, help='game id of the converted rows')
+    args = parser.parse_args()
+    for data_dir in args.data_dirs:
+        converted = convert_dir(data_dir, args.game)
+        if not converted:
+            print(f"{data_dir}: no known CSV layouts")
+        for name, rows in converted.items():
+            print(f"{data_dir} -> {dataset_dir(data_dir, name)} game={args.game}: {rows} rows")
+
+
+if __name__ == '__main__':
+    main()
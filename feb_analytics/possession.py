@@ -0,0 +1,87 @@
+"""
+Possession segmentation from on-ball actions.
+
+The ball carrier changes to the first player performing a pass, shot or
+dribble at a given time and is forward-filled until the next one. The
+carrier series is built once over the sorted unique times, so the per-row
+ball-handler flag, the possession segments (runs of a constant carrier) and
+the segment id of every row all come from the same vectorized pass instead
+of a filter per time.
+
+Segment table (one row per possession segment):
+    possession_id   0-based, in time order
+    start, end      first sample time of the segment and of the next one
+                    (the last segment ends at the last sample time)
+    duration        end - start, in seconds
+    carrier         player holding the ball
+    start_action    on-ball action that gave the carrier the ball
+                    (NaN for the initial handler)
+    end_action      last on-ball action of the carrier in the segment
+    samples         number of sample times in the segment
+"""
+
+import numpy as np
+import pandas as pd
+
+BALL_ACTIONS = ['pass', 'shot', 'dribble']
+SEGMENT_COLUMNS = ['possession_id', 'start', 'end', 'duration', 'carrier',
+                   'start_action', 'end_action', 'samples']
+
+
+def carrier_timeline(df, initial_handler='A1'):
+    """
+    Ball carrier at every sample time.
+
+    Returns:
+        Frame indexed by the sorted unique times with the forward-filled
+        `carrier` and the on-ball `action` performed at that time (NaN when
+        nobody acted and the carrier was carried over).
+    """
+    times = np.sort(df['time'].unique())
+    on_ball = df[df['action'].isin(BALL_ACTIONS)]
+    first = on_ball.groupby('time', sort=True)[['player', 'action']].first().reindex(times)
+    return pd.DataFrame({'carrier': first['player'].ffill().fillna(initial_handler),
+                         'action': first['action']}, index=pd.Index(times, name='time'))
+
+
+def ball_handler_flags(df, initial_handler='A1', timeline=None):
+    """Flags the ball handler of every sample."""
+    if timeline is None:
+        timeline = carrier_timeline(df, initial_handler)
+    return (df['player'] == df['time'].map(timeline['carrier'])).to_numpy()
+
+
+def possession_segments(df=None, initial_handler='A1', timeline=None):
+    """Possession segment table (see module docstring) of `df` or of a `carrier_timeline`."""
+    if timeline is None:
+        timeline = carrier_timeline(df, initial_handler)
+    if timeline.empty:
+        return pd.DataFrame(columns=SEGMENT_COLUMNS)
+
+    times = timeline.index.to_numpy(np.float64)
+    carrier = timeline['carrier'].to_numpy()
+    action = timeline['action']
+    starts = np.flatnonzero(np.r_[True, carrier[1:] != carrier[:-1]])
+    samples = np.diff(np.r_[starts, len(times)])
+    segment_of_time = np.repeat(np.arange(len(starts)), samples)
+    ends = np.r_[times[starts[1:]], times[-1]]
+
+    return pd.DataFrame({
+        'possession_id': np.arange(len(starts)),
+        'start': times[starts],
+        'end': ends,
+        'duration': ends - times[starts],
+        'carrier': carrier[starts],
+        'start_action': action.to_numpy()[starts],
+        # `last` skips the times where nobody acted
+        'end_action': action.groupby(segment_of_time).last().reindex(np.arange(len(starts))).to_numpy(),
+        'samples': samples,
+    })
+
+
+def segment_ids(df, segments):
+    """Possession id of every row of `df`, for joining rows against `segments`."""
+    if segments.empty:
+        return np.full(len(df), -1)
+    starts = segments['start'].to_numpy(np.float64)
+    return np.searchsorted(starts, df['time'].to_numpy(np.float64), side='right') - 1
@@ -0,0 +1,164 @@
+"""
+Render-time instrumentation for the Streamlit dashboards.
+
+A `RenderProfile` is started at the top of every script run and records the
+duration of data stages (load, feature engineering, filtering) and charts
+(figure build, serialized payload size, figure-cache hit). At the end of the
+run `finish()` appends the records as JSON lines to the profile log and, when
+profiling is enabled, shows a developer panel in the sidebar with the rerun
+total and the slowest components.
+
+Profiling is enabled with the FEB_PROFILE environment variable or the
+`?profile=1` query parameter. When disabled every hook is a no-op.
+
+Log records (one JSON object per line):
+    {"run": ..., "app": ..., "kind": "stage" | "chart", "name": ..., "seconds": ..., ...}
+    {"run": ..., "app": ..., "kind": "run", "seconds": <rerun total>, "slowest": [...]}
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from feb_analytics.lazy import lazy_import
+from feb_analytics.report import show_figure
+
+st = lazy_import('streamlit')
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_LOG_PATH = os.environ.get('FEB_PROFILE_LOG', os.path.join(ROOT_DIR, 'profiling', 'render_log.jsonl'))
+SLOWEST_N = 5
+
+_local = threading.local()
+
+
+def profiling_enabled():
+    """True when FEB_PROFILE is set or the page was opened with ?profile=1."""
+    if os.environ.get('FEB_PROFILE', '') not in ('', '0'):
+        return True
+    try:
+        return st.query_params.get('profile', '0') not in ('', '0')
+    except Exception:
+        # Outside of a Streamlit script run
+        return False
+
+
+class RenderProfile:
+    """Timings of the stages and charts of one script run."""
+
+    def __init__(self, app, enabled=True, log_path=DEFAULT_LOG_PATH):
+        self.app = app
+        self.enabled = enabled
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self._started = time.perf_counter()
+        self._open_charts = []
+
+    @contextmanager
+    def _timed(self, kind, name, fields):
+        if not self.enabled:
+            yield fields
+            return
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.records.append({'kind': kind, 'name': name,
+                                 'seconds': time.perf_counter() - start, **fields})
+
+    def stage(self, name, **fields):
+        """Times a data stage; extra `fields` are stored with the record."""
+        return self._timed('stage', name, fields)
+
+    @contextmanager
+    def chart(self, name, **fields):
+        """
+        Times a chart. The yielded dict takes extra fields (e.g. `cached`);
+        `plotly_chart` calls inside the block add their payload size to it.
+        """
+        with self._timed('chart', name, fields) as record:
+            self._open_charts.append(record)
+            try:
+                yield record
+            finally:
+                self._open_charts.pop()
+
+    def add_payload(self, fig):
+        """Adds the serialized size of `fig` to the innermost open chart."""
+        if self.enabled and self._open_charts:
+            record = self._open_charts[-1]
+            record['bytes'] = record.get('bytes', 0) + len(fig.to_json())
+
+    def slowest(self, n=SLOWEST_N):
+        return sorted(self.records, key=lambda r: r['seconds'], reverse=True)[:n]
+
+    def finish(self, n=SLOWEST_N):
+        """Writes the run to the profile log and shows the developer panel."""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self._started
+        slowest = self.slowest(n)
+        summary = {'kind': 'run', 'seconds': total,
+                   'charts': sum(r['kind'] == 'chart' for r in self.records),
+                   'slowest': [r['name'] for r in slowest]}
+
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        stamp = time.time()
+        with open(self.log_path, 'a') as f:
+            for record in self.records + [summary]:
+                f.write(json.dumps({'run': self.run_id, 'app': self.app, 'ts': stamp, **record},
+                                   default=str) + '\n')
+        self._render_panel(total, slowest)
+
+    def _render_panel(self, total, slowest):
+        with st.sidebar.expander("Render profile", expanded=False):
+            st.metric("Rerun total", f"{total * 1000:.0f} ms")
+            st.caption(f"{len(self.records)} components timed")
+            st.markdown(f"**Slowest {len(slowest)}**")
+            for record in slowest:
+                extra = []
+                if 'bytes' in record:
+                    extra.append(f"{record['bytes'] / 1024:.0f} KB")
+                if record.get('cached'):
+                    extra.append("cached")
+                suffix = f" ({', '.join(extra)})" if extra else ""
+                st.markdown(f"- `{record['name']}` {record['seconds'] * 1000:.0f} ms{suffix}")
+            st.caption(f"Run {self.run_id} logged to {self.log_path}")
+
+
+_DISABLED = RenderProfile('disabled', enabled=False)
+
+
+def start_profile(app, enabled=None):
+    """Starts the profile of the current script run and makes it current."""
+    profile = RenderProfile(app, enabled=profiling_enabled() if enabled is None else enabled)
+    _local.profile = profile
+    return profile
+
+
+def current_profile():
+    """Profile of the running script, or a disabled one when none was started."""
+    return getattr(_local, 'profile', _DISABLED)
+
+
+def plotly_chart(fig, name=None, **kwargs):
+    """
+    st.plotly_chart that records the chart in the current profile.
+
+    Inside a `chart()` block the payload size is added to that block;
+    otherwise the render is recorded as a chart of its own.
+    """
+    profile = current_profile()
+    if not profile.enabled:
+        return show_figure(fig, name, **kwargs)
+    if profile._open_charts:
+        profile.add_payload(fig)
+        return show_figure(fig, name, **kwargs)
+    name = name or fig.layout.title.text or f"chart {len(profile.records) + 1}"
+    with profile.chart(name):
+        profile.add_payload(fig)
+        return show_figure(fig, name, **kwargs)
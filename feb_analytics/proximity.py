@@ -0,0 +1,119 @@
+"""
+Nearest-opponent, nearest-teammate and basket distances for every sample.
+
+Positions are scattered once into a dense (time x player x 2) tensor. With
+the ten players of a game, the pairwise distances of a block of frames are
+one broadcast (frames x players x players) and the nearest opponent and
+teammate are masked minimums over the last axis, so there is no loop over
+shot times or rows. Blocks of frames bound the memory of full-game data.
+For frames with many players (simulations, multi-game tensors) a KD-tree
+per frame and team is used instead of the quadratic broadcast.
+
+Result columns (aligned with the input rows):
+    nearest_opponent   distance to the closest player of another team
+    nearest_teammate   distance to the closest other player of the same team
+    basket_distance    distance to the basket
+Distances are NaN when no such player has a sample at that time.
+"""
+
+import numpy as np
+import pandas as pd
+
+from feb_analytics.lazy import lazy_import
+
+spatial = lazy_import('scipy.spatial')
+
+BASKET = (28.0, 7.5)  # m, FIBA half court used by the simulators
+# Frames per block are chosen so a block holds about this many pair distances
+BLOCK_PAIRS = 2 ** 18
+# From this many players per frame the KD-tree path is used
+KDTREE_MIN_PLAYERS = 64
+PROXIMITY_COLUMNS = ['nearest_opponent', 'nearest_teammate', 'basket_distance']
+
+
+def position_tensor(df, time='time', by='player'):
+    """
+    Dense positions of every player at every sample time.
+
+    Returns:
+        (positions, times, players, time_codes, player_codes): `positions` is
+        (len(times), len(players), 2) with NaN where a player has no sample;
+        the codes give the cell of every row of `df`.
+    """
+    time_codes, times = pd.factorize(df[time], sort=True)
+    player_codes, players = pd.factorize(df[by], sort=True)
+    positions = np.full((len(times), len(players), 2), np.nan)
+    positions[time_codes, player_codes] = df[['x', 'y']].to_numpy(np.float64)
+    return positions, times, players, time_codes, player_codes
+
+
+def _nearest_dense(positions, teams):
+    n_frames, n_players, _ = positions.shape
+    opponent = np.full((n_frames, n_players), np.nan)
+    teammate = np.full((n_frames, n_players), np.nan)
+    same_team = teams[:, None] == teams[None, :]
+    other_teammate = same_team & ~np.eye(n_players, dtype=bool)
+
+    block = max(1, BLOCK_PAIRS // max(1, n_players * n_players))
+    for lo in range(0, n_frames, block):
+        pos = positions[lo:lo + block]
+        diff = pos[:, :, None, :] - pos[:, None, :, :]
+        dist = np.hypot(diff[..., 0], diff[..., 1])
+        # Players without a sample have NaN distances and never win the minimum
+        dist = np.where(np.isnan(dist), np.inf, dist)
+        opponent[lo:lo + block] = np.where(same_team, np.inf, dist).min(axis=2)
+        teammate[lo:lo + block] = np.where(other_teammate, dist, np.inf).min(axis=2)
+    opponent[np.isinf(opponent)] = np.nan
+    teammate[np.isinf(teammate)] = np.nan
+    return opponent, teammate
+
+
+def _nearest_kdtree(positions, teams):
+    n_frames, n_players, _ = positions.shape
+    opponent = np.full((n_frames, n_players), np.nan)
+    teammate = np.full((n_frames, n_players), np.nan)
+    team_ids = np.unique(teams)
+    for f in range(n_frames):
+        present = ~np.isnan(positions[f, :, 0])
+        for team in team_ids:
+            own = np.flatnonzero(present & (teams == team))
+            others = np.flatnonzero(present & (teams != team))
+            if not len(own):
+                continue
+            if len(others):
+                opponent[f, own] = spatial.cKDTree(positions[f, others]).query(positions[f, own])[0]
+            if len(own) > 1:
+                # The closest point of the own team is the player itself
+                teammate[f, own] = spatial.cKDTree(positions[f, own]).query(positions[f, own], k=2)[0][:, 1]
+    return opponent, teammate
+
+
+def nearest_distances(df, team=None, basket=BASKET, method='auto'):
+    """
+    Nearest-opponent, nearest-teammate and basket distance of every row.
+
+    Args:
+        df: Samples with `time`, `player`, `x` and `y`.
+        team: Column with the team of every row; by default the first
+            character of the player id ('A' offense, 'D' defense).
+        method: 'dense' (batched pairwise distances), 'kdtree' (per frame),
+            or 'auto' to pick by the number of players.
+
+    Returns:
+        Frame aligned with `df` with the `PROXIMITY_COLUMNS`.
+    """
+    positions, times, players, time_codes, player_codes = position_tensor(df)
+    team_of_row = df[team] if team is not None else df['player'].astype(str).str[0]
+    teams = pd.factorize(pd.Series(team_of_row.to_numpy()).groupby(player_codes).first())[0]
+
+    if method == 'auto':
+        method = 'kdtree' if len(players) >= KDTREE_MIN_PLAYERS else 'dense'
+    nearest = _nearest_kdtree if method == 'kdtree' else _nearest_dense
+    opponent, teammate = nearest(positions, teams)
+
+    return pd.DataFrame({
+        'nearest_opponent': opponent[time_codes, player_codes],
+        'nearest_teammate': teammate[time_codes, player_codes],
+        'basket_distance': np.hypot(df['x'].to_numpy(np.float64) - basket[0],
+                                    df['y'].to_numpy(np.float64) - basket[1]),
+    }, index=df.index)
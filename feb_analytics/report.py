@@ -0,0 +1,108 @@
+"""
+Headless rendering of dashboard pages into static HTML.
+
+Pages draw their charts through `figure_cache.cached_plotly_chart` and
+`profiling.plotly_chart`, which hand every figure to `show_figure`. Inside a
+`capture_figures()` block the figures are collected instead of being sent to
+Streamlit, so a page's render() function can run without a browser session
+(Streamlit "bare mode", where the other st.* calls are no-ops) and its charts
+be written to a static HTML bundle.
+
+Bundle layout:
+    <out>/plotly.min.js     shared by every page of the bundle
+    <out>/<page>.html       one self-contained page per report
+"""
+
+import html
+import os
+import threading
+from contextlib import contextmanager
+
+from feb_analytics.lazy import lazy_import
+
+st = lazy_import('streamlit')
+
+PLOTLY_JS = 'plotly.min.js'
+
+_local = threading.local()
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1200px; color: #222; }}
+nav a {{ margin-right: 1rem; }}
+section.page {{ border-top: 2px solid #FF6B6B; margin-top: 2rem; }}
+p.error {{ color: #B00020; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{nav}
+{body}
+</body>
+</html>
+"""
+
+
+@contextmanager
+def capture_figures():
+    """Collects the (name, figure) pairs shown by pages instead of rendering them."""
+    figures = []
+    previous = getattr(_local, 'figures', None)
+    _local.figures = figures
+    try:
+        yield figures
+    finally:
+        _local.figures = previous
+
+
+def show_figure(fig, name=None, **kwargs):
+    """st.plotly_chart, or records the figure inside a `capture_figures()` block."""
+    figures = getattr(_local, 'figures', None)
+    if figures is None:
+        return st.plotly_chart(fig, **kwargs)
+    figures.append((name or fig.layout.title.text or f"Chart {len(figures) + 1}", fig))
+
+
+def figure_html(name, fig):
+    """HTML fragment of one chart; plotly.js is loaded once by the page."""
+    return (f'<figure><figcaption>{html.escape(name)}</figcaption>'
+            f'{fig.to_html(full_html=False, include_plotlyjs=False)}</figure>')
+
+
+def error_html(message):
+    """HTML fragment reporting a page that failed to render."""
+    return f'<p class="error"><strong>Failed to render:</strong> {html.escape(message)}</p>'
+
+
+def write_plotly_js(out_dir):
+    """Writes the plotly.js bundle the report pages reference."""
+    from plotly.offline import get_plotlyjs
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, PLOTLY_JS), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+
+def write_page(path, title, sections, links=(), plotly_js=PLOTLY_JS):
+    """
+    Writes a report page.
+
+    Args:
+        sections: (heading, [chart html fragments]) pairs.
+        links: (label, href) pairs of the navigation bar.
+        plotly_js: path of plotly.min.js relative to the page.
+    """
+    body = []
+    for heading, fragments in sections:
+        content = '\n'.join(fragments) if fragments else '<p><em>No charts for this selection.</em></p>'
+        body.append(f'<section class="page"><h2>{html.escape(heading)}</h2>\n{content}\n</section>')
+    nav = ' '.join(f'<a href="{html.escape(href)}">{html.escape(label)}</a>' for label, href in links)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_PAGE_TEMPLATE.format(title=html.escape(title), plotly_js=plotly_js,
+                                      nav=f'<nav>{nav}</nav>' if nav else '', body='\n'.join(body)))
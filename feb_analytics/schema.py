@@ -0,0 +1,137 @@
+"""
+Compact dtype schema of the integrated dataset and its derived columns.
+
+Dashboard workers each hold the integrated dataset with its features, so
+per-process memory is dominated by string columns parsed as Python objects
+and by float64 measurements. Every known column is mapped to a compact dtype:
+labels to categoricals, measurements and derived scores to float32, counters
+and flags to small integers or bool. `time` stays float64 since it is the join
+key of the per-time lookups (carrier series, shot times, event windows).
+
+The schema is applied when a source CSV is parsed (`read_csv`) and to the
+outputs of every feature step (`enforce_schema`), so the frames kept by the
+feature store and the dashboards never hold the wide dtypes.
+
+Usage (memory of a source with all features, before and after):
+    python -m feb_analytics.schema test_3/data/integrated_dataset.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+COLUMN_DTYPES = {
+    # Source columns (integrated_dataset.csv)
+    'time': 'float64',
+    'player': 'category',
+    'x': 'float32',
+    'y': 'float32',
+    'action': 'category',
+    'heart_rate': 'int16',
+    'velocity': 'float32',
+    'acceleration': 'float32',
+    'player_load': 'float32',
+    'zone': 'category',
+    'dist_to_basket': 'float32',
+    'role': 'category',
+    'action_type': 'category',
+    # Feature steps (features.FEATURE_STEPS)
+    'position': 'category',
+    'metabolic_power': 'float32',
+    'high_intensity_burst': 'int8',
+    'success': 'float32',
+    'shot_prob': 'float32',
+    'zone_shot': 'category',
+    'tactical_situation': 'category',
+    'exertion_index': 'float32',
+    'recovery_phase': 'category',
+    'offensive_eff': 'float32',
+    'defensive_eff': 'float32',
+    'ball_handler': 'bool',
+    'possession_id': 'int32',
+    'hr_stress_index': 'float32',
+    'effective_distance': 'float32',
+    'spacing_index': 'float32',
+    'nearest_opponent': 'float32',
+    'nearest_teammate': 'float32',
+    'closeout_distance': 'float32',
+    'rebound_score': 'float32',
+    'fatigue_slope': 'float32',
+    'fatigue_index': 'float32',
+    'recovery_rate': 'float32',
+    'player_load_per_min': 'float32',
+}
+
+
+def _compact(series, dtype):
+    if dtype == 'category':
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    if np.dtype(dtype).kind in 'iub' and series.isna().any():
+        # Integer columns with gaps keep NaN as float32
+        dtype = 'float32'
+    return series if series.dtype == dtype else series.astype(dtype)
+
+
+def enforce_schema(df, columns=None):
+    """
+    Converts the known columns of `df` (or only `columns`) to their compact
+    dtypes in place. Unknown columns are left as they are. Returns `df`.
+    """
+    for col in (df.columns if columns is None else columns):
+        dtype = COLUMN_DTYPES.get(col)
+        if dtype is not None:
+            df[col] = _compact(df[col], dtype)
+    return df
+
+
+def _parse_dtype(dtype):
+    # Integers are parsed as float32 in case of missing values and narrowed afterwards
+    if dtype != 'category' and np.dtype(dtype).kind in 'iub':
+        return 'float32'
+    return dtype
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv that parses the known columns directly into their compact dtypes."""
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: _parse_dtype(COLUMN_DTYPES[col]) for col in header if col in COLUMN_DTYPES}
+    return enforce_schema(pd.read_csv(path, dtype=dtypes, **kwargs))
+
+
+def memory_mb(df):
+    """Deep memory of a frame in MB."""
+    return df.memory_usage(deep=True, index=True).sum() / 2 ** 20
+
+
+def memory_report(before, after):
+    """Per-column dtype and memory (MB) of two versions of a frame, with a total row."""
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'mb_before': before.memory_usage(deep=True, index=False) / 2 ** 20,
+        'dtype_after': after.dtypes.reindex(before.columns).astype(str),
+        'mb_after': after.memory_usage(deep=True, index=False).reindex(before.columns) / 2 ** 20,
+    })
+    report.loc['total'] = ['', memory_mb(before), '', memory_mb(after)]
+    return report
+
+
+def main():
+    from feb_analytics.features import build_features
+
+    parser = argparse.ArgumentParser(description="Memory of a dataset with all features, before and after the schema.")
+    parser.add_argument('path', help='integrated dataset CSV')
+    args = parser.parse_args()
+
+    before = build_features(pd.read_csv(args.path), compact=False)
+    after = build_features(read_csv(args.path))
+    report = memory_report(before, after)
+    with pd.option_context('display.max_rows', None, 'display.float_format', '{:.3f}'.format):
+        print(report)
+    total = report.loc['total']
+    print(f"\n{total['mb_before']:.2f} MB -> {total['mb_after']:.2f} MB "
+          f"({total['mb_after'] / total['mb_before']:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Monte Carlo shot outcomes with confidence intervals for expected FG%.
+
+`features.add_shot_outcomes` draws one make/miss per shot, so an FG% computed
+from `success` is a single noisy sample. Here the outcomes of every shot are
+replicated many times from the shots' make probabilities (`shot_prob`) with
+a seeded generator, and the expected FG% of a grouping and its confidence
+interval are reductions over the replication axis.
+
+The makes of a group are a sum of Bernoulli draws, so shots of the same group
+and probability are drawn together as one binomial count per replication.
+`shot_prob` takes one value per shot zone, so the cost grows with the number
+of (group, probability) cells rather than with the number of shots; blocks of
+replications bound the memory when the probabilities are all distinct.
+"""
+
+import numpy as np
+import pandas as pd
+
+from feb_analytics.features import SHOT_SEED
+
+N_REPLICATIONS = 2000
+# Replications per block are chosen so a block holds about this many draws
+BLOCK_DRAWS = 2 ** 22
+
+
+def replicate_group_makes(probs, codes, n_groups, n_reps=N_REPLICATIONS, seed=SHOT_SEED):
+    """
+    Simulated makes of every group in every replication.
+
+    Args:
+        probs: Make probability of every shot.
+        codes: Group of every shot in [0, n_groups); negative codes are
+            not counted.
+        n_groups: Number of groups.
+
+    Returns:
+        (n_reps, n_groups) array of make counts.
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    codes = np.asarray(codes)
+    counts = np.zeros((n_reps, n_groups))
+    keep = codes >= 0
+    if not keep.any():
+        return counts
+    # One binomial cell per distinct (group, probability) pair
+    cells = pd.DataFrame({'group': codes[keep], 'prob': probs[keep]}).value_counts(sort=False).reset_index()
+    cells = cells.sort_values(['group', 'prob'], kind='stable')
+    groups = cells['group'].to_numpy(np.int64)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+    rng = np.random.default_rng(seed)
+    block = max(1, BLOCK_DRAWS // len(cells))
+    for lo in range(0, n_reps, block):
+        hi = min(lo + block, n_reps)
+        makes = rng.binomial(cells['count'].to_numpy(np.int64), cells['prob'].to_numpy(), size=(hi - lo, len(cells)))
+        counts[lo:hi, groups[starts]] = np.add.reduceat(makes, starts, axis=1)
+    return counts
+
+
+def interval(values, ci=0.95):
+    """Mean and (lo, hi) quantile bounds over the replication axis (axis 0), ignoring NaN."""
+    alpha = (1 - ci) / 2
+    defined = np.isfinite(values).any(axis=0)
+    mean = np.full(values.shape[1:], np.nan)
+    bounds = np.full((2,) + values.shape[1:], np.nan)
+    if defined.any():
+        mean[defined] = np.nanmean(values[:, defined], axis=0)
+        bounds[:, defined] = np.nanquantile(values[:, defined], [alpha, 1 - alpha], axis=0)
+    return mean, bounds[0], bounds[1]
+
+
+def expected_fg(shots, by, prob='shot_prob', n_reps=N_REPLICATIONS, ci=0.95, seed=SHOT_SEED):
+    """
+    Expected FG% with a Monte Carlo confidence interval for every group of shots.
+
+    Args:
+        shots: Shot rows with their make probability in `prob`.
+        by: Column(s) to group by (rows with a missing key are left out).
+
+    Returns:
+        Frame with the `by` columns, `shots` (attempts), `fg_expected`,
+        `fg_lo` and `fg_hi`, one row per observed group in sorted order.
+    """
+    grouped = shots.groupby(by, observed=True, sort=True)
+    codes = grouped.ngroup().fillna(-1).to_numpy(np.int64)
+    attempts = grouped.size()
+    made = replicate_group_makes(shots[prob].to_numpy(np.float64), codes, len(attempts), n_reps, seed)
+    fg_expected, fg_lo, fg_hi = interval(made / attempts.to_numpy(np.float64), ci)
+
+    result = attempts.rename('shots').reset_index()
+    result['fg_expected'] = fg_expected
+    result['fg_lo'] = fg_lo
+    result['fg_hi'] = fg_hi
+    return result
@@ -0,0 +1,75 @@
+"""
+Heart-rate threshold sweep for shooting efficiency.
+
+Shots are binned once on the threshold grid, so FG% below and above every
+threshold comes from cumulative sums of per-bin makes and attempts. The makes
+of every bin are replicated by Monte Carlo from the shots' make probabilities
+(`shot_simulation`, one binomial draw per bin and probability), so the curves
+and confidence bands of all thresholds and replications are computed in one
+batch whose cost does not grow with the number of shots.
+"""
+
+import numpy as np
+import pandas as pd
+
+from feb_analytics.shot_simulation import N_REPLICATIONS, SHOT_SEED, interval, replicate_group_makes
+
+
+def _fg_curves(made, attempts):
+    """FG% below/above every threshold from per-bin counts (last axis = bins)."""
+    made_below = np.cumsum(made, axis=-1)[..., :-1]
+    att_below = np.cumsum(attempts, axis=-1)[..., :-1]
+    made_above = made.sum(axis=-1, keepdims=True) - made_below
+    att_above = attempts.sum(axis=-1, keepdims=True) - att_below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        below = np.where(att_below > 0, made_below / att_below, np.nan)
+        above = np.where(att_above > 0, made_above / att_above, np.nan)
+    return below, above, att_below, att_above
+
+
+def _threshold_bins(hr, thresholds, step):
+    """Sorted threshold grid and the bin of every shot (bin b: thresholds[b-1] <= HR < thresholds[b])."""
+    if thresholds is None:
+        lo = np.floor(hr.min() / step) * step if len(hr) else 0.0
+        hi = np.ceil(hr.max() / step) * step if len(hr) else 0.0
+        thresholds = np.arange(lo, hi + step / 2, step)
+    thresholds = np.sort(np.asarray(thresholds, dtype=np.float64))
+    return thresholds, np.searchsorted(thresholds, hr, side='right')
+
+
+def expected_threshold_sweep(heart_rate, shot_prob, thresholds=None, step=1.0, n_reps=N_REPLICATIONS,
+                             ci=0.95, seed=SHOT_SEED):
+    """
+    Expected FG% below (HR < threshold) and above (HR >= threshold) for every threshold.
+
+    The outcome of every shot is replicated `n_reps` times from its make
+    probability (see `shot_simulation`); the below/above curves of every
+    replication come from the per-bin make counts, and each metric is the
+    mean over replications with quantile bounds.
+
+    Args:
+        heart_rate: HR of every shot.
+        shot_prob: Make probability of every shot.
+        thresholds: Threshold grid; by default every `step` bpm across the
+            observed HR range.
+        ci: Confidence level of the bands.
+
+    Returns:
+        Frame with one row per threshold: `threshold`, `fg_below`, `fg_above`,
+        `difference` (below - above), the shot counts `n_below`/`n_above` and
+        `<metric>_lo`/`<metric>_hi` bounds of each metric.
+    """
+    hr = np.asarray(heart_rate, dtype=np.float64)
+    thresholds, bins = _threshold_bins(hr, thresholds, step)
+    n_bins = len(thresholds) + 1
+    att_bins = np.bincount(bins, minlength=n_bins).astype(np.float64)
+    made = replicate_group_makes(shot_prob, bins, n_bins, n_reps, seed)
+    rep_below, rep_above, n_below, n_above = _fg_curves(made, att_bins)
+
+    result = pd.DataFrame({'threshold': thresholds,
+                           'n_below': n_below.astype(np.int64), 'n_above': n_above.astype(np.int64)})
+    for name, values in (('fg_below', rep_below), ('fg_above', rep_above),
+                         ('difference', rep_below - rep_above)):
+        result[name], result[f'{name}_lo'], result[f'{name}_hi'] = interval(values, ci)
+    return result[['threshold', 'fg_below', 'fg_above', 'difference', 'n_below', 'n_above',
+                   'fg_below_lo', 'fg_below_hi', 'fg_above_lo', 'fg_above_hi', 'difference_lo', 'difference_hi']]
@@ -0,0 +1,289 @@
+"""
+Embedded analytical warehouse for multi-game data.
+
+Games imported from the CSV layouts of the prototypes are stored in one
+SQLite file, one table per layout with a `game_id` column and indexes on
+(game, player, time). Loaders read a single game, and optionally a subset of
+players, a time range and actions, with the filters pushed down as SQL, so a
+dashboard rerun reads only the rows it needs instead of parsing whole CSVs.
+
+Tables (columns are those of the source CSV plus `game_id`):
+    samples          test_3 / test_4 integrated_dataset.csv
+    physical         test_1 datos_fisicos_realistas.csv
+    tactical_labels  test_1 etiquetas_tacticas_realistas.csv (intervals inicio-fin)
+    tracking         test_2 positions.csv
+    ball             test_2 ball.csv
+    player_metrics   test_2 metrics.csv
+    games            game_id, table_name, source, rows, imported_at
+    players          game_id, table_name, player
+
+The warehouse is used by the dashboards when it exists (FEB_WAREHOUSE, by
+default <root>/warehouse/feb.sqlite); otherwise they read their CSVs.
+
+Usage:
+    python -m feb_analytics.warehouse import test_3/data --game <id> [--db PATH]
+    python -m feb_analytics.warehouse import a.csv --table samples --game <id>
+    python -m feb_analytics.warehouse games [--db PATH]
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_DB_PATH = os.environ.get('FEB_WAREHOUSE', os.path.join(ROOT_DIR, 'warehouse', 'feb.sqlite'))
+CHUNK_ROWS = 200_000
+
+# Table layouts: source file names and the columns filters are pushed down to
+# (`end` marks interval tables, matched by overlap with the time range)
+TABLES = {
+    'samples': {'files': ['integrated_dataset.csv'], 'player': 'player', 'time': 'time', 'action': 'action'},
+    'physical': {'files': ['datos_fisicos_realistas.csv'], 'player': 'jugador', 'time': 'tiempo'},
+    'tactical_labels': {'files': ['etiquetas_tacticas_realistas.csv'], 'player': 'jugador',
+                        'time': 'inicio', 'end': 'fin', 'action': 'accion'},
+    'tracking': {'files': ['positions.csv'], 'player': 'player_id', 'time': 'time'},
+    'ball': {'files': ['ball.csv'], 'time': 'time'},
+    'player_metrics': {'files': ['metrics.csv'], 'player': 'player_id'},
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT NOT NULL, table_name TEXT NOT NULL, source TEXT,
+    rows INTEGER, imported_at REAL, PRIMARY KEY (game_id, table_name)
+);
+CREATE TABLE IF NOT EXISTS players (
+    game_id TEXT NOT NULL, table_name TEXT NOT NULL, player TEXT NOT NULL,
+    PRIMARY KEY (game_id, table_name, player)
+);
+"""
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect(db_path=None):
+    """Opens the warehouse, creating the file and catalog tables if needed."""
+    db_path = db_path or DEFAULT_DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    con = sqlite3.connect(db_path)
+    con.executescript(_SCHEMA)
+    return con
+
+
+def exists(db_path=None):
+    return os.path.exists(db_path or DEFAULT_DB_PATH)
+
+
+def _columns(con, table):
+    return [row[1] for row in con.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def _sql_type(dtype):
+    # Column affinity of a pandas dtype (as pandas.to_sql would declare it)
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _ensure_table(con, table, chunk):
+    """
+    Creates `table` from the columns of `chunk`, or adds the columns it lacks.
+
+    Plain DDL on `con`, so it belongs to the caller's transaction.
+    """
+    spec = TABLES[table]
+    existing = _columns(con, table)
+    if not existing:
+        columns = [f"{_quote(col)} {_sql_type(dtype)}" for col, dtype in chunk.dtypes.items()]
+        con.execute(f"CREATE TABLE {_quote(table)} ({', '.join(columns)}, game_id TEXT)")
+        keys = [spec[k] for k in ('player', 'time') if k in spec]
+        con.execute(f"CREATE INDEX {_quote(f'ix_{table}_game')} ON {_quote(table)} "
+                    f"(game_id{''.join(', ' + _quote(k) for k in keys)})")
+        if 'time' in spec:
+            con.execute(f"CREATE INDEX {_quote(f'ix_{table}_time')} ON {_quote(table)} "
+                        f"(game_id, {_quote(spec['time'])})")
+        return
+    for col, dtype in chunk.dtypes.items():
+        if col not in existing:
+            con.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)} {_sql_type(dtype)}")
+
+
+def _insert_chunk(con, table, chunk, game):
+    # Python scalars with None for missing values, as sqlite3 expects
+    values = chunk.astype(object).where(chunk.notna(), None)
+    columns = [*chunk.columns, 'game_id']
+    con.executemany(f"INSERT INTO {_quote(table)} ({', '.join(_quote(col) for col in columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})",
+                    (row + (game,) for row in values.itertuples(index=False, name=None)))
+
+
+def import_csv(path, table, game, db_path=None, chunksize=CHUNK_ROWS):
+    """
+    Bulk-loads one CSV into `table` for `game`, replacing a previous import.
+
+    The file is streamed in chunks inside one transaction (the table DDL, the
+    rows and the `games`/`players` catalog rows included), so readers see
+    either the previous or the new rows of the game; a file that fails to
+    parse leaves the previous import untouched. Returns the row count.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}'. Expected one of {list(TABLES)}")
+    player_col = TABLES[table].get('player')
+    con = connect(db_path)
+    try:
+        with con:
+            con.execute("BEGIN")
+            if _columns(con, table):
+                con.execute(f"DELETE FROM {_quote(table)} WHERE game_id = ?", (game,))
+            con.execute("DELETE FROM players WHERE game_id = ? AND table_name = ?", (game, table))
+            rows = 0
+            players = set()
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                _ensure_table(con, table, chunk)
+                _insert_chunk(con, table, chunk, game)
+                rows += len(chunk)
+                if player_col:
+                    players.update(chunk[player_col].dropna().astype(str).unique())
+            con.executemany("INSERT INTO players VALUES (?, ?, ?)",
+                            [(game, table, player) for player in sorted(players)])
+            con.execute("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?)",
+                        (game, table, os.path.abspath(path), rows, time.time()))
+        con.execute("ANALYZE")
+    finally:
+        con.close()
+    return rows
+
+
+def import_dir(directory, game, db_path=None):
+    """Imports every known CSV layout found in `directory`. Returns {table: rows}."""
+    imported = {}
+    for table, spec in TABLES.items():
+        for name in spec['files']:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                imported[table] = import_csv(path, table, game, db_path)
+    return imported
+
+
+def list_games(table=None, db_path=None):
+    """Ids of the imported games (with data in `table`, if given)."""
+    if not exists(db_path):
+        return []
+    con = connect(db_path)
+    try:
+        if table is None:
+            rows = con.execute("SELECT DISTINCT game_id FROM games ORDER BY game_id")
+        else:
+            rows = con.execute("SELECT game_id FROM games WHERE table_name = ? ORDER BY game_id", (table,))
+        return [row[0] for row in rows]
+    finally:
+        con.close()
+
+
+def list_players(table, game, db_path=None):
+    con = connect(db_path)
+    try:
+        rows = con.execute("SELECT player FROM players WHERE game_id = ? AND table_name = ?", (game, table))
+        return [row[0] for row in rows]
+    finally:
+        con.close()
+
+
+def game_version(table, game, db_path=None):
+    """Identifies one import of a game (changes when it is re-imported)."""
+    con = connect(db_path)
+    try:
+        row = con.execute("SELECT rows, imported_at FROM games WHERE game_id = ? AND table_name = ?",
+                          (game, table)).fetchone()
+    finally:
+        con.close()
+    if row is None:
+        raise KeyError(f"Game '{game}' has no '{table}' data in the warehouse")
+    return f"{table}:{game}:{row[0]}:{row[1]!r}"
+
+
+def query(table, game=None, players=None, time_range=None, actions=None, columns=None, db_path=None):
+    """
+    Rows of `table` matching the filters, in import order, without `game_id`.
+
+    Args:
+        game: Game id; all games when None.
+        players: Player ids to keep (compared with the table's player column).
+        time_range: (start, end) inclusive; interval tables keep the rows
+            whose interval overlaps it.
+        actions: Actions to keep.
+        columns: Columns to read (all by default).
+    """
+    spec = TABLES[table]
+    where, params = [], []
+    if game is not None:
+        where.append("game_id = ?")
+        params.append(game)
+    if players is not None:
+        players = list(players)
+        where.append(f"{_quote(spec['player'])} IN ({', '.join('?' * len(players))})")
+        params.extend(players)
+    if time_range is not None:
+        start, end = time_range
+        where.append(f"{_quote(spec.get('end', spec['time']))} >= ? AND {_quote(spec['time'])} <= ?")
+        params.extend([start, end])
+    if actions is not None:
+        actions = list(actions)
+        where.append(f"{_quote(spec['action'])} IN ({', '.join('?' * len(actions))})")
+        params.extend(actions)
+
+    con = connect(db_path)
+    try:
+        if columns is None:
+            columns = [col for col in _columns(con, table) if col != 'game_id']
+        sql = f"SELECT {', '.join(_quote(col) for col in columns)} FROM {_quote(table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return pd.read_sql_query(sql + " ORDER BY rowid", con, params=params)
+    finally:
+        con.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='warehouse file')
+    commands = parser.add_subparsers(dest='command', required=True)
+    load = commands.add_parser('import', help='bulk-load CSV files or data directories')
+    load.add_argument('paths', nargs='+', help='CSV files or directories with the known layouts')
+    load.add_argument('--game', required=True, help='game id the rows are stored under')
+    load.add_argument('--table', choices=list(TABLES), help='table of the CSV files (default: by file name)')
+    commands.add_parser('games', help='list the imported games')
+    args = parser.parse_args()
+
+    if args.command == 'games':
+        con = connect(args.db)
+        try:
+            for game, table, rows in con.execute("SELECT game_id, table_name, rows FROM games ORDER BY 1, 2"):
+                print(f"{game:20s} {table:16s} {rows:>10d} rows")
+        finally:
+            con.close()
+        return
+
+    by_name = {name: table for table, spec in TABLES.items() for name in spec['files']}
+    for path in args.paths:
+        if os.path.isdir(path):
+            imported = import_dir(path, args.game, args.db)
+            if not imported:
+                print(f"{path}: no known CSV layouts")
+            for table, rows in imported.items():
+                print(f"{path} -> {table}: {rows} rows")
+            continue
+        table = args.table or by_name.get(os.path.basename(path))
+        if table is None:
+            parser.error(f"cannot infer the table of {path}; pass --table")
+        print(f"{path} -> {table}: {import_csv(path, table, args.game, args.db)} rows")
+
+
+if __name__ == '__main__':
+    main()
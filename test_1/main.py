@@ -1,5 +1,8 @@
 # main.py (versión avanzada para demo profesional Streamlit)
 
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 from scripts.load_data import cargar_datos_fisicos, cargar_etiquetas_tacticas
@@ -21,20 +24,41 @@ from scripts.visualizations import (
     curvas_fatiga
 )
 
+# Paquete compartido feb_analytics (raíz del repositorio; scripts/ ya lo añade al path)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics import warehouse
+from feb_analytics.profiling import plotly_chart, start_profile
+
 st.set_page_config(page_title="Mapa de Rendimiento Táctico", layout="wide")
 st.title("📊 Mapa de Rendimiento Táctico – Selección Española Masculina")
 
+# Perfil de tiempos de este rerun (se activa con FEB_PROFILE=1 o ?profile=1)
+profile = start_profile('test_1')
+
 # --- Cargar datos ---
-df_fisicos = cargar_datos_fisicos()
-df_etiquetas = cargar_etiquetas_tacticas()
-df_merged = fusionar_datos_con_acciones(df_fisicos, df_etiquetas)
+# Partidos importados en el almacén analítico; si no hay ninguno, los CSV de data/
+partidos = warehouse.list_games("physical")
+partido_sel = st.sidebar.selectbox("🏟️ Partido", partidos) if partidos else None
+with profile.stage('load'):
+    df_fisicos = cargar_datos_fisicos(partido=partido_sel)
+    df_etiquetas = cargar_etiquetas_tacticas(partido=partido_sel)
+with profile.stage('merge'):
+    df_merged = fusionar_datos_con_acciones(df_fisicos, df_etiquetas)
 
 # --- Calcular métricas avanzadas ---
-df_metricas = calcular_metricas_avanzadas(df_merged)
-tasa_exito_df = calcular_tasa_exito_por_jugador(df_etiquetas)
-combos_df = detectar_combinaciones(df_etiquetas)
-fatiga_df = detectar_fatiga(df_fisicos)
-resumen_resultados = resumen_fisico_vs_resultado(df_merged)
+with profile.stage('features:metricas_avanzadas'):
+    df_metricas = calcular_metricas_avanzadas(df_merged)
+with profile.stage('features:tasa_exito'):
+    tasa_exito_df = calcular_tasa_exito_por_jugador(df_etiquetas)
+with profile.stage('features:combinaciones'):
+    combos_df = detectar_combinaciones(df_etiquetas)
+with profile.stage('features:fatiga'):
+    fatiga_df = detectar_fatiga(df_fisicos)
+with profile.stage('features:resumen_resultados'):
+    resumen_resultados = resumen_fisico_vs_resultado(df_merged)
 
 # --- Sidebar de control ---
 st.sidebar.header("🎯 Opciones de Análisis")
@@ -44,13 +68,14 @@ accion_sel = st.sidebar.selectbox("⚔️ Acción táctica", df_metricas["accion
 # --- Visualizaciones principales ---
 st.subheader(f"🔍 Análisis individual de {jugador_sel}")
 col1, col2 = st.columns(2)
-with col1:
+with col1, profile.chart('radar_jugador'):
     radar_jugador(df_metricas, jugador_sel)
-with col2:
+with col2, profile.chart('mapa_calor_zonas'):
     mapa_calor_zonas(df_metricas, jugador_sel)
 
 st.markdown("---")
-comparativa_equipo(df_metricas, accion_sel)
+with profile.chart('comparativa_equipo'):
+    comparativa_equipo(df_metricas, accion_sel)
 
 # --- Análisis avanzado ---
 st.markdown("## 🧠 Análisis Avanzado")
@@ -62,22 +87,25 @@ if tipo_opt == "Ofensivas":
     tipo_filtro = "ataque"
 elif tipo_opt == "Defensivas":
     tipo_filtro = "defensa"
-dispersion_resultados(df_merged, tipo_filtro)
+with profile.chart('dispersion_resultados'):
+    dispersion_resultados(df_merged, tipo_filtro)
 
 # Eficiencia ofensiva vs defensiva
 st.markdown("### 🎯 Tasa de Éxito Ofensivo vs Defensivo")
-posiciones = df_fisicos[["jugador", "posicion"]].drop_duplicates()
-df_tasas_plot = tasa_exito_df.merge(posiciones, on="jugador")
-dispersion_ofensivo_defensivo(df_tasas_plot)
+with profile.chart('dispersion_ofensivo_defensivo'):
+    posiciones = df_fisicos[["jugador", "posicion"]].drop_duplicates()
+    df_tasas_plot = tasa_exito_df.merge(posiciones, on="jugador")
+    dispersion_ofensivo_defensivo(df_tasas_plot)
 
 # Correlación táctica por jugador
 st.markdown("### 🧬 Correlación de Perfiles Tácticos")
-fig_corr_of, fig_corr_def = obtener_correlaciones_roles(df_etiquetas)
-colA, colB = st.columns(2)
-with colA:
-    st.plotly_chart(fig_corr_of)
-with colB:
-    st.plotly_chart(fig_corr_def)
+with profile.chart('correlaciones_roles'):
+    fig_corr_of, fig_corr_def = obtener_correlaciones_roles(df_etiquetas)
+    colA, colB = st.columns(2)
+    with colA:
+        plotly_chart(fig_corr_of)
+    with colB:
+        plotly_chart(fig_corr_def)
 
 # Combinaciones tácticas
 st.markdown("### 🔁 Jugadas Combinadas Detectadas")
@@ -94,7 +122,8 @@ if fatiga_jugadores:
 else:
     st.success("Ningún jugador mostró fatiga significativa en la sesión.")
 
-curvas_fatiga(df_fisicos, jugador_sel)
+with profile.chart('curvas_fatiga'):
+    curvas_fatiga(df_fisicos, jugador_sel)
 
 # Resumen físico por resultado
 tabla_resumen = resumen_resultados.style.background_gradient(cmap="RdYlGn", axis=0)
@@ -102,4 +131,6 @@ st.markdown("### 📊 Comparativa Física según Resultado de Acción")
 st.dataframe(tabla_resumen)
 
 st.markdown("---")
-st.caption("Prototipo desarrollado por AI Engineer – MVP táctico-físico para FEB 🏀")
\ No newline at end of file
+st.caption("Prototipo desarrollado por AI Engineer – MVP táctico-físico para FEB 🏀")
+
+profile.finish()
@@ -0,0 +1,224 @@
+# generar_datos.py (generador vectorizado de los datos de test_1; sustituye a generar_datos.ipynb)
+"""
+Genera datos físicos (GPS/HR) y etiquetas tácticas con el esquema de test_1
+para N jugadores × M sesiones × cualquier duración.
+
+Cada bloque de jugadores se genera con arrays (jugadores × muestras) y
+(jugadores × eventos), sin bucles por segundo ni por evento, y se añade al CSV
+antes de generar el siguiente, así la memoria depende del tamaño de bloque y no
+del total de filas. Con una sola sesión se escriben los CSV en la carpeta de
+salida; con varias, una subcarpeta por sesión (importable con
+`python -m feb_analytics.warehouse import <carpeta> --game <id>`).
+
+Uso (desde test_1):
+    python scripts/generar_datos.py                          # data/ como el notebook
+    python scripts/generar_datos.py --jugadores 100 --sesiones 10 --duracion 2400 --salida /tmp/test_1_100x
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+FICHERO_FISICOS = "datos_fisicos_realistas.csv"
+FICHERO_ETIQUETAS = "etiquetas_tacticas_realistas.csv"
+FILAS_POR_BLOQUE = 1_000_000
+
+# Jugadores con posición y probabilidad de estar en acciones de ataque (según rol)
+JUGADORES = [
+    ("Alberto Diaz", "Base", 0.4),            # Base defensivo
+    ("Alberto Abalde", "Escolta", 0.7),       # Escolta tirador
+    ("Joel Parra", "Alero", 0.5),             # Alero equilibrado
+    ("Santi Aldama", "Ala-pívot", 0.5),       # Ala-pívot versátil
+    ("Jaime Pradilla", "Ala-pívot", 0.5),     # Ala-pívot físico equilibrado
+    ("Sergio de Larrea", "Base", 0.7),        # Base ofensivo
+    ("Dario Brizuela", "Escolta", 0.8),       # Escolta anotador
+    ("Josep Puerto", "Alero", 0.6),           # Alero tirador
+    ("Juancho Hernangomez", "Ala-pívot", 0.7),  # Ala-pívot anotador
+    ("Willy Hernangomez", "Pívot", 0.7),      # Pívot ofensivo
+]
+POSICIONES = ["Base", "Escolta", "Alero", "Ala-pívot", "Pívot"]
+
+# Zonas de la pista y acciones posibles
+ZONAS = ["perímetro", "zona", "poste bajo", "línea de tres", "esquina", "media distancia", "zona central"]
+ACCIONES_OFENSIVAS = ["penetración", "tiro", "pase", "bloqueo directo (con balón)", "bloqueo directo (sin balón)", "corte"]
+ACCIONES_DEFENSIVAS = ["defensa balón", "ayuda", "defensa del bloqueo", "closeout", "rotación"]
+
+# Probabilidad de éxito por acción (el tiro depende de la zona)
+PROB_EXITO = {
+    "penetración": 0.55, "tiro": 0.5, "pase": 0.9, "bloqueo directo (con balón)": 0.7,
+    "bloqueo directo (sin balón)": 0.7, "corte": 0.6,
+    "defensa balón": 0.4, "ayuda": 0.5, "defensa del bloqueo": 0.5, "closeout": 0.4, "rotación": 0.5,
+}
+PROB_TIRO_EXTERIOR = 0.35  # tiros desde la línea de tres o la esquina
+ZONAS_EXTERIORES = ["línea de tres", "esquina"]
+
+# Jugadas colectivas fijas de cada sesión: bloqueo indirecto + corte (exitoso) y bloqueo directo +
+# penetración (fallido). Los eventos aleatorios de sus jugadores que se solapan con la ventana se eliminan
+JUGADAS_COLECTIVAS = [
+    {"ventana": (300, 307), "eventos": [
+        {"jugador": "Jaime Pradilla", "tipo": "ataque", "accion": "bloqueo directo (sin balón)",
+         "zona": "zona central", "inicio": 300, "fin": 307, "resultado": "Exito"},
+        {"jugador": "Alberto Abalde", "tipo": "ataque", "accion": "corte",
+         "zona": "zona", "inicio": 300, "fin": 305, "resultado": "Exito"}]},
+    {"ventana": (200, 206), "eventos": [
+        {"jugador": "Santi Aldama", "tipo": "ataque", "accion": "bloqueo directo (con balón)",
+         "zona": "zona central", "inicio": 200, "fin": 206, "resultado": "Fallo"},
+        {"jugador": "Sergio de Larrea", "tipo": "ataque", "accion": "penetración",
+         "zona": "zona", "inicio": 201, "fin": 206, "resultado": "Fallo"}]},
+]
+
+
+def plantilla(n_jugadores):
+    """Nombre, posición y probabilidad ofensiva de cada jugador (los 10 reales y, después, sintéticos)."""
+    filas = JUGADORES[:n_jugadores]
+    for i in range(len(filas), n_jugadores):
+        filas.append((f"Jugador {i + 1}", POSICIONES[i % len(POSICIONES)], 0.5))
+    return pd.DataFrame(filas, columns=["jugador", "posicion", "prob_ofensivo"])
+
+
+def generar_fisicos(jugadores, duracion, hz, rng):
+    """
+    Series físicas de un bloque de jugadores (una fila por jugador y muestra).
+
+    HR sube y velocidad/aceleración bajan con el tiempo (fatiga); la posición
+    es un paseo aleatorio en una cancha de 28x15 m.
+    """
+    n = int(round(duracion * hz))
+    p = len(jugadores)
+    exterior = jugadores["posicion"].isin(["Base", "Escolta"]).to_numpy()[:, None]
+    base_hr = np.where(exterior, 140, 135)
+    base_vel = np.where(exterior, 5.2, 4.8)  # m/s
+    base_acel = np.where(exterior, 1.7, 1.4)  # m/s^2
+
+    hr = np.clip(rng.normal(base_hr, 8, (p, n)) + np.linspace(0, 10, n), 110, 190)
+    velocidad = np.abs(rng.normal(base_vel, 1.0, (p, n)) - np.linspace(0, 0.5, n))
+    aceleracion = np.abs(rng.normal(base_acel, 0.4, (p, n)) - np.linspace(0, 0.2, n))
+    # Pasos del paseo escalados para conservar la dispersión por segundo con cualquier frecuencia
+    x_pos = np.clip(np.cumsum(rng.normal(0, 0.5 / np.sqrt(hz), (p, n)), axis=1), 0, 28)
+    y_pos = np.clip(np.cumsum(rng.normal(0, 0.4 / np.sqrt(hz), (p, n)), axis=1), 0, 15)
+
+    tiempo = np.arange(n) if hz == 1 else np.arange(n) / hz
+    return pd.DataFrame({
+        "jugador": np.repeat(jugadores["jugador"].to_numpy(), n),
+        "posicion": np.repeat(jugadores["posicion"].to_numpy(), n),
+        "tiempo": np.tile(tiempo, p),
+        "hr": hr.ravel(),
+        "velocidad": velocidad.ravel(),
+        "aceleracion": aceleracion.ravel(),
+        "playerload": (velocidad * aceleracion).ravel(),  # carga física instantánea
+        "x_pos": x_pos.ravel(),
+        "y_pos": y_pos.ravel(),
+    })
+
+
+def generar_etiquetas(jugadores, duracion, rng):
+    """
+    Eventos tácticos de un bloque de jugadores, consecutivos y sin solaparse.
+
+    Cada evento dura 4-12 s y va seguido de una pausa de 1-5 s; se generan
+    eventos mientras el inicio sea anterior a `duracion - 10`.
+    """
+    p = len(jugadores)
+    k = int(np.ceil(max(duracion - 10, 0) / 5)) + 1  # cota del nº de eventos (paso mínimo de 5 s)
+    dur = rng.integers(4, 13, (p, k))
+    pausa = rng.integers(1, 6, (p, k))
+    inicio = np.cumsum(dur + pausa, axis=1) - (dur + pausa)
+    valido = inicio < duracion - 10
+
+    ataque = rng.random((p, k)) < jugadores["prob_ofensivo"].to_numpy()[:, None]
+    accion = np.where(ataque,
+                      np.array(ACCIONES_OFENSIVAS, dtype=object)[rng.integers(0, len(ACCIONES_OFENSIVAS), (p, k))],
+                      np.array(ACCIONES_DEFENSIVAS, dtype=object)[rng.integers(0, len(ACCIONES_DEFENSIVAS), (p, k))])
+    zona = np.array(ZONAS, dtype=object)[rng.integers(0, len(ZONAS), (p, k))]
+    etiquetas = pd.DataFrame({
+        "jugador": np.repeat(jugadores["jugador"].to_numpy(), k),
+        "tipo": np.where(ataque, "ataque", "defensa").ravel(),
+        "accion": accion.ravel(),
+        "zona": zona.ravel(),
+        "inicio": inicio.ravel(),
+        "fin": np.minimum(inicio + dur, duracion).ravel(),
+        "exito": rng.random(p * k),
+    })[valido.ravel()]
+
+    prob = etiquetas["accion"].map(PROB_EXITO)
+    prob = prob.mask((etiquetas["accion"] == "tiro") & etiquetas["zona"].isin(ZONAS_EXTERIORES), PROB_TIRO_EXTERIOR)
+    etiquetas["resultado"] = np.where(etiquetas.pop("exito") < prob, "Exito", "Fallo")
+    return etiquetas.reset_index(drop=True)
+
+
+def insertar_jugadas_colectivas(etiquetas, jugadores, duracion):
+    """
+    Sustituye los eventos que se solapan con las jugadas colectivas por las propias jugadas.
+
+    Se aplica jugador a jugador: cada jugador de `jugadores` (el bloque) recibe
+    su parte de la jugada aunque sus compañeros estén en otro bloque, así las
+    etiquetas no dependen del tamaño de bloque.
+    """
+    nuevas = []
+    en_bloque = set(jugadores["jugador"])
+    for jugada in JUGADAS_COLECTIVAS:
+        ini, fin = jugada["ventana"]
+        if fin > duracion:
+            continue
+        eventos = [ev for ev in jugada["eventos"] if ev["jugador"] in en_bloque]
+        nombres = [ev["jugador"] for ev in eventos]
+        solapa = etiquetas["jugador"].isin(nombres) & ~((etiquetas["fin"] < ini) | (etiquetas["inicio"] > fin))
+        etiquetas = etiquetas[~solapa]
+        nuevas.extend(eventos)
+    if not nuevas:
+        return etiquetas
+    return pd.concat([etiquetas, pd.DataFrame(nuevas)], ignore_index=True)
+
+
+def _escribir(df, ruta, primero):
+    df.to_csv(ruta, mode="w" if primero else "a", header=primero, index=False)
+
+
+def generar_sesion(carpeta, n_jugadores=10, duracion=600, hz=1, semilla=42, sesion=0,
+                   filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe los dos CSV de una sesión en `carpeta`, por bloques de jugadores.
+
+    Returns:
+        (filas físicas, filas de etiquetas)
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    jugadores = plantilla(n_jugadores)
+    por_bloque = max(1, filas_por_bloque // max(1, int(round(duracion * hz))))
+    filas_fisicos = filas_etiquetas = 0
+    for b, inicio in enumerate(range(0, n_jugadores, por_bloque)):
+        # Reproducible para la misma semilla, sesión y tamaño de bloque
+        rng = np.random.default_rng([semilla, sesion, b])
+        bloque = jugadores.iloc[inicio:inicio + por_bloque]
+        fisicos = generar_fisicos(bloque, duracion, hz, rng)
+        etiquetas = insertar_jugadas_colectivas(generar_etiquetas(bloque, duracion, rng), bloque, duracion)
+        _escribir(fisicos, os.path.join(carpeta, FICHERO_FISICOS), b == 0)
+        _escribir(etiquetas, os.path.join(carpeta, FICHERO_ETIQUETAS), b == 0)
+        filas_fisicos += len(fisicos)
+        filas_etiquetas += len(etiquetas)
+    return filas_fisicos, filas_etiquetas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos físicos y etiquetas tácticas con el esquema de test_1.")
+    parser.add_argument("--jugadores", type=int, default=10, help="jugadores por sesión")
+    parser.add_argument("--sesiones", type=int, default=1, help="sesiones (una subcarpeta por sesión si hay más de una)")
+    parser.add_argument("--duracion", type=int, default=600, help="duración de cada sesión en segundos")
+    parser.add_argument("--hz", type=float, default=1, help="frecuencia de muestreo de los datos físicos")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE,
+                        help="filas físicas generadas y escritas por bloque")
+    parser.add_argument("--salida", default="data", help="carpeta de salida")
+    args = parser.parse_args()
+
+    for sesion in range(args.sesiones):
+        carpeta = args.salida if args.sesiones == 1 else os.path.join(args.salida, f"sesion_{sesion + 1:03d}")
+        fisicos, etiquetas = generar_sesion(carpeta, args.jugadores, args.duracion, args.hz,
+                                            args.semilla, sesion, args.filas_por_bloque)
+        print(f"✔ {carpeta}: {fisicos} filas físicas, {etiquetas} etiquetas")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,36 @@
 # load_data.py (mejorado para robustez y control de errores)
 import pandas as pd
 import os
+import sys
 
-def cargar_datos_fisicos(path="data/datos_fisicos_realistas.csv"):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"No se encontró el archivo de datos físicos en la ruta: {path}")
-    df = pd.read_csv(path)
-    columnas_esperadas = {"jugador", "posicion", "tiempo", "hr", "velocidad", "aceleracion", "playerload", "x_pos", "y_pos"}
+# Paquete compartido feb_analytics (raíz del repositorio)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics import warehouse
+
+def _validar_columnas(df, columnas_esperadas):
     if not columnas_esperadas.issubset(df.columns):
         raise ValueError(f"Faltan columnas necesarias en el CSV: {columnas_esperadas - set(df.columns)}")
     return df
 
-def cargar_etiquetas_tacticas(path="data/etiquetas_tacticas_realistas.csv"):
+def cargar_datos_fisicos(path="data/datos_fisicos_realistas.csv", partido=None, jugadores=None, rango_tiempo=None):
+    columnas_esperadas = {"jugador", "posicion", "tiempo", "hr", "velocidad", "aceleracion", "playerload", "x_pos", "y_pos"}
+    if partido is not None:
+        # Partido del almacén analítico: los filtros se resuelven en SQL
+        return _validar_columnas(warehouse.query("physical", partido, players=jugadores, time_range=rango_tiempo),
+                                 columnas_esperadas)
     if not os.path.exists(path):
-        raise FileNotFoundError(f"No se encontró el archivo de etiquetas tácticas en la ruta: {path}")
-    df = pd.read_csv(path)
+        raise FileNotFoundError(f"No se encontró el archivo de datos físicos en la ruta: {path}")
+    return _validar_columnas(pd.read_csv(path), columnas_esperadas)
+
+def cargar_etiquetas_tacticas(path="data/etiquetas_tacticas_realistas.csv", partido=None, jugadores=None, rango_tiempo=None):
     columnas_esperadas = {"jugador", "tipo", "accion", "zona", "inicio", "fin", "resultado"}
-    if not columnas_esperadas.issubset(df.columns):
-        raise ValueError(f"Faltan columnas necesarias en el CSV: {columnas_esperadas - set(df.columns)}")
-    return df
\ No newline at end of file
+    if partido is not None:
+        # Las etiquetas cuyo intervalo [inicio, fin] se solapa con el rango de tiempo
+        return _validar_columnas(warehouse.query("tactical_labels", partido, players=jugadores, time_range=rango_tiempo),
+                                 columnas_esperadas)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró el archivo de etiquetas tácticas en la ruta: {path}")
+    return _validar_columnas(pd.read_csv(path), columnas_esperadas)
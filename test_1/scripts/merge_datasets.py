@@ -1,10 +1,22 @@
 # merge_datasets.py (versión mejorada con contexto colectivo y zonas GPS)
 
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
+# Paquete compartido feb_analytics (raíz del repositorio)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics.court_zones import classify_zones
+
 def determinar_zona_gps(x, y):
-    # Define zonas simplificadas de la cancha según coordenadas reales (28x15 m)
+    # Define zonas simplificadas de la cancha según coordenadas reales (28x15 m).
+    # Regla original punto a punto; fusionar_datos_con_acciones usa el ráster
+    # compartido "gps", que debe coincidir con ella (ver comprobar_zonas_gps)
     if x < 6:
         return "esquina izquierda"
     elif x > 22:
@@ -22,6 +34,12 @@ def determinar_zona_gps(x, y):
     else:
         return "perímetro"
 
+def comprobar_zonas_gps(df_fisicos):
+    # Filas cuya zona del ráster "gps" no coincide con determinar_zona_gps
+    raster = classify_zones(df_fisicos["x_pos"].to_numpy(), df_fisicos["y_pos"].to_numpy(), "gps").astype(str)
+    original = [determinar_zona_gps(x, y) for x, y in zip(df_fisicos["x_pos"], df_fisicos["y_pos"])]
+    return df_fisicos[raster != np.array(original, dtype=object)]
+
 def fusionar_datos_con_acciones(df_fisicos, df_etiquetas):
     df_fisicos = df_fisicos.copy()
     df_fisicos["tipo"] = None
@@ -29,7 +47,7 @@ def fusionar_datos_con_acciones(df_fisicos, df_etiquetas):
     df_fisicos["zona"] = None
     df_fisicos["resultado"] = None
     df_fisicos["jugadores_en_accion"] = 0
-    df_fisicos["zona_gps"] = df_fisicos.apply(lambda row: determinar_zona_gps(row["x_pos"], row["y_pos"]), axis=1)
+    df_fisicos["zona_gps"] = classify_zones(df_fisicos["x_pos"].to_numpy(), df_fisicos["y_pos"].to_numpy(), "gps")
 
     # Para eficiencia, ordenamos las etiquetas por inicio
     df_etiquetas = df_etiquetas.sort_values("inicio")
@@ -55,3 +73,12 @@ def fusionar_datos_con_acciones(df_fisicos, df_etiquetas):
     # Filtrar solo frames con contexto táctico definido
     df_etiquetado = df_fisicos.dropna(subset=["accion", "tipo", "zona"])
     return df_etiquetado
+
+if __name__ == "__main__":
+    # Comprueba el ráster "gps" frente a la regla original con los datos de data/
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "datos_fisicos_realistas.csv")
+    df = pd.read_csv(ruta)
+    distintas = comprobar_zonas_gps(df)
+    print(f"zona_gps: {len(distintas)} de {len(df)} filas difieren de determinar_zona_gps")
+    if len(distintas):
+        sys.exit(1)
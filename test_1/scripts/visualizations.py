@@ -1,11 +1,22 @@
 # visualizations.py (mejorado al nivel máximo)
 
+import os
+import sys
+
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 
+# Paquete compartido feb_analytics (raíz del repositorio)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+# Igual que st.plotly_chart, pero registra el tamaño de la figura en el perfil de render
+from feb_analytics.profiling import plotly_chart
+
 # 1. Radar por tipo de acción
 
 def radar_jugador(df_metricas, jugador):
@@ -13,7 +24,7 @@ def radar_jugador(df_metricas, jugador):
     df_radar = df.groupby("accion")["playerload_mean"].mean().reset_index()
     fig = px.line_polar(df_radar, r="playerload_mean", theta="accion", line_close=True,
                         title=f"Carga física por acción – {jugador}")
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 # 2. Mapa de calor en pista con coordenadas reales
 
@@ -25,7 +36,7 @@ def mapa_calor_zonas(df_metricas, jugador):
         title=f"Mapa de Carga Física - {jugador}", labels={"x_pos_mean": "Ancho cancha (m)", "y_pos_mean": "Largo cancha (m)"}
     )
     fig.update_layout(yaxis_scaleanchor="x", xaxis_range=[0, 28], yaxis_range=[0, 15])
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 # 3. Comparativa de carga por acción en equipo
 
@@ -34,7 +45,7 @@ def comparativa_equipo(df_metricas, accion):
     df_bar = df_accion.groupby("jugador")["playerload_mean"].mean().reset_index()
     fig = px.bar(df_bar, x="jugador", y="playerload_mean", title=f"Carga Media – Acción: {accion}", color="playerload_mean",
                  color_continuous_scale="Blues")
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 # 4. Dispersión por zona + resultado + carga
 
@@ -51,7 +62,7 @@ def dispersion_resultados(df, tipo_filtro=None):
         title="Mapa de Acciones: Posición vs Carga y Resultado"
     )
     fig.update_layout(yaxis_scaleanchor="x", xaxis_range=[0, 28], yaxis_range=[0, 15])
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 # 5. Dispersión ofensivo vs defensivo por jugador
 
@@ -63,7 +74,7 @@ def dispersion_ofensivo_defensivo(df_jugadores):
         labels={"tasa_exito_ofensivo": "Éxito Ofensivo", "tasa_exito_defensivo": "Éxito Defensivo"}
     )
     fig.update_traces(textposition="top center")
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 # 6. Correlación de perfiles de acción
 
@@ -89,7 +100,7 @@ def curvas_fatiga(df_fisicos, jugador):
     fig.update_layout(title=f"Curvas Fisiológicas – {jugador}", xaxis_title="Tiempo (s)")
     fig.update_yaxes(title_text="HR (bpm)", secondary_y=False)
     fig.update_yaxes(title_text="PlayerLoad", secondary_y=True)
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 # 8. Análisis de éxito físico-táctico agregado
 
@@ -97,4 +108,4 @@ def resumen_fisico_vs_exito(df_rendimiento):
     fig = px.bar(df_rendimiento, x="tipo_resultado", y=["playerload", "velocidad", "hr"], barmode="group",
                  title="Comparativa Física – Éxito vs Fallo",
                  labels={"value": "Promedio", "variable": "Métrica"})
-    st.plotly_chart(fig)
+    plotly_chart(fig)
@@ -1,8 +1,19 @@
 # streamlit_app.py (updated)
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 from visualizations import trajectory_plot
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+
+# Make the shared feb_analytics package importable
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics import partitioned, warehouse
+from feb_analytics.ingest import data_version
 
 # Configuration
 st.set_page_config(
@@ -11,14 +22,72 @@ st.set_page_config(
     page_icon=":basketball:"
 )
 
-@st.cache_data(ttl=3600)
-def load_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def list_games() -> Dict[str, str]:
+    """
+    Games available besides the bundled CSV files.
+
+    Returns:
+        Game id -> source ("warehouse" or "partitioned")
+    """
+    games = {game: "warehouse" for game in warehouse.list_games("tracking")}
+    for game in partitioned.list_games(partitioned.dataset_dir("data", "positions")):
+        games.setdefault(game, "partitioned")
+    return games
+
+def list_players(game: str, source: str) -> List[int]:
+    """Player IDs of a game, without reading its positions."""
+    if source == "warehouse":
+        players = warehouse.list_players("tracking", game)
+    else:
+        players = partitioned.list_players(partitioned.dataset_dir("data", "positions"), game)
+    return sorted(int(p) for p in players)
+
+# Entries kept by load_data: one per (game, player, time range, version), so
+# old ingest versions and filter selections are evicted from the process RAM
+CACHE_ENTRIES = 16
+
+def game_version(game: str, source: str) -> str:
+    """Identifies the current import of a game (changes when it is re-imported or rewritten)."""
+    if source == "warehouse":
+        tables = [table for table in ("tracking", "ball", "player_metrics") if game in warehouse.list_games(table)]
+        return "|".join(warehouse.game_version(table, game) for table in tables)
+    return "|".join(partitioned.game_version(partitioned.dataset_dir("data", name), game)
+                    for name in ("positions", "ball", "metrics"))
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_data(game: Optional[str] = None,
+              source: str = "warehouse",
+              player_id: Optional[int] = None,
+              time_range: Optional[Tuple[float, float]] = None,
+              version: Tuple = (0, None)) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load and cache the data files.
+
+    Args:
+        game: Game to read from `source`; the CSV files if None
+        source: "warehouse" (feb_analytics.warehouse) or "partitioned"
+            (game=/player= Parquet layout under data/partitioned)
+        player_id: Only read the positions and metrics of this player
+        time_range: Only read the samples in (start, end) seconds
+        version: Ingest data version of data/ (feb_analytics.ingest) and
+            `game_version` of the game; a new version is a new cache entry,
+            so changed files or re-imported games are read on the next rerun
     
     Returns:
         Tuple of (positions, ball, metrics) DataFrames
     """
+    if game is not None:
+        # Predicates are pushed down: SQL filters or partition/row-group pruning
+        players = None if player_id is None else [player_id]
+        if source == "warehouse":
+            pos = warehouse.query("tracking", game, players=players, time_range=time_range)
+            ball = warehouse.query("ball", game, time_range=time_range)
+            met = warehouse.query("player_metrics", game, players=players)
+        else:
+            pos = partitioned.read_partitioned(partitioned.dataset_dir("data", "positions"), game, players, time_range)
+            ball = partitioned.read_partitioned(partitioned.dataset_dir("data", "ball"), game, time_range=time_range)
+            met = partitioned.read_partitioned(partitioned.dataset_dir("data", "metrics"), game, players)
+        return pos, ball, met
     try:
         pos = pd.read_csv("data/positions.csv")
         ball = pd.read_csv("data/ball.csv")
@@ -36,11 +105,19 @@ def main():
         Select a player to analyze their movement patterns and physical metrics.
     """)
     
-    # Load data
-    positions, ball, metrics = load_data()
+    # Games of the warehouse or of the partitioned layout; the bundled CSV files otherwise
+    games = list_games()
+    game = st.sidebar.selectbox("Game", list(games)) if games else None
+    # Ingest version of data/, plus the import of the selected game
+    version = (data_version("data"), game_version(game, games[game]) if game else None)
+    if game is None:
+        positions, ball, metrics = load_data(version=version)
+        player_ids = positions["player_id"].unique()
+    else:
+        player_ids = list_players(game, games[game])
     
     # Convert player IDs to strings for selectbox compatibility
-    player_options = ["All Players"] + [f"Player #{int(p)}" for p in sorted(positions["player_id"].unique())]
+    player_options = ["All Players"] + [f"Player #{int(p)}" for p in sorted(player_ids)]
     
     # Player selection
     player_opt = st.sidebar.selectbox(
@@ -51,6 +128,9 @@ def main():
     
     # Extract player ID if not "All Players"
     pid = None if player_opt == "All Players" else int(player_opt.split("#")[1])
+    if game is not None:
+        # Only the selected player's positions are read
+        positions, ball, metrics = load_data(game, games[game], pid, version=version)
     
     # Main content
     st.title("🏀 Basketball Movement Analysis")
@@ -1,117 +1,56 @@
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
-def integrate_datasets():
-    # Load simulated data
-    possession = pd.read_csv('../data/simulated_possession.csv')
-    biometrics = pd.read_csv('../data/biometric_data.csv')
-    
-    # Merge datasets - biometrics already contains position and action data
-    # We'll keep the biometrics as primary since it has higher time resolution
-    merged = biometrics.copy()
-    
-    # Add court zones based on FIBA court dimensions (28m x 15m)
-    # Court zone definitions:
-    # 1. Backcourt: Offensive half (x < 14m)
-    # 2. Frontcourt: Defensive half (x >= 14m)
-    # 3. Paint/Key: The rectangular area near the basket
-    # 4. Perimeter: Areas beyond the paint but inside three-point line
-    # 5. Corners: The corner three-point areas
-    # 6. Top of Key: Area around the top of the three-point arc
-    # 7. Wings: Areas along the sides of the court
-    # 8. Dunker Spot: Specific low post positions
-    
-    # FIBA court dimensions reference:
-    # - Paint: 4.9m wide (from y=5.3 to y=9.7 at center y=7.5)
-    # - Three-point line: 6.75m from basket at top, 6.6m in corners
-    # - Basket located at (28, 7.5)
-    
-    # Define court zones
-    merged['zone'] = np.select(
-        [
-            # Backcourt (offensive half)
-            (merged['x'] < 14),
-            
-            # Frontcourt areas
-            # Paint/Key area (rectangular)
-            (merged['x'] >= 22) & (merged['x'] <= 28) & 
-            (merged['y'] >= 5.3) & (merged['y'] <= 9.7),
-            
-            # Left Corner (three-point area)
-            (merged['x'] >= 22) & (merged['y'] < 5.3),
-            
-            # Right Corner (three-point area)
-            (merged['x'] >= 22) & (merged['y'] > 9.7),
-            
-            # Top of Key (around three-point arc)
-            (merged['x'] >= 18) & (merged['x'] < 22) & 
-            (merged['y'] >= 6.0) & (merged['y'] <= 9.0),
-            
-            # Left Wing
-            (merged['x'] >= 14) & (merged['x'] < 22) & 
-            (merged['y'] < 7.5) & (merged['y'] >= 3.0),
-            
-            # Right Wing
-            (merged['x'] >= 14) & (merged['x'] < 22) & 
-            (merged['y'] > 7.5) & (merged['y'] <= 12.0),
-            
-            # Dunker Spot (left)
-            (merged['x'] >= 25) & (merged['x'] <= 28) & 
-            (merged['y'] >= 3.0) & (merged['y'] < 5.3),
-            
-            # Dunker Spot (right)
-            (merged['x'] >= 25) & (merged['x'] <= 28) & 
-            (merged['y'] > 9.7) & (merged['y'] <= 12.0),
-            
-            # High Post (free throw line area)
-            (merged['x'] >= 20) & (merged['x'] < 22) & 
-            (merged['y'] >= 5.3) & (merged['y'] <= 9.7),
-            
-            # Mid-range areas
-            (merged['x'] >= 14) & (merged['x'] < 18) & 
-            (merged['y'] >= 5.0) & (merged['y'] <= 10.0),
-        ],
-        [
-            'backcourt',
-            'paint',
-            'left_corner',
-            'right_corner',
-            'top_key',
-            'left_wing',
-            'right_wing',
-            'dunker_left',
-            'dunker_right',
-            'high_post',
-            'mid_range'
-        ],
-        default='other_frontcourt'
-    )
-    
+# Get the directory of this script so the stage works from any cwd
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+data_dir = os.path.join(BASE_DIR, '..', 'data')
+
+# Make the shared feb_analytics package importable
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics.court_zones import classify_zones, zone_labels
+
+# Rows of biometric data processed per chunk
+CHUNK_SIZE = 100_000
+
+# Fixed category sets so every partition shares the same dictionary
+ZONE_CATEGORIES = zone_labels('tactical')
+ROLE_CATEGORIES = ['guard', 'wing', 'big', 'unknown']
+ACTION_TYPE_CATEGORIES = ['high_intensity', 'medium_intensity', 'low_intensity', 'special_action']
+
+
+def derive_features(chunk):
+    """Adds zone, dist_to_basket, role and action_type to a biometric chunk."""
+    merged = chunk.copy()
+
+    # Court zones come from the shared rasterized lookup (one index gather per row)
+    merged['zone'] = classify_zones(merged['x'].to_numpy(), merged['y'].to_numpy(), 'tactical')
+
     # Add additional tactical features
     # 1. Distance to basket
     basket_x, basket_y = 28.0, 7.5
     merged['dist_to_basket'] = np.sqrt(
-        (merged['x'] - basket_x)**2 + 
+        (merged['x'] - basket_x)**2 +
         (merged['y'] - basket_y)**2
     )
-    
-    # 2. Player role based on position
+
+    # 2. Player role based on position (first two characters, e.g. 'A1', 'D4')
+    prefix = merged['player'].astype(str).str[:2]
     merged['role'] = np.select(
         [
-            merged['player'].str.startswith('A1') | merged['player'].str.startswith('D1'),
-            merged['player'].str.startswith('A2') | merged['player'].str.startswith('A3') |
-            merged['player'].str.startswith('D2') | merged['player'].str.startswith('D3'),
-            merged['player'].str.startswith('A4') | merged['player'].str.startswith('A5') |
-            merged['player'].str.startswith('D4') | merged['player'].str.startswith('D5'),
-        ],
-        [
-            'guard',
-            'wing',
-            'big'
+            prefix.isin(['A1', 'D1']),
+            prefix.isin(['A2', 'A3', 'D2', 'D3']),
+            prefix.isin(['A4', 'A5', 'D4', 'D5']),
         ],
+        ROLE_CATEGORIES[:-1],
         default='unknown'
     )
-    
+
     # 3. Action type categories
     merged['action_type'] = np.select(
         [
@@ -119,22 +58,64 @@ def integrate_datasets():
             merged['action'].isin(['dribble', 'relocate', 'sliding', 'chase', 'recover']),
             merged['action'].isin(['ball hold', 'static', 'jog', 'walk', 'possession over'])
         ],
-        [
-            'high_intensity',
-            'medium_intensity',
-            'low_intensity'
-        ],
+        ACTION_TYPE_CATEGORIES[:-1],
         default='special_action'
     )
-    
-    # Save integrated dataset
-    merged.to_csv('../data/integrated_dataset.csv', index=False, float_format='%.2f')
+
+    # Categorical dtypes keep string columns compact in memory and on disk
+    merged['player'] = merged['player'].astype('category')
+    merged['action'] = merged['action'].astype('category')
+    merged['role'] = pd.Categorical(merged['role'], categories=ROLE_CATEGORIES)
+    merged['action_type'] = pd.Categorical(merged['action_type'], categories=ACTION_TYPE_CATEGORIES)
     return merged
 
+
+def integrate_datasets(biometrics_path=None, output_dir=None, chunksize=CHUNK_SIZE, csv_path=None):
+    """
+    Streams the biometric data in chunks, derives tactical features per chunk
+    and writes each chunk as a Parquet partition.
+
+    Only one chunk is held in memory at a time, so the stage scales to a full
+    season of biometric samples. The legacy CSV consumed by the dashboards is
+    appended chunk by chunk as well.
+
+    Returns a summary dict with the number of records and partitions written.
+    """
+    biometrics_path = biometrics_path or os.path.join(data_dir, 'biometric_data.csv')
+    output_dir = output_dir or os.path.join(data_dir, 'integrated_dataset')
+    csv_path = csv_path if csv_path is not None else os.path.join(data_dir, 'integrated_dataset.csv')
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Drop partitions from a previous run so the dataset is not duplicated
+    for name in os.listdir(output_dir):
+        if name.startswith('part-') and name.endswith('.parquet'):
+            os.remove(os.path.join(output_dir, name))
+
+    total_records = 0
+    partitions = 0
+    for chunk in pd.read_csv(biometrics_path, chunksize=chunksize):
+        merged = derive_features(chunk)
+        merged.to_parquet(os.path.join(output_dir, f'part-{partitions:05d}.parquet'), index=False)
+        if csv_path:
+            merged.to_csv(csv_path, mode='w' if partitions == 0 else 'a', header=partitions == 0,
+                          index=False, float_format='%.2f')
+        total_records += len(merged)
+        partitions += 1
+
+    return {'records': total_records, 'partitions': partitions, 'output_dir': output_dir}
+
+
+def load_integrated_dataset(output_dir=None, columns=None):
+    """Loads the partitioned integrated dataset (optionally a subset of columns)."""
+    output_dir = output_dir or os.path.join(data_dir, 'integrated_dataset')
+    return pd.read_parquet(output_dir, columns=columns)
+
+
 if __name__ == "__main__":
     print("Integrating datasets...")
-    integrated_data = integrate_datasets()
-    print(f"Integrated dataset saved to data/integrated_dataset.csv")
-    print(f"Total records: {len(integrated_data)}")
+    summary = integrate_datasets()
+    print(f"Integrated dataset saved to {summary['output_dir']} ({summary['partitions']} partitions)")
+    print(f"Total records: {summary['records']}")
     print("\nSample of integrated data:")
-    print(integrated_data[['time', 'player', 'action', 'zone', 'heart_rate', 'player_load']].head(10))
\ No newline at end of file
+    integrated_data = load_integrated_dataset()
+    print(integrated_data[['time', 'player', 'action', 'zone', 'heart_rate', 'player_load']].head(10))
@@ -1,34 +1,210 @@
+import os
+
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.cluster import KMeans
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 
-def analyze_patterns(df):
-    # 1. HR vs Shooting Accuracy
-    shots = df[df['action'] == 'shot'].copy()
-    shots['success'] = np.random.choice([0,1], len(shots), p=[0.4,0.6])  # Simulate outcomes
-    
-    # 2. Recovery Analysis
-    def calculate_recovery(player_df):
-        # Identify peak exertion events
-        # Calculate recovery rates
-        return recovery_metrics
-    
-    # 3. PlayerLoad Patterns
-    high_load = df[df['player_load'] > df['player_load'].quantile(0.9)]
-    defensive_breakdowns = df[df['action'].isin(['lost_man', 'defensive_error'])]
-    
-    # 4. Clustering
+# Get the directory of this script so the stage works from any cwd
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+data_dir = os.path.join(BASE_DIR, '..', 'data')
+
+CHUNK_SIZE = 100_000
+CLUSTER_FEATURES = ['heart_rate', 'velocity', 'acceleration']
+BREAKDOWN_ACTIONS = ['lost man', 'lost_man', 'defensive error', 'defensive_error']
+
+# High-intensity events and the HR window read after them (as in the dashboards)
+EVENT_ACCEL_THRESHOLD = 4.0
+RECOVERY_WINDOW = 5.0      # seconds
+CORRELATION_WINDOW = 5.0   # seconds per load/breakdown window
+LOAD_SAMPLE_SIZE = 100_000  # reservoir size for the PlayerLoad quantile
+
+
+def iter_chunks(source, chunksize=CHUNK_SIZE):
+    """
+    Yields DataFrame chunks from a CSV/Parquet path or an in-memory DataFrame.
+
+    Paths are re-read on every call, so the stage can make several passes
+    over a dataset that does not fit in memory.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif str(source).endswith('.csv'):
+        yield from pd.read_csv(source, chunksize=chunksize)
+    else:
+        import pyarrow.dataset as ds
+        for batch in ds.dataset(source, format='parquet').to_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+
+def _window_recovery(part, window):
+    """
+    HR recovery after every high-intensity event of a (player, time) sorted frame.
+
+    The last HR sample inside (t, t + window] of the same player is found with
+    one searchsorted over a combined (player, time) key, so all events are
+    resolved in a single vectorized pass. Returns the per-row recovery, the
+    recovery rate (bpm/s) and a mask of rows that are valid events.
+    """
+    codes = part['player_code'].to_numpy(np.int64)
+    times = part['time'].to_numpy(np.float64)
+    hr = part['heart_rate'].to_numpy(np.float64)
+    if len(times) == 0:
+        return np.empty(0), np.empty(0), np.zeros(0, dtype=bool)
+
+    offset = times.min()
+    span = (times.max() - offset) + 2 * window + 1
+    key = codes * span + (times - offset)
+    end = np.searchsorted(key, key + window, side='right') - 1
+
+    valid = (part['acceleration'].to_numpy() > EVENT_ACCEL_THRESHOLD) & (end > np.arange(len(key)))
+    recovery = hr - hr[end]
+    elapsed = np.where(valid, times[end] - times, 1.0)
+    return recovery, recovery / elapsed, valid
+
+
+def _recovery_summary(part, mask, window):
+    """Per-player event counts and recovery sums for the rows selected by `mask`."""
+    recovery, rate, valid = _window_recovery(part, window)
+    valid &= mask
+    events = pd.DataFrame({
+        'player': part['player'].to_numpy()[valid],
+        'recovery': recovery[valid],
+        'recovery_rate': rate[valid],
+        'event_hr': part['heart_rate'].to_numpy()[valid],
+    })
+    return events.groupby('player').agg(
+        events=('recovery', 'size'), recovery_sum=('recovery', 'sum'),
+        rate_sum=('recovery_rate', 'sum'), peak_hr=('event_hr', 'max'))
+
+
+def analyze_patterns(source, chunksize=CHUNK_SIZE, n_clusters=3, seed=42):
+    """
+    Mines load, recovery and clustering patterns from biometric data.
+
+    `source` is a DataFrame or a CSV/Parquet path. The data is processed in
+    chunks over three passes, so memory stays bounded by the chunk size plus
+    small per-player and per-window accumulators. Rows of each player must be
+    in increasing time order across chunks (the layout written by the
+    simulators and the integration stage).
+    """
+    rng = np.random.default_rng(seed)
+
+    # --- Pass 1: scaler statistics, PlayerLoad reservoir and shots ---
     scaler = StandardScaler()
-    features = scaler.fit_transform(df[['heart_rate', 'velocity', 'acceleration']])
-    kmeans = KMeans(n_clusters=3).fit(features)
-    df['cluster'] = kmeans.labels_
-    
+    load_sample = np.empty(0)
+    seen = 0
+    shots = []
+    players = {}
+    for chunk in iter_chunks(source, chunksize):
+        features = chunk[CLUSTER_FEATURES].dropna()
+        if not features.empty:
+            scaler.partial_fit(features.to_numpy(np.float64))
+
+        # Reservoir sample keeps the quantile estimate in bounded memory
+        loads = chunk['player_load'].dropna().to_numpy(np.float64)
+        take = min(LOAD_SAMPLE_SIZE - len(load_sample), len(loads))
+        if take > 0:
+            load_sample = np.concatenate([load_sample, loads[:take]])
+            seen += take
+            loads = loads[take:]
+        if len(loads):
+            slots = rng.integers(0, seen + np.arange(1, len(loads) + 1))
+            keep = slots < LOAD_SAMPLE_SIZE
+            load_sample[slots[keep]] = loads[keep]
+            seen += len(loads)
+
+        shots.append(chunk.loc[chunk['action'] == 'shot', ['time', 'player', 'heart_rate']])
+        for player in pd.unique(chunk['player']):
+            players.setdefault(player, len(players))
+
+    high_load_threshold = np.quantile(load_sample, 0.9) if len(load_sample) else np.inf
+
+    # 1. HR vs Shooting Accuracy (seeded simulated outcomes)
+    shots = pd.concat(shots, ignore_index=True)
+    shots['success'] = rng.choice([0, 1], len(shots), p=[0.4, 0.6])
+
+    # --- Pass 2: clustering fit, recovery windows and load/breakdown windows ---
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=3)
+    fitted = False
+    tail = None
+    recovery_parts = []
+    window_parts = []
+    for chunk in iter_chunks(source, chunksize):
+        features = chunk[CLUSTER_FEATURES].dropna()
+        if len(features) >= n_clusters:
+            kmeans.partial_fit(scaler.transform(features.to_numpy(np.float64)))
+            fitted = True
+
+        # 2. Recovery Analysis: rows in the last window of each player are
+        # carried over until the samples after them have been read
+        part = chunk[['player', 'time', 'heart_rate', 'acceleration']].copy()
+        part['player_code'] = part['player'].map(players)
+        if tail is not None:
+            part = pd.concat([tail, part], ignore_index=True)
+        part = part.sort_values(['player_code', 'time'], kind='stable', ignore_index=True)
+        complete = part['time'] <= part.groupby('player_code')['time'].transform('max') - RECOVERY_WINDOW
+        recovery_parts.append(_recovery_summary(part, complete.to_numpy(), RECOVERY_WINDOW))
+        tail = part[~complete]
+
+        # 3. PlayerLoad Patterns: join high load and breakdowns on time windows
+        window = np.floor(chunk['time'] / CORRELATION_WINDOW).astype(np.int64)
+        window_parts.append(pd.DataFrame({
+            'window': window,
+            'high_load_samples': (chunk['player_load'] > high_load_threshold).astype(np.int64),
+            'load_sum': chunk['player_load'],
+            'hr_sum': chunk['heart_rate'],
+            'samples': 1,
+            'breakdowns': chunk['action'].isin(BREAKDOWN_ACTIONS).astype(np.int64),
+        }).groupby('window').sum())
+
+    if tail is not None:
+        recovery_parts.append(_recovery_summary(tail, np.ones(len(tail), dtype=bool), RECOVERY_WINDOW))
+
+    recovery = pd.concat(recovery_parts).groupby(level=0).agg(
+        {'events': 'sum', 'recovery_sum': 'sum', 'rate_sum': 'sum', 'peak_hr': 'max'})
+    recovery_metrics = pd.DataFrame({
+        'high_intensity_events': recovery['events'],
+        'avg_hr_recovery': recovery['recovery_sum'] / recovery['events'],
+        'avg_recovery_rate': recovery['rate_sum'] / recovery['events'],
+        'peak_event_hr': recovery['peak_hr'],
+    })
+    recovery_metrics.index.name = 'player'
+
+    windows = pd.concat(window_parts).groupby(level=0).sum()
+    windows['mean_player_load'] = windows['load_sum'] / windows['samples']
+    windows['mean_heart_rate'] = windows['hr_sum'] / windows['samples']
+    load_breakdown_corr = windows[
+        ['high_load_samples', 'mean_player_load', 'mean_heart_rate', 'breakdowns']].corr()
+
+    # --- Pass 3: cluster assignment counts ---
+    # 4. Clustering
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    if fitted:
+        for chunk in iter_chunks(source, chunksize):
+            features = chunk[CLUSTER_FEATURES].dropna()
+            if not features.empty:
+                labels = kmeans.predict(scaler.transform(features.to_numpy(np.float64)))
+                counts += np.bincount(labels, minlength=n_clusters)
+
     return {
         'hr_shot_correlation': shots[['heart_rate', 'success']].corr(),
-        'recovery_metrics': df.groupby('player').apply(calculate_recovery),
-        'load_breakdown_corr': high_load.merge(defensive_breakdowns, on='time').corr(),
-        'clusters': df['cluster'].value_counts()
+        'recovery_metrics': recovery_metrics,
+        'load_breakdown_corr': load_breakdown_corr,
+        'clusters': pd.Series(counts, name='count').rename_axis('cluster'),
+        'cluster_centers': pd.DataFrame(
+            scaler.inverse_transform(kmeans.cluster_centers_) if fitted else np.empty((0, len(CLUSTER_FEATURES))),
+            columns=CLUSTER_FEATURES),
     }
 
-# Additional analysis functions...
\ No newline at end of file
+
+if __name__ == "__main__":
+    print("Mining patterns...")
+    patterns = analyze_patterns(os.path.join(data_dir, 'integrated_dataset.csv'))
+    print("\nRecovery metrics:")
+    print(patterns['recovery_metrics'])
+    print("\nLoad / breakdown correlation:")
+    print(patterns['load_breakdown_corr'])
+    print("\nCluster sizes:")
+    print(patterns['clusters'])
@@ -3,18 +3,8 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans, DBSCAN
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.manifold import TSNE
-from PIL import Image
 import os
-import seaborn as sns
-from scipy import stats
-from scipy.spatial import distance
-from scipy.stats import pearsonr
-from scipy.signal import savgol_filter
+import sys
 
 
 
@@ -24,6 +14,26 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Construct full paths to each CSV file
 data_dir = os.path.join(BASE_DIR, '..', 'data')
 
+# Make the shared feb_analytics package importable
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics.data_view import PlayerTimeIndex
+from feb_analytics.feature_store import available_games, game_version, load_features, load_game_features
+from feb_analytics.ingest import data_version
+from feb_analytics.partitioned import dataset_dir
+from feb_analytics.figure_cache import cached_plotly_chart
+from feb_analytics.embeddings import get_model_result, is_pending
+from feb_analytics.event_windows import event_windows
+from feb_analytics.lazy import lazy_import
+from feb_analytics.possession import possession_segments
+from feb_analytics.profiling import plotly_chart, start_profile
+from feb_analytics.shot_simulation import expected_fg
+
+# Analytics backends are loaded on first use, not on every script start
+preprocessing = lazy_import('sklearn.preprocessing')
+
 
 # Configuration - Professional Dark Theme
 st.set_page_config(
@@ -33,6 +43,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Render-time profile of this rerun (enabled with FEB_PROFILE=1 or ?profile=1)
+profile = start_profile('test_3')
+
 # Custom CSS for dark theme with electric yellow accents
 st.markdown("""
     <style>
@@ -241,135 +254,53 @@ ACCENT_COLOR = "#00D4FF"  # Electric Blue
 
 SPAIN_COLORS = [PRIMARY_COLOR, ACCENT_COLOR, SECONDARY_COLOR]
 
+# Partitioned layout of the data directory (python -m feb_analytics.partitioned)
+PARTITIONED_ROOT = dataset_dir(data_dir, 'integrated_dataset')
+
+# The dataset, view and segments of the current and the previous data
+# version (or game); older versions are evicted from the process RAM
+CACHE_ENTRIES = 2
+
 # Load data with enhanced features
-@st.cache_data
-def load_data():
-    # Load the integrated dataset
-    df = pd.read_csv(os.path.join(data_dir, 'integrated_dataset.csv'))
-    biometric_df = pd.read_csv(os.path.join(data_dir, 'biometric_data.csv'))
-    possession_df = pd.read_csv(os.path.join(data_dir, 'simulated_possession.csv'))
-    
-    # Merge datasets
-    df = pd.merge(df, possession_df, on=['time', 'player', 'x', 'y', 'action'], how='left')
-    
-    # Define body weights by position
-    body_weights = {'Guard': 85, 'Forward': 100, 'Center': 110}  # kg
-    
-    # Add position mapping
-    positions = {
-        'A1': 'Guard', 'A2': 'Guard', 'A3': 'Forward', 'A4': 'Forward', 'A5': 'Center',
-        'D1': 'Guard', 'D2': 'Guard', 'D3': 'Forward', 'D4': 'Forward', 'D5': 'Center'
-    }
-    df['position'] = df['player'].map(positions)
-    
-    # Calculate advanced metrics
-    df['metabolic_power'] = (df['velocity'] * df['acceleration']) / df['position'].map(body_weights)
-    df['high_intensity_burst'] = (df['acceleration'] > 3).astype(int)
-    
-    # Enhanced shot simulation with court zones
-    shots = df[df['action'] == 'shot'].copy()
-    shot_zones = []
-    for idx, row in shots.iterrows():
-        x, y = row['x'], row['y']
-        if x >= 25 and 5 <= y <= 10:
-            shot_zones.append('Paint')
-        elif x >= 22 and (y < 5 or y > 10):
-            shot_zones.append('Mid-Range')
-        elif x < 22:
-            shot_zones.append('Three-Pointer')
-        else:
-            shot_zones.append('Other')
-    shots['zone'] = shot_zones
-    
-    # Zone-based success probabilities
-    zone_probs = {'Paint': 0.65, 'Mid-Range': 0.45, 'Three-Pointer': 0.38, 'Other': 0.25}
-    shots['success'] = [np.random.binomial(1, zone_probs[z]) for z in shots['zone']]
-    
-    df = df.merge(shots[['time', 'player', 'success', 'zone']], 
-                 on=['time', 'player'], how='left', suffixes=('', '_shot'))
-    df['success'] = df['success'].fillna(-1)  # -1 = not a shot
-    
-    # Enhanced tactical situations with player roles
-    df['tactical_situation'] = 'Initial Setup'
-    df.loc[df['time'].between(7, 10), 'tactical_situation'] = 'Pick-and-Roll'
-    df.loc[df['time'].between(11, 15), 'tactical_situation'] = 'Second Action'
-    df.loc[df['time'] >= 15, 'tactical_situation'] = 'Shot Outcome'
-    
-    # Offensive/defensive roles
-    df['role'] = np.where(df['player'].str.startswith('A'), 'Offense', 'Defense')
-    
-    # Enhanced recovery metrics with exertion index
-    df['exertion_index'] = 0.4 * df['heart_rate'] + 0.3 * df['velocity'] + 0.3 * df['acceleration']
-    df['recovery_phase'] = np.select(
-        [
-            (df['exertion_index'] > df.groupby('player')['exertion_index'].transform('mean') + 15),
-            (df['exertion_index'] < df.groupby('player')['exertion_index'].transform('mean') - 10),
-        ],
-        ['High Exertion', 'Recovery Phase'],
-        default='Normal'
-    )
-    
-    # PlayerLoad efficiency metrics
-    df['offensive_eff'] = np.where(df['role'] == 'Offense', df['player_load'] / (df['velocity'] + 0.1), np.nan)
-    df['defensive_eff'] = np.where(df['role'] == 'Defense', df['player_load'] / (df['acceleration'] + 0.1), np.nan)
-    
-    # Ball possession simulation
-    df['ball_handler'] = False
-    ball_handler = 'A1'
-    for t in sorted(df['time'].unique()):
-        time_df = df[df['time'] == t]
-        actions = time_df[time_df['action'].isin(['pass', 'shot', 'dribble'])]['player'].values
-        if len(actions) > 0:
-            ball_handler = actions[0]
-        df.loc[(df['time'] == t) & (df['player'] == ball_handler), 'ball_handler'] = True
-    
-    # Calculate advanced metrics
-    # Physical Load Metrics
-    df['hr_stress_index'] = df.groupby('player')['heart_rate'].transform(lambda x: (x.max() - x.min()) / len(x))
-    
-    # Movement Efficiency Metrics
-    df['effective_distance'] = np.where(
-        (df['x'] >= 25) & (df['y'] >= 5) & (df['y'] <= 10), 
-        df['velocity'], 
-        0
-    )
-    
-    # Tactical Metrics
-    offensive_players = df[df['role'] == 'Offense']
-    spacing_index = offensive_players.groupby('time')['dist_to_basket'].std().reset_index()
-    spacing_index.columns = ['time', 'spacing_index']
-    df = df.merge(spacing_index, on='time', how='left')
-    
-    # Rebound positioning score
-    shot_times = df[df['action'] == 'shot']['time'].unique()
-    for t in shot_times:
-        shot_df = df[df['time'] == t]
-        for _, row in shot_df.iterrows():
-            player = row['player']
-            x, y = row['x'], row['y']
-            # Calculate distance to nearest opponent
-            opponents = df[(df['time'] == t) & (df['role'] != row['role'])][['x', 'y']]
-            if not opponents.empty:
-                dist_to_opponent = distance.cdist([(x, y)], opponents).min()
-                df.loc[(df['time'] == t) & (df['player'] == player), 'rebound_score'] = 1 / (row['dist_to_basket'] + dist_to_opponent + 0.1)
-    
-    # Time-Derived Features
-    df['fatigue_slope'] = df.groupby('player')['heart_rate'].diff() / df.groupby('player')['time'].diff()
-    
-    # Add fatigue index (cumulative fatigue)
-    df['fatigue_index'] = df.groupby('player')['player_load'].cumsum() / 100
-    
-    # Add recovery metrics
-    df['recovery_rate'] = df.groupby('player')['heart_rate'].transform(
-        lambda x: x.diff().rolling(5, min_periods=1).mean()
-    )
-    
-    # Add PlayerLoad metrics
-    df['player_load_per_min'] = df['player_load'] / (df['time'] / 60)
-    
-    return df
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_data(game=None, source=None, version=0):
+    # Load the integrated dataset with all dashboard features attached from
+    # the shared on-disk feature store (only outdated steps are recomputed).
+    # `version` identifies the data (ingest version of data/ and import of the
+    # game): new data is a new cache entry
+    if game is not None:
+        # Only the rows (or partitions) of the selected game are read
+        return load_game_features(game, source=source)
+    return load_features(os.path.join(data_dir, 'integrated_dataset.csv'))
+
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def load_view(game=None, source=None, version=0):
+    # Sorted (player, time) index over the dataset, shared by all sessions
+    return PlayerTimeIndex(load_data(game, source, version))
 
-df = load_data()
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def load_segments(game=None, source=None, version=0):
+    # Possession segments (carrier intervals) joined by `possession_id`
+    return possession_segments(load_data(game, source, version))
+
+# Games of the warehouse or of the game=/player= partitioned layout; the bundled CSV otherwise
+game_sources = available_games(PARTITIONED_ROOT)
+selected_game = st.sidebar.selectbox("Game", list(game_sources)) if game_sources else None
+# Bumped by `python -m feb_analytics.ingest data --watch` when files change, and
+# by a warehouse re-import or partitioned rewrite of the selected game
+version = (data_version(data_dir),
+           game_version(selected_game, game_sources[selected_game]) if selected_game else None)
+
+with profile.stage('load'):
+    view = load_view(selected_game, game_sources.get(selected_game), version)
+df = view.frame
+
+
+@st.fragment(run_every=1.0)
+def wait_for_model(kind, params, features, rows):
+    # Polls a background model fit and reruns the app once its result is ready
+    if not is_pending(kind, params, features, rows):
+        st.rerun()
 
 
 # Sidebar - Professional Design
@@ -401,11 +332,12 @@ with st.sidebar:
     # AI Model Selection
     st.divider()
     st.markdown("### AI Models")
+    # Model specs (kind, hyperparameters); fits are cached in feb_analytics.embeddings
     ai_models = {
-        "KMeans Clustering": KMeans(n_clusters=3, random_state=42),
-        "DBSCAN": DBSCAN(eps=0.5, min_samples=5),
-        "PCA": PCA(n_components=2),
-        "t-SNE": TSNE(n_components=2, perplexity=30)
+        "KMeans Clustering": ('kmeans', {'n_clusters': 3, 'random_state': 42}),
+        "DBSCAN": ('dbscan', {'eps': 0.5, 'min_samples': 5}),
+        "PCA": ('pca', {'n_components': 2}),
+        "t-SNE": ('tsne', {'n_components': 2, 'perplexity': 30})
     }
     selected_model = st.selectbox("Select AI Model", list(ai_models.keys()))
     
@@ -429,10 +361,10 @@ with st.sidebar:
             </div>
         """, unsafe_allow_html=True)
 
-# Filter data based on selections
-filtered_df = df[(df['time'] >= time_range[0]) & (df['time'] <= time_range[1])]
-if selected_player != 'All Players':
-    filtered_df = filtered_df[filtered_df['player'] == selected_player]
+# Filter data based on selections (binary searches over the pre-sorted view;
+# single-player selections are zero-copy slices)
+with profile.stage('filter'):
+    filtered_df = view.select(selected_player, time_range)
 
 # Main Content - Professional Layout
 st.title("Elite Basketball Performance")
@@ -500,7 +432,7 @@ if analysis_focus == "Overview":
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR)
             )
-            st.plotly_chart(fig_eff, use_container_width=True)
+            plotly_chart(fig_eff, name=f"{analysis_focus}/eff", use_container_width=True)
         
         # Tactical Insights
         st.subheader("Tactical Performance Insights")
@@ -532,7 +464,7 @@ if analysis_focus == "Overview":
             paper_bgcolor=CARD_COLOR,
             font=dict(color=TEXT_COLOR)
         )
-        st.plotly_chart(fig_pl, use_container_width=True)
+        plotly_chart(fig_pl, name=f"{analysis_focus}/pl", use_container_width=True)
         
         # Recovery Status
         st.subheader("Recovery Status")
@@ -554,7 +486,7 @@ if analysis_focus == "Overview":
                 plot_bgcolor=CARD_COLOR,
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_recovery, use_container_width=True)
+            plotly_chart(fig_recovery, name=f"{analysis_focus}/recovery", use_container_width=True)
         else:
             st.warning("No recovery data in selected range")
     
@@ -571,20 +503,20 @@ if analysis_focus == "Overview":
     }).reset_index().dropna()
     
     if len(cluster_df) > 2:
-        scaler = StandardScaler()
+        scaler = preprocessing.StandardScaler()
         scaled_data = scaler.fit_transform(cluster_df.select_dtypes(include=np.number))
         
-        model = ai_models[selected_model]
+        kind, params = ai_models[selected_model]
+        # Fit once per (model, hyperparameters, features); t-SNE runs in the
+        # background and the last embedding is shown until the new one is ready
+        rows = cluster_df['player']  # the rows of the fit, before the join below
+        result, pending = get_model_result(kind, params, scaled_data, rows)
+        if result is not None:
+            cluster_df = cluster_df.join(result, on='player', how='inner')
         
-        if selected_model in ["PCA", "t-SNE"]:
-            if selected_model == "t-SNE":
-                transformed = model.fit_transform(scaled_data)
-            else:
-                transformed = model.fit_transform(scaled_data)
-                
-            cluster_df['dim1'] = transformed[:, 0]
-            cluster_df['dim2'] = transformed[:, 1]
-            
+        if result is None:
+            st.info(f"Computing {selected_model} embedding...")
+        elif selected_model in ["PCA", "t-SNE"]:
             fig_cluster = px.scatter(
                 cluster_df, 
                 x='dim1', 
@@ -596,9 +528,6 @@ if analysis_focus == "Overview":
                 template='plotly_dark'
             )
         else:
-            clusters = model.fit_predict(scaled_data)
-            cluster_df['cluster'] = clusters
-            
             fig_cluster = px.scatter(
                 cluster_df,
                 x='heart_rate',
@@ -611,11 +540,15 @@ if analysis_focus == "Overview":
                 template='plotly_dark'
             )
         
-        fig_cluster.update_layout(
-            plot_bgcolor=CARD_COLOR,
-            paper_bgcolor=CARD_COLOR,
-            font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_cluster, use_container_width=True)
+        if result is not None:
+            fig_cluster.update_layout(
+                plot_bgcolor=CARD_COLOR,
+                paper_bgcolor=CARD_COLOR,
+                font=dict(color=TEXT_COLOR))
+            plotly_chart(fig_cluster, name=f"{analysis_focus}/cluster", use_container_width=True)
+        if pending:
+            st.caption(f"Updating {selected_model} in the background...")
+            wait_for_model(kind, params, scaled_data, rows)
     else:
         st.warning("Insufficient data for clustering")
 
@@ -626,7 +559,7 @@ elif analysis_focus == "Player Biometrics":
     if selected_player == 'All Players':
         st.warning("Please select a specific player to view biometric details")
     else:
-        player_df = filtered_df[filtered_df['player'] == selected_player]
+        player_df = filtered_df  # already a slice of the selected player
         
         # Create tabs for different metrics
         tab1, tab2, tab3, tab4 = st.tabs(["Heart Rate", "Velocity", "Acceleration", "PlayerLoad"])
@@ -667,7 +600,7 @@ elif analysis_focus == "Player Biometrics":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_hr, use_container_width=True)
+                plotly_chart(fig_hr, name=f"{analysis_focus}/hr", use_container_width=True)
                 
                 # Additional HR graph: HR by tactical situation
                 st.subheader("HR by Tactical Situation")
@@ -684,7 +617,7 @@ elif analysis_focus == "Player Biometrics":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_hr_box, use_container_width=True)
+                plotly_chart(fig_hr_box, name=f"{analysis_focus}/hr_box", use_container_width=True)
                 
             with col2:
                 st.subheader("Heart Rate Zones")
@@ -744,25 +677,28 @@ elif analysis_focus == "Player Biometrics":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_vel, use_container_width=True)
+                plotly_chart(fig_vel, name=f"{analysis_focus}/vel", use_container_width=True)
                 
                 # Additional graph: Velocity vs Acceleration
                 st.subheader("Velocity vs Acceleration Profile")
-                fig_vel_acc = px.scatter(
-                    player_df,
-                    x='velocity',
-                    y='acceleration',
-                    color='tactical_situation',
-                    size='player_load',
-                    template='plotly_dark',
-                    trendline='ols',
-                    color_discrete_sequence=SPAIN_COLORS
-                )
-                fig_vel_acc.update_layout(
-                    plot_bgcolor=CARD_COLOR,
-                    paper_bgcolor=CARD_COLOR,
-                    font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_vel_acc, use_container_width=True)
+                def build_vel_acc():
+                    fig_vel_acc = px.scatter(
+                        player_df,
+                        x='velocity',
+                        y='acceleration',
+                        color='tactical_situation',
+                        size='player_load',
+                        template='plotly_dark',
+                        trendline='ols',
+                        color_discrete_sequence=SPAIN_COLORS
+                    )
+                    fig_vel_acc.update_layout(
+                        plot_bgcolor=CARD_COLOR,
+                        paper_bgcolor=CARD_COLOR,
+                        font=dict(color=TEXT_COLOR))
+                    return fig_vel_acc
+
+                cached_plotly_chart(player_df, 'Player Biometrics', 'velocity_vs_acceleration', build_vel_acc, use_container_width=True)
                 
             with col2:
                 st.subheader("Velocity Metrics")
@@ -810,7 +746,7 @@ elif analysis_focus == "Player Biometrics":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_mp, use_container_width=True)
+                plotly_chart(fig_mp, name=f"{analysis_focus}/mp", use_container_width=True)
                 
                 # Additional graph: Acceleration Distribution
                 st.subheader("Acceleration Distribution")
@@ -826,7 +762,7 @@ elif analysis_focus == "Player Biometrics":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_acc_dist, use_container_width=True)
+                plotly_chart(fig_acc_dist, name=f"{analysis_focus}/acc_dist", use_container_width=True)
                 
             with col2:
                 st.subheader("Metabolic Power")
@@ -873,25 +809,28 @@ elif analysis_focus == "Player Biometrics":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_pl, use_container_width=True)
+                plotly_chart(fig_pl, name=f"{analysis_focus}/pl", use_container_width=True)
                 
                 # Additional graph: PlayerLoad Efficiency
                 st.subheader("PlayerLoad Efficiency")
-                fig_eff = px.scatter(
-                    player_df,
-                    x='player_load',
-                    y='velocity',
-                    color='acceleration',
-                    size='heart_rate',
-                    template='plotly_dark',
-                    trendline='ols',
-                    color_continuous_scale='viridis'
-                )
-                fig_eff.update_layout(
-                    plot_bgcolor=CARD_COLOR,
-                    paper_bgcolor=CARD_COLOR,
-                    font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_eff, use_container_width=True)
+                def build_eff():
+                    fig_eff = px.scatter(
+                        player_df,
+                        x='player_load',
+                        y='velocity',
+                        color='acceleration',
+                        size='heart_rate',
+                        template='plotly_dark',
+                        trendline='ols',
+                        color_continuous_scale='viridis'
+                    )
+                    fig_eff.update_layout(
+                        plot_bgcolor=CARD_COLOR,
+                        paper_bgcolor=CARD_COLOR,
+                        font=dict(color=TEXT_COLOR))
+                    return fig_eff
+
+                cached_plotly_chart(player_df, 'Player Biometrics', 'load_efficiency', build_eff, use_container_width=True)
                 
             with col2:
                 st.subheader("PlayerLoad Metrics")
@@ -921,24 +860,27 @@ elif analysis_focus == "Heart Rate Analysis":
         shots_df = df[df['success'] >= 0]  # Only shot actions
         
         if not shots_df.empty:
-            fig_hr_shot = px.scatter(
-                shots_df,
-                x='heart_rate',
-                y='success',
-                color='zone',
-                facet_col='player',
-                facet_col_wrap=3,
-                trendline='ols',
-                title="Shooting Success by Heart Rate and Court Zone",
-                labels={'success': 'Shot Success (1=made)', 'heart_rate': 'Heart Rate (bpm)'},
-                template='plotly_dark',
-                color_discrete_sequence=SPAIN_COLORS
-            )
-            fig_hr_shot.update_layout(
-                plot_bgcolor=CARD_COLOR,
-                paper_bgcolor=CARD_COLOR,
-                font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_hr_shot, use_container_width=True)
+            def build_hr_shot():
+                fig_hr_shot = px.scatter(
+                    shots_df,
+                    x='heart_rate',
+                    y='success',
+                    color='zone',
+                    facet_col='player',
+                    facet_col_wrap=3,
+                    trendline='ols',
+                    title="Shooting Success by Heart Rate and Court Zone",
+                    labels={'success': 'Shot Success (1=made)', 'heart_rate': 'Heart Rate (bpm)'},
+                    template='plotly_dark',
+                    color_discrete_sequence=SPAIN_COLORS
+                )
+                fig_hr_shot.update_layout(
+                    plot_bgcolor=CARD_COLOR,
+                    paper_bgcolor=CARD_COLOR,
+                    font=dict(color=TEXT_COLOR))
+                return fig_hr_shot
+
+            cached_plotly_chart(shots_df, 'Heart Rate Analysis', 'hr_vs_shooting', build_hr_shot, use_container_width=True)
         else:
             st.warning("No shot data available in selected range")
             
@@ -949,14 +891,19 @@ elif analysis_focus == "Heart Rate Analysis":
         shots_df['hr_zone'] = pd.cut(shots_df['heart_rate'], bins=hr_bins, labels=hr_labels)
         
         if not shots_df.empty:
-            zone_perf = shots_df.groupby('hr_zone')['success'].mean().reset_index()
+            # Expected FG% with a 95% interval over Monte Carlo replications of the shots
+            zone_perf = expected_fg(shots_df, 'hr_zone')
+            zone_perf['ci_plus'] = zone_perf['fg_hi'] - zone_perf['fg_expected']
+            zone_perf['ci_minus'] = zone_perf['fg_expected'] - zone_perf['fg_lo']
             fig_hr_zone = px.bar(
                 zone_perf,
                 x='hr_zone',
-                y='success',
+                y='fg_expected',
+                error_y='ci_plus',
+                error_y_minus='ci_minus',
                 color='hr_zone',
                 title="Shooting Efficiency by HR Zone",
-                labels={'success': 'Shooting Percentage'},
+                labels={'fg_expected': 'Expected Shooting Percentage'},
                 template='plotly_dark',
                 color_discrete_sequence=SPAIN_COLORS
             )
@@ -964,30 +911,19 @@ elif analysis_focus == "Heart Rate Analysis":
                 plot_bgcolor=CARD_COLOR,
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_hr_zone, use_container_width=True)
+            plotly_chart(fig_hr_zone, name=f"{analysis_focus}/hr_zone", use_container_width=True)
             
         # HR Recovery Analysis
         st.subheader("Heart Rate Recovery Analysis")
-        high_intensity_df = df[df['acceleration'] > 4].copy()
-        recovery_data = []
-        
-        for player in high_intensity_df['player'].unique():
-            player_events = high_intensity_df[high_intensity_df['player'] == player]
-            for idx, event in player_events.iterrows():
-                event_time = event['time']
-                post_hr = df[(df['player'] == player) & 
-                            (df['time'] > event_time) & 
-                            (df['time'] <= event_time + 5)]['heart_rate'].values
-                if len(post_hr) > 0:
-                    recovery = event['heart_rate'] - post_hr[-1]
-                    recovery_data.append({
-                        'player': player,
-                        'event_time': event_time,
-                        'recovery': recovery,
-                        'position': event['position']
-                    })
-                    
-        recovery_df = pd.DataFrame(recovery_data)
+        high_intensity_df = df[df['acceleration'] > 4]
+        # Last HR sample in (t, t + 5s] after every event, resolved in one pass
+        post = event_windows(df, high_intensity_df, {'post': (0, 5)}, closed='right')
+        recovery_df = pd.DataFrame({
+            'player': high_intensity_df['player'],
+            'event_time': high_intensity_df['time'],
+            'recovery': high_intensity_df['heart_rate'] - post['post_last'],
+            'position': high_intensity_df['position']
+        })[post['post_count'] > 0]
         
         if not recovery_df.empty:
             fig_recovery = px.box(
@@ -1003,7 +939,7 @@ elif analysis_focus == "Heart Rate Analysis":
                 plot_bgcolor=CARD_COLOR,
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_recovery, use_container_width=True)
+            plotly_chart(fig_recovery, name=f"{analysis_focus}/recovery", use_container_width=True)
     
     with col2:
         st.subheader("Heart Rate Analysis")
@@ -1021,7 +957,7 @@ elif analysis_focus == "Heart Rate Analysis":
             plot_bgcolor=CARD_COLOR,
             paper_bgcolor=CARD_COLOR,
             font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_hr_dist, use_container_width=True)
+        plotly_chart(fig_hr_dist, name=f"{analysis_focus}/hr_dist", use_container_width=True)
         
         # HR zones
         st.subheader("Optimal HR Zones")
@@ -1063,22 +999,25 @@ elif analysis_focus == "Tactical Insights":
             
             with col1:
                 # Player comparison
-                fig_pnr = px.line(
-                    pnr_df,
-                    x='time',
-                    y='velocity',
-                    color='player',
-                    facet_row='role',
-                    title="Player Velocity During Pick-and-Roll",
-                    hover_data=['action', 'heart_rate'],
-                    template='plotly_dark',
-                    color_discrete_sequence=SPAIN_COLORS
-                )
-                fig_pnr.update_layout(
-                    plot_bgcolor=CARD_COLOR,
-                    paper_bgcolor=CARD_COLOR,
-                    font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_pnr, use_container_width=True)
+                def build_pnr():
+                    fig_pnr = px.line(
+                        pnr_df,
+                        x='time',
+                        y='velocity',
+                        color='player',
+                        facet_row='role',
+                        title="Player Velocity During Pick-and-Roll",
+                        hover_data=['action', 'heart_rate'],
+                        template='plotly_dark',
+                        color_discrete_sequence=SPAIN_COLORS
+                    )
+                    fig_pnr.update_layout(
+                        plot_bgcolor=CARD_COLOR,
+                        paper_bgcolor=CARD_COLOR,
+                        font=dict(color=TEXT_COLOR))
+                    return fig_pnr
+
+                cached_plotly_chart(pnr_df, 'Tactical Insights', 'pnr_velocity', build_pnr, use_container_width=True)
                 
                 # Additional graph: Ball Handler Acceleration vs Screener Movement
                 st.subheader("Ball Handler vs Screener Coordination")
@@ -1115,7 +1054,16 @@ elif analysis_focus == "Tactical Insights":
                         paper_bgcolor=CARD_COLOR,
                         font=dict(color=TEXT_COLOR)
                     )
-                    st.plotly_chart(fig_coord, use_container_width=True)
+                    plotly_chart(fig_coord, name=f"{analysis_focus}/coord", use_container_width=True)
+
+                # Possessions overlapping the Pick-and-Roll, with the carrier's load joined per segment
+                st.subheader("Possession Segments")
+                carrier_load = (handler_df.groupby('possession_id')
+                                .agg(handler_velocity=('velocity', 'mean'), handler_hr=('heart_rate', 'mean')))
+                pnr_segments = load_segments(selected_game, game_sources.get(selected_game), version).join(carrier_load, on='possession_id', how='inner')
+                if not pnr_segments.empty:
+                    st.dataframe(pnr_segments.drop(columns='samples').round(2), hide_index=True,
+                                 use_container_width=True)
             
             with col2:
                 st.subheader("Efficiency Metrics")
@@ -1154,23 +1102,26 @@ elif analysis_focus == "Tactical Insights":
                 st.subheader("Defensive Pressure Index")
                 defense_df['def_pressure'] = defense_df['velocity'] * defense_df['acceleration']
                 
-                fig_pressure = px.density_contour(
-                    defense_df,
-                    x='x',
-                    y='y',
-                    z='def_pressure',
-                    histfunc='avg',
-                    title="Defensive Pressure by Court Area",
-                    template='plotly_dark',
-                    color_continuous_scale='thermal'
-                )
-                fig_pressure.update_layout(
-                    xaxis_range=[0, 28],
-                    yaxis_range=[0, 15],
-                    plot_bgcolor=CARD_COLOR,
-                    paper_bgcolor=CARD_COLOR,
-                    font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_pressure, use_container_width=True)
+                def build_pressure():
+                    fig_pressure = px.density_contour(
+                        defense_df,
+                        x='x',
+                        y='y',
+                        z='def_pressure',
+                        histfunc='avg',
+                        title="Defensive Pressure by Court Area",
+                        template='plotly_dark',
+                        color_continuous_scale='thermal'
+                    )
+                    fig_pressure.update_layout(
+                        xaxis_range=[0, 28],
+                        yaxis_range=[0, 15],
+                        plot_bgcolor=CARD_COLOR,
+                        paper_bgcolor=CARD_COLOR,
+                        font=dict(color=TEXT_COLOR))
+                    return fig_pressure
+
+                cached_plotly_chart(defense_df, 'Tactical Insights', 'defensive_pressure', build_pressure, use_container_width=True)
                 
                 # Player defensive efficiency
                 st.subheader("Defensive Efficiency by Player")
@@ -1193,7 +1144,7 @@ elif analysis_focus == "Tactical Insights":
                     plot_bgcolor=CARD_COLOR,
                     paper_bgcolor=CARD_COLOR,
                     font=dict(color=TEXT_COLOR))
-                st.plotly_chart(fig_def_eff, use_container_width=True)
+                plotly_chart(fig_def_eff, name=f"{analysis_focus}/def_eff", use_container_width=True)
             
             with col2:
                 st.subheader("Defensive Metrics")
@@ -1254,32 +1205,42 @@ elif analysis_focus == "Tactical Insights":
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR)
             )
-            st.plotly_chart(fig_radar, use_container_width=True)
+            plotly_chart(fig_radar, name=f"{analysis_focus}/radar", use_container_width=True)
             
             # Biometric impact on shot creation
             st.subheader("Physiological Impact on Shot Creation")
-            shot_biometric = df[df['action'] == 'shot'].groupby('player').agg({
+            shots = df[df['action'] == 'shot']
+            shot_biometric = shots.groupby('player', observed=True).agg({
                 'heart_rate': 'mean',
-                'velocity': 'mean',
-                'success': 'mean'
+                'velocity': 'mean'
             }).reset_index()
+            # Expected FG% per player with a 95% interval over Monte Carlo replications
+            shot_biometric = shot_biometric.merge(expected_fg(shots, 'player'), on='player')
+            shot_biometric['ci_plus'] = shot_biometric['fg_hi'] - shot_biometric['fg_expected']
+            shot_biometric['ci_minus'] = shot_biometric['fg_expected'] - shot_biometric['fg_lo']
             
-            fig_shot_bio = px.scatter(
-                shot_biometric,
-                x='heart_rate',
-                y='success',
-                size='velocity',
-                color='player',
-                title="Shot Success vs Heart Rate",
-                template='plotly_dark',
-                trendline='ols',
-                color_discrete_sequence=SPAIN_COLORS
-            )
-            fig_shot_bio.update_layout(
-                plot_bgcolor=CARD_COLOR,
-                paper_bgcolor=CARD_COLOR,
-                font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_shot_bio, use_container_width=True)
+            def build_shot_bio():
+                fig_shot_bio = px.scatter(
+                    shot_biometric,
+                    x='heart_rate',
+                    y='fg_expected',
+                    error_y='ci_plus',
+                    error_y_minus='ci_minus',
+                    size='velocity',
+                    color='player',
+                    title="Shot Success vs Heart Rate",
+                    labels={'fg_expected': 'Expected Shooting Percentage'},
+                    template='plotly_dark',
+                    trendline='ols',
+                    color_discrete_sequence=SPAIN_COLORS
+                )
+                fig_shot_bio.update_layout(
+                    plot_bgcolor=CARD_COLOR,
+                    paper_bgcolor=CARD_COLOR,
+                    font=dict(color=TEXT_COLOR))
+                return fig_shot_bio
+
+            cached_plotly_chart(df, 'Tactical Insights', 'shot_biometrics', build_shot_bio, use_container_width=True)
         
         with col2:
             st.subheader("Shot Creation Metrics")
@@ -1312,43 +1273,34 @@ elif analysis_focus == "Recovery Metrics":
     with col1:
         # Recovery timeline
         st.subheader("Recovery Profile Timeline")
-        fig_recovery = px.line(
-            filtered_df,
-            x='time',
-            y='heart_rate',
-            color='player',
-            facet_row='position',
-            title="Heart Rate Recovery Timeline",
-            template='plotly_dark',
-            color_discrete_sequence=SPAIN_COLORS
-        )
-        fig_recovery.update_layout(
-            plot_bgcolor=CARD_COLOR,
-            paper_bgcolor=CARD_COLOR,
-            font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_recovery, use_container_width=True)
+        def build_recovery():
+            fig_recovery = px.line(
+                filtered_df,
+                x='time',
+                y='heart_rate',
+                color='player',
+                facet_row='position',
+                title="Heart Rate Recovery Timeline",
+                template='plotly_dark',
+                color_discrete_sequence=SPAIN_COLORS
+            )
+            fig_recovery.update_layout(
+                plot_bgcolor=CARD_COLOR,
+                paper_bgcolor=CARD_COLOR,
+                font=dict(color=TEXT_COLOR))
+            return fig_recovery
+
+        cached_plotly_chart(filtered_df, 'Recovery Metrics', 'recovery_timeline', build_recovery, use_container_width=True)
         
         # Recovery rate analysis
         st.subheader("Recovery Rate Analysis")
-        high_intensity_df = filtered_df[filtered_df['acceleration'] > 4].copy()
-        recovery_data = []
-        
-        for player in high_intensity_df['player'].unique():
-            player_events = high_intensity_df[high_intensity_df['player'] == player]
-            for idx, event in player_events.iterrows():
-                event_time = event['time']
-                post_hr = filtered_df[(filtered_df['player'] == player) & 
-                                     (filtered_df['time'] > event_time) & 
-                                     (filtered_df['time'] <= event_time + 10)]['heart_rate'].values
-                if len(post_hr) > 0:
-                    recovery_rate = (event['heart_rate'] - post_hr[-1]) / 10  # bpm per minute
-                    recovery_data.append({
-                        'player': player,
-                        'position': event['position'],
-                        'recovery_rate': recovery_rate
-                    })
-                    
-        recovery_df = pd.DataFrame(recovery_data)
+        high_intensity_df = filtered_df[filtered_df['acceleration'] > 4]
+        post = event_windows(filtered_df, high_intensity_df, {'post': (0, 10)}, closed='right')
+        recovery_df = pd.DataFrame({
+            'player': high_intensity_df['player'],
+            'position': high_intensity_df['position'],
+            'recovery_rate': (high_intensity_df['heart_rate'] - post['post_last']) / 10  # bpm per minute
+        })[post['post_count'] > 0]
         
         if not recovery_df.empty:
             fig_recovery_rate = px.box(
@@ -1364,7 +1316,7 @@ elif analysis_focus == "Recovery Metrics":
                 plot_bgcolor=CARD_COLOR,
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_recovery_rate, use_container_width=True)
+            plotly_chart(fig_recovery_rate, name=f"{analysis_focus}/recovery_rate", use_container_width=True)
             
         # Fatigue analysis
         st.subheader("Fatigue Development")
@@ -1381,7 +1333,7 @@ elif analysis_focus == "Recovery Metrics":
             plot_bgcolor=CARD_COLOR,
             paper_bgcolor=CARD_COLOR,
             font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_fatigue, use_container_width=True)
+        plotly_chart(fig_fatigue, name=f"{analysis_focus}/fatigue", use_container_width=True)
     
     with col2:
         st.subheader("Recovery Metrics")
@@ -1438,47 +1390,53 @@ elif analysis_focus == "PlayerLoad Insights":
                 plot_bgcolor=CARD_COLOR,
                 paper_bgcolor=CARD_COLOR,
                 font=dict(color=TEXT_COLOR))
-            st.plotly_chart(fig_eff, use_container_width=True)
+            plotly_chart(fig_eff, name=f"{analysis_focus}/eff", use_container_width=True)
         
         else:
             st.warning("No efficiency data available")
             
         # PlayerLoad accumulation patterns
         st.subheader("PlayerLoad Accumulation Patterns")
-        fig_pl_accum = px.area(
-            filtered_df,
-            x='time',
-            y='player_load',
-            color='player',
-            facet_row='position',
-            title="PlayerLoad Accumulation by Position",
-            template='plotly_dark',
-            color_discrete_sequence=SPAIN_COLORS
-        )
-        fig_pl_accum.update_layout(
-            plot_bgcolor=CARD_COLOR,
-            paper_bgcolor=CARD_COLOR,
-            font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_pl_accum, use_container_width=True)
+        def build_pl_accum():
+            fig_pl_accum = px.area(
+                filtered_df,
+                x='time',
+                y='player_load',
+                color='player',
+                facet_row='position',
+                title="PlayerLoad Accumulation by Position",
+                template='plotly_dark',
+                color_discrete_sequence=SPAIN_COLORS
+            )
+            fig_pl_accum.update_layout(
+                plot_bgcolor=CARD_COLOR,
+                paper_bgcolor=CARD_COLOR,
+                font=dict(color=TEXT_COLOR))
+            return fig_pl_accum
+
+        cached_plotly_chart(filtered_df, 'PlayerLoad Insights', 'load_accumulation', build_pl_accum, use_container_width=True)
         
         # PlayerLoad vs Performance
         st.subheader("PlayerLoad vs Performance Metrics")
-        fig_pl_perf = px.scatter(
-            filtered_df,
-            x='player_load',
-            y='velocity',
-            color='heart_rate',
-            size='acceleration',
-            trendline='ols',
-            title="PlayerLoad vs Velocity",
-            template='plotly_dark',
-            color_continuous_scale='viridis'
-        )
-        fig_pl_perf.update_layout(
-            plot_bgcolor=CARD_COLOR,
-            paper_bgcolor=CARD_COLOR,
-            font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_pl_perf, use_container_width=True)
+        def build_pl_perf():
+            fig_pl_perf = px.scatter(
+                filtered_df,
+                x='player_load',
+                y='velocity',
+                color='heart_rate',
+                size='acceleration',
+                trendline='ols',
+                title="PlayerLoad vs Velocity",
+                template='plotly_dark',
+                color_continuous_scale='viridis'
+            )
+            fig_pl_perf.update_layout(
+                plot_bgcolor=CARD_COLOR,
+                paper_bgcolor=CARD_COLOR,
+                font=dict(color=TEXT_COLOR))
+            return fig_pl_perf
+
+        cached_plotly_chart(filtered_df, 'PlayerLoad Insights', 'load_vs_performance', build_pl_perf, use_container_width=True)
     
     with col2:
         st.subheader("PlayerLoad Insights")
@@ -1552,7 +1510,7 @@ elif analysis_focus == "Team Performance":
             plot_bgcolor=CARD_COLOR,
             paper_bgcolor=CARD_COLOR,
             font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_metrics, use_container_width=True)
+        plotly_chart(fig_metrics, name=f"{analysis_focus}/metrics", use_container_width=True)
         
         # Energy expenditure timeline
         st.subheader("Energy Expenditure Timeline")
@@ -1569,7 +1527,7 @@ elif analysis_focus == "Team Performance":
             plot_bgcolor=CARD_COLOR,
             paper_bgcolor=CARD_COLOR,
             font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_energy, use_container_width=True)
+        plotly_chart(fig_energy, name=f"{analysis_focus}/energy", use_container_width=True)
         
         # Lineup efficiency
         st.subheader("Lineup Efficiency Analysis")
@@ -1597,7 +1555,7 @@ elif analysis_focus == "Team Performance":
             plot_bgcolor=CARD_COLOR,
             paper_bgcolor=CARD_COLOR,
             font=dict(color=TEXT_COLOR))
-        st.plotly_chart(fig_lineup, use_container_width=True)
+        plotly_chart(fig_lineup, name=f"{analysis_focus}/lineup", use_container_width=True)
     
     with col2:
         st.subheader("Team Performance")
@@ -1643,4 +1601,6 @@ st.markdown("""
         <b>Advanced Basketball Intelligence System</b><br>
         <i>Spanish National Team - Integrated Physiological & Tactical Analysis</i><br>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+profile.finish()
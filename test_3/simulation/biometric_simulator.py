@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 from possession_simulator import simulate_possession
 
 # Intensity mapping (from PDF pages 10-11)
@@ -47,65 +48,101 @@ ACTION_INTENSITY = {
 # Default moderate intensity for unknown actions
 DEFAULT_INTENSITY = {"hr_change": 2, "speed": 2.0, "accel": 1.0, "pl": 0.1}
 
+SAMPLE_INTERVAL = 0.5  # s between biometric samples
+SHOT_CLOCK = 24.0  # s, last sample time of a possession
+BASE_HR = 90  # bpm at the start of a possession (before the per-player offset)
+HR_GAIN = 15.0  # bpm of steady-state HR rise per unit of action intensity ("hr_change")
+TAU_RANGE = (20, 40)  # s, per-player HR time constants (whole seconds)
+
+
+def hr_response(drive, tau, base_hr, dt=SAMPLE_INTERVAL):
+    """
+    First-order HR kinetics for many series at once.
+
+    Each row of `drive` is the steady-state HR rise (bpm above the row's
+    baseline) demanded at every sample; HR approaches it exponentially with
+    the row's time constant, both when intensity rises (on-kinetics) and when
+    it drops (off-kinetics):
+
+        y[n] = a * y[n-1] + (1 - a) * drive[n],   a = exp(-dt / tau)
+
+    The recurrence is a linear filter, so all rows sharing a time constant
+    are filtered in one `lfilter` call along the time axis.
+    """
+    excess = np.empty_like(drive)
+    for value in np.unique(tau):
+        rows = tau == value
+        a = np.exp(-dt / value)
+        excess[rows] = lfilter([1 - a], [1, -a], drive[rows], axis=1)
+    return base_hr[:, None] + excess
+
+
 def generate_biometrics(possession_df):
-    times = np.arange(0, 24.1, 0.5)  # 0.5s intervals (0.0 to 24.0)
-    player_data = []
+    """
+    Biometric samples every 0.5 s for the actions of a possession table.
+
+    Every (player, second) action yields the samples of that second. With a
+    `possession` column, each possession of a player is a separate series
+    starting from the player's baseline HR.
+    """
     np.random.seed(42)  # For reproducibility
-    
-    # Individual baseline HR for each player
-    base_hr = 90
-    hr_variation = {player: np.random.randint(-5, 6) for player in possession_df['player'].unique()}
-    
-    for player in possession_df['player'].unique():
-        hr = base_hr + hr_variation[player]
-        pl_total = 0.0  # Cumulative PlayerLoad
-        
-        for t in times:
-            # Get nearest second action (floor the time)
-            second = int(np.floor(t))
-            action_row = possession_df[
-                (possession_df['time'] == second) & 
-                (possession_df['player'] == player)
-            ]
-            
-            if not action_row.empty:
-                action = action_row['action'].values[0]
-                x = action_row['x'].values[0]
-                y = action_row['y'].values[0]
-                
-                # Get intensity profile or use default
-                intensity = ACTION_INTENSITY.get(action, DEFAULT_INTENSITY)
-                
-                # Update heart rate with random variation
-                hr_change = intensity["hr_change"] + np.random.uniform(-1.5, 1.5)
-                hr += hr_change
-                hr = np.clip(hr, 50, 190)  # Keep within physiological range
-                
-                # Calculate velocity and acceleration with randomness
-                speed = intensity["speed"] * np.random.uniform(0.5, 1.5)
-                accel = intensity["accel"] * np.random.uniform(0.5, 1.5)
-                
-                # Update PlayerLoad with randomness
-                pl_increment = intensity["pl"] * np.random.uniform(0.8, 1.2)
-                pl_total += pl_increment
-                
-                # Add physiological lag effect
-                if t > 0 and t % 1 == 0.5:  # At half-second marks
-                    hr = hr * 0.99  # Slight decay if no new stimulus
-                
-                player_data.append({
-                    'time': round(t, 1),
-                    'player': player,
-                    'x': x,
-                    'y': y,
-                    'action': action,
-                    'heart_rate': int(hr),
-                    'velocity': round(speed, 2),
-                    'acceleration': round(accel, 2),
-                    'player_load': round(pl_total, 2)
-                })
-    
-    return pd.DataFrame(player_data)
+    keys = ['possession', 'player'] if 'possession' in possession_df.columns else ['player']
+    rows = possession_df.drop_duplicates(keys + ['time'])
+
+    # Individual baseline HR and HR time constant of each player
+    players = possession_df['player'].unique()
+    hr_variation = pd.Series(np.random.randint(-5, 6, len(players)), index=players)
+    tau = pd.Series(np.random.randint(TAU_RANGE[0], TAU_RANGE[1] + 1, len(players)), index=players)
+
+    # One grid row per series, one column per sample time (0.0 to 24.0)
+    times = np.arange(0, SHOT_CLOCK + SAMPLE_INTERVAL / 2, SAMPLE_INTERVAL)
+    per_second = int(round(1 / SAMPLE_INTERVAL))
+    series = rows.groupby(keys, sort=False).ngroup().to_numpy()
+    series_player = rows.groupby(keys, sort=False)['player'].first().to_numpy()
+    first_col = rows['time'].to_numpy().astype(int) * per_second
+    cell_row = np.repeat(np.arange(len(rows)), per_second)
+    cell_col = np.repeat(first_col, per_second) + np.tile(np.arange(per_second), len(rows))
+    keep = cell_col < len(times)
+    cell_row, cell_col = cell_row[keep], cell_col[keep]
+    order = np.lexsort((cell_col, series[cell_row]))
+    cell_row, cell_col = cell_row[order], cell_col[order]
+    cell_series = series[cell_row]
+    n = len(cell_row)
+
+    # Intensity profile of every sample (last profile row: default for unknown actions)
+    profiles = pd.DataFrame([*ACTION_INTENSITY.values(), DEFAULT_INTENSITY])
+    codes = pd.Categorical(rows['action'], categories=list(ACTION_INTENSITY)).codes
+    intensity = profiles.iloc[np.where(codes < 0, len(ACTION_INTENSITY), codes)[cell_row]]
+
+    # HR is driven towards the intensity's steady state; samples without an
+    # action (off court) drive it back to the baseline
+    drive = np.zeros((series.max() + 1 if len(series) else 0, len(times)))
+    demand = intensity['hr_change'].to_numpy() + np.random.uniform(-1.5, 1.5, n)
+    drive[cell_series, cell_col] = HR_GAIN * np.clip(demand, 0, None)
+    base_hr = BASE_HR + hr_variation.reindex(series_player).to_numpy()
+    hr = hr_response(drive, tau.reindex(series_player).to_numpy(), base_hr)
+    heart_rate = np.clip(hr[cell_series, cell_col], 50, 190)  # Keep within physiological range
+
+    # Velocity, acceleration and cumulative PlayerLoad with randomness
+    speed = intensity['speed'].to_numpy() * np.random.uniform(0.5, 1.5, n)
+    accel = intensity['accel'].to_numpy() * np.random.uniform(0.5, 1.5, n)
+    pl_increment = intensity['pl'].to_numpy() * np.random.uniform(0.8, 1.2, n)
+    pl_total = pd.Series(pl_increment).groupby(cell_series).cumsum().to_numpy()
+
+    biometrics = pd.DataFrame({
+        'time': times[cell_col].round(1),
+        'player': rows['player'].to_numpy()[cell_row],
+        'x': rows['x'].to_numpy()[cell_row],
+        'y': rows['y'].to_numpy()[cell_row],
+        'action': rows['action'].to_numpy()[cell_row],
+        'heart_rate': heart_rate.astype(int),
+        'velocity': speed.round(2),
+        'acceleration': accel.round(2),
+        'player_load': pl_total.round(2),
+    })
+    if 'possession' in keys:
+        biometrics.insert(0, 'possession', rows['possession'].to_numpy()[cell_row])
+    return biometrics
 
 if __name__ == "__main__":
     print("Simulating possession data...")
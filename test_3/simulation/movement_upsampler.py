@@ -0,0 +1,148 @@
+"""
+Smooth 25 fps trajectories from the 1 s keyframes of a simulated possession.
+
+`simulate_possession` gives one position per player and second. The
+keyframes of all players are interpolated at once with cubic Hermite
+splines over a (keyframe x player x axis) tensor:
+
+* tangents follow Fritsch-Carlson per axis (zero at a turn or a stop, so
+  players standing still do not drift and paths never overshoot the court);
+* tangent speeds are clamped to MAX_SPEED, and players start and end at rest.
+
+Only the keyframe tangents are clamped, not the speed between keyframes. A
+segment covering d m in h s with a stop or a turn at both ends peaks at
+1.5 d/h, so a 6 m step from rest reaches 9 m/s. Lowering the tangents cannot
+fix that (zero tangents give the 1.5 d/h peak), and a player starting from
+rest cannot cover 6 m in 1 s on a cubic without exceeding 7 m/s, so the
+speed stays below MAX_SPEED only when keyframes are less than
+~MAX_SPEED / 1.5 = 4.7 m apart per second. The default `simulate_possession`
+moves players at most ~4.3 m per keyframe, which peaks at ~6.3 m/s.
+
+Acceleration is not limited: the path goes exactly through every keyframe,
+so its accelerations are set by the keyframes. A player leaving a hold and
+covering d m in the next 1 s keyframe needs at least 2d m/s^2, and a cubic
+segment with a stop or a turn at both ends peaks at 6d m/s^2. The default
+`simulate_possession` moves players up to 4 m from a standstill between
+keyframes, which gives acc_mps2 peaks of about +-23 m/s^2, far above the
+~4-6 m/s^2 of real players. Smoothed tangents (natural splines, Catmull-Rom)
+only bring that to ~13-17 m/s^2 and overshoot the court lines, so realistic
+accelerations need denser or smoother keyframes rather than another
+interpolant.
+
+The result has the test_2 tracking schema (simulated_positions.csv), in the
+test_2 half-court frame (x from the baseline, basket side at x = 0), so
+test_2's tactical_metrics and physical_metrics run on it unchanged.
+"""
+
+import numpy as np
+import pandas as pd
+
+FPS = 25
+MAX_SPEED = 7.0  # m/s, top sprint speed of a player
+# No acceleration limit: acc_mps2 follows the keyframes (see the module docstring)
+COURT_LENGTH = 28.0  # m, test_3 x grows towards the basket at the end of the court
+TRACKING_COLUMNS = ['frame', 'time_s', 'player_id', 'x_m', 'y_m', 'vx', 'vy',
+                    'speed_mps', 'acc_mps2', 'step_dist_m']
+
+
+def keyframe_tensor(possession_df):
+    """
+    Keyframe positions of every player, in the test_2 court frame.
+
+    Returns:
+        (times, players, keys): sorted keyframe times, sorted player labels
+        and a (len(times), len(players), 2) array. Players without a keyframe
+        at some time hold their previous (or first) position.
+    """
+    time_codes, times = pd.factorize(possession_df['time'], sort=True)
+    player_codes, players = pd.factorize(possession_df['player'], sort=True)
+    keys = np.full((len(times), len(players), 2), np.nan)
+    keys[time_codes, player_codes, 0] = COURT_LENGTH - possession_df['x'].to_numpy(np.float64)
+    keys[time_codes, player_codes, 1] = possession_df['y'].to_numpy(np.float64)
+    filled = pd.DataFrame(keys.reshape(len(times), -1)).ffill().bfill().to_numpy()
+    return np.asarray(times, dtype=np.float64), np.asarray(players), filled.reshape(keys.shape)
+
+
+def hermite_tangents(times, keys, max_speed=MAX_SPEED):
+    """Fritsch-Carlson tangents of every keyframe, with their speed clamped to `max_speed`."""
+    dt = np.diff(times)[:, None, None]
+    slopes = np.diff(keys, axis=0) / dt
+    left, right = slopes[:-1], slopes[1:]
+    w_left, w_right = 2 * dt[1:] + dt[:-1], dt[1:] + 2 * dt[:-1]
+    tangents = np.zeros_like(keys)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w_left + w_right) / (w_left / left + w_right / right)
+    # Zero where the path turns or stops on that axis
+    tangents[1:-1] = np.where(left * right > 0, harmonic, 0.0)
+
+    speed = np.hypot(tangents[..., 0], tangents[..., 1])
+    scale = np.minimum(1.0, max_speed / np.maximum(speed, 1e-12))
+    return tangents * scale[..., None]
+
+
+def upsample_positions(times, keys, tangents, fps=FPS):
+    """Hermite positions at every frame: (frame_times, (frames, players, 2) array)."""
+    n_frames = int(round((times[-1] - times[0]) * fps)) + 1
+    frame_times = times[0] + np.arange(n_frames) / fps
+    seg = np.clip(np.searchsorted(times, frame_times, side='right') - 1, 0, len(times) - 2)
+    h = (times[seg + 1] - times[seg])[:, None, None]
+    s = ((frame_times - times[seg]) / h[:, 0, 0])[:, None, None]
+    s2, s3 = s * s, s * s * s
+    # Hermite basis written around the segment start, so held positions stay exact
+    positions = (keys[seg] + (3 * s2 - 2 * s3) * (keys[seg + 1] - keys[seg])
+                 + (s3 - 2 * s2 + s) * h * tangents[seg] + (s3 - s2) * h * tangents[seg + 1])
+    return frame_times, positions
+
+
+def upsample_possession(possession_df, fps=FPS, max_speed=MAX_SPEED):
+    """
+    25 fps tracking of a keyframed possession (columns time, player, x, y).
+
+    Returns:
+        Frame with TRACKING_COLUMNS sorted by player and frame. `player_id`
+        is the 1-based position of the player label in sorted order
+        (A1..A5 -> 1..5, D1..D5 -> 6..10); kinematics are finite differences
+        per player as in test_2 (NaN where undefined). Only the keyframe
+        tangents are clamped to `max_speed`: between keyframes the speed
+        can reach 1.5x the keyframe step (see the module docstring), and
+        acc_mps2 is only as smooth as the keyframes.
+    """
+    times, players, keys = keyframe_tensor(possession_df)
+    if len(times) < 2:
+        raise ValueError("At least two keyframe times are needed to upsample a possession")
+    tangents = hermite_tangents(times, keys, max_speed)
+    frame_times, positions = upsample_positions(times, keys, tangents, fps)
+
+    # (players, frames, 2): tracking rows are player-major
+    positions = positions.transpose(1, 0, 2)
+    n_players, n_frames, _ = positions.shape
+    velocity = np.full_like(positions, np.nan)
+    velocity[:, 1:] = np.diff(positions, axis=1) * fps
+    speed = np.hypot(velocity[..., 0], velocity[..., 1])
+    acc = np.full_like(speed, np.nan)
+    acc[:, 2:] = np.diff(speed[:, 1:], axis=1) * fps
+    step = np.nan_to_num(speed / fps)
+
+    return pd.DataFrame({
+        'frame': np.tile(np.arange(n_frames), n_players),
+        'time_s': np.tile(frame_times, n_players),
+        'player_id': np.repeat(np.arange(1, n_players + 1), n_frames),
+        'x_m': positions[..., 0].ravel(),
+        'y_m': positions[..., 1].ravel(),
+        'vx': velocity[..., 0].ravel(),
+        'vy': velocity[..., 1].ravel(),
+        'speed_mps': speed.ravel(),
+        'acc_mps2': acc.ravel(),
+        'step_dist_m': step.ravel(),
+    }, columns=TRACKING_COLUMNS)
+
+
+if __name__ == "__main__":
+    from possession_simulator import simulate_possession
+
+    possession = simulate_possession()
+    tracking = upsample_possession(possession)
+    tracking.to_csv('../data/upsampled_positions.csv', index=False)
+    players = sorted(possession['player'].unique())
+    print(f"Upsampled tracking saved to data/upsampled_positions.csv ({len(tracking)} rows at {FPS} fps)")
+    print("player_id:", ", ".join(f"{i} = {p}" for i, p in enumerate(players, start=1)))
@@ -1,15 +1,22 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-from PIL import Image
-from sklearn.cluster import KMeans, DBSCAN
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.manifold import TSNE
 from streamlit_option_menu import option_menu
 
+# Make the shared feb_analytics package importable
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from feb_analytics.data_view import PlayerTimeIndex
+from feb_analytics.feature_store import available_games, game_version, load_features, load_game_features
+from feb_analytics.ingest import data_version
+from feb_analytics.partitioned import dataset_dir
+from feb_analytics.profiling import start_profile
 from utils.styling import inject_custom_css, render_header
-from pages import overview, biometrics, heart_rate, tactics, recovery, player_load, team
+from pages import DASHBOARD_STEPS, overview, biometrics, heart_rate, tactics, recovery, player_load, team
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -18,60 +25,63 @@ st.set_page_config(
     page_icon="🏀" # Standard emoji is fine for browser tab
 )
 
+# Render-time profile of this rerun (enabled with FEB_PROFILE=1 or ?profile=1)
+profile = start_profile('test_4')
+
+# Partitioned layout of the data directory (python -m feb_analytics.partitioned)
+PARTITIONED_ROOT = dataset_dir('data', 'integrated_dataset')
+
 # --- Load Custom CSS ---
 inject_custom_css()
 
 # --- Data Loading and Caching ---
-@st.cache_data
-def load_data():
+# load_data and load_view keep the current and the previous version (or game),
+# so each new version replaces the oldest copy instead of adding one
+CACHE_ENTRIES = 2
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_data(game=None, source=None, version=0):
     """
     Loads, processes, and enhances the basketball dataset.
-    This function is cached to improve performance.
+    This function is cached to improve performance; `version` identifies the
+    data (ingest version of data/ and import of the game), so new data is
+    picked up on the next rerun.
     """
+    if game is not None:
+        # Only the rows (or partitions) of the selected game are read
+        return load_game_features(game, steps=DASHBOARD_STEPS, source=source)
     try:
-        df = pd.read_csv('data/integrated_dataset.csv')
+        # Derived columns are attached from the shared on-disk feature store
+        df = load_features('data/integrated_dataset.csv', steps=DASHBOARD_STEPS)
     except FileNotFoundError:
         st.error("Error: The data file 'data/integrated_dataset.csv' was not found.")
         st.info("Please make sure the data file is in the 'data' directory.")
         return pd.DataFrame() # Return empty dataframe
 
-    # Enhanced feature engineering (as in original script)
-    np.random.seed(42)
-    shots = df[df['action'] == 'shot'].copy()
-    shot_zones = []
-    for _, row in shots.iterrows():
-        x, y = row['x'], row['y']
-        if x >= 25 and 5 <= y <= 10: shot_zones.append('Paint')
-        elif x >= 22 and (y < 5 or y > 10): shot_zones.append('Mid-Range')
-        elif x < 22: shot_zones.append('Three-Pointer')
-        else: shot_zones.append('Other')
-    shots['zone'] = shot_zones
-    zone_probs = {'Paint': 0.65, 'Mid-Range': 0.45, 'Three-Pointer': 0.38, 'Other': 0.25}
-    shots['success'] = [np.random.binomial(1, zone_probs[z]) for z in shots['zone']]
-    df = df.merge(shots[['time', 'player', 'success', 'zone']], on=['time', 'player'], how='left')
-    df['success'] = df['success'].fillna(-1)
-
-    df['tactical_situation'] = 'Initial Setup'
-    df.loc[df['time'].between(7, 10), 'tactical_situation'] = 'Pick-and-Roll'
-    df.loc[df['time'].between(11, 15), 'tactical_situation'] = 'Second Action'
-    df.loc[df['time'] >= 15, 'tactical_situation'] = 'Shot Outcome'
-    df['role'] = np.where(df['player'].str.startswith('A'), 'Offense', 'Defense')
-    df['exertion_index'] = 0.4 * df['heart_rate'] + 0.3 * df['velocity'] + 0.3 * df['acceleration']
-    df['recovery_phase'] = np.select(
-        [(df['exertion_index'] > df.groupby('player')['exertion_index'].transform('mean') + 15),
-         (df['exertion_index'] < df.groupby('player')['exertion_index'].transform('mean') - 10)],
-        ['High Exertion', 'Recovery Phase'], default='Normal'
-    )
-    df['offensive_eff'] = np.where(df['role'] == 'Offense', df['player_load'] / (df['velocity'] + 0.1), np.nan)
-    df['defensive_eff'] = np.where(df['role'] == 'Defense', df['player_load'] / (df['acceleration'] + 0.1), np.nan)
-
     return df
 
-df = load_data()
+@st.cache_resource(max_entries=CACHE_ENTRIES)
+def load_view(game=None, source=None, version=0):
+    """Sorted (player, time) index over the dataset, shared by all sessions."""
+    df = load_data(game, source, version)
+    return PlayerTimeIndex(df) if not df.empty else None
+
+# Games of the warehouse or of the game=/player= partitioned layout; the bundled CSV otherwise
+game_sources = available_games(PARTITIONED_ROOT)
+selected_game = st.sidebar.selectbox("Game", list(game_sources)) if game_sources else None
+# Bumped by `python -m feb_analytics.ingest data --watch` when files change, and
+# by a warehouse re-import or partitioned rewrite of the selected game
+version = (data_version('data'),
+           game_version(selected_game, game_sources[selected_game]) if selected_game else None)
+
+with profile.stage('load'):
+    view = load_view(selected_game, game_sources.get(selected_game), version)
 
-if df.empty:
+if view is None:
     st.stop()
 
+df = view.frame
+
 # --- Sidebar for Global Filters ---
 with st.sidebar:
     st.markdown("## Global Filters")
@@ -83,11 +93,12 @@ with st.sidebar:
 
     st.markdown("---")
     st.markdown("## AI Model Selection")
+    # Model specs (kind, hyperparameters); fits are cached in feb_analytics.embeddings
     ai_models = {
-        "KMeans Clustering": KMeans(n_clusters=3, random_state=42, n_init=10),
-        "DBSCAN": DBSCAN(eps=0.5, min_samples=5),
-        "PCA": PCA(n_components=2),
-        "t-SNE": TSNE(n_components=2, perplexity=5, random_state=42) # Reduced perplexity for small datasets
+        "KMeans Clustering": ('kmeans', {'n_clusters': 3, 'random_state': 42, 'n_init': 10}),
+        "DBSCAN": ('dbscan', {'eps': 0.5, 'min_samples': 5}),
+        "PCA": ('pca', {'n_components': 2}),
+        "t-SNE": ('tsne', {'n_components': 2, 'perplexity': 5, 'random_state': 42}) # Reduced perplexity for small datasets
     }
     selected_model_name = st.selectbox("Select Clustering/Dimensionality Model", list(ai_models.keys()))
 
@@ -125,28 +136,28 @@ selected_page = option_menu(
 st.markdown("---",)
 
 # --- Filtering Data Based on Sidebar ---
-filtered_df = df[(df['time'] >= time_range[0]) & (df['time'] <= time_range[1])]
-if selected_player != 'All Players':
-    filtered_df = filtered_df[filtered_df['player'] == selected_player]
-else:
+# Binary searches over the pre-sorted view; single-player selections are zero-copy slices
+with profile.stage('filter'):
+    filtered_df = view.select(selected_player, time_range)
     # For team-level views that need all players in the time range
-    pass
+    team_df = view.select(time_range=time_range)
 
 # --- Page Routing ---
-if selected_page == "Overview":
-    overview.render(filtered_df, ai_models, selected_model_name)
-elif selected_page == "Player Biometrics":
-    biometrics.render(filtered_df, selected_player)
-elif selected_page == "Heart Rate Analysis":
-    heart_rate.render(df, time_range) # Pass original df for broader analysis
-elif selected_page == "Tactical Insights":
-    tactics.render(df, time_range) # Pass original df
-elif selected_page == "Recovery Metrics":
-    recovery.render(filtered_df)
-elif selected_page == "PlayerLoad Insights":
-    player_load.render(filtered_df)
-elif selected_page == "Team Performance":
-    team.render(df, time_range) # Pass original df
+with profile.stage(f"page:{selected_page}"):
+    if selected_page == "Overview":
+        overview.render(filtered_df, ai_models, selected_model_name)
+    elif selected_page == "Player Biometrics":
+        biometrics.render(filtered_df, selected_player)
+    elif selected_page == "Heart Rate Analysis":
+        heart_rate.render(team_df)
+    elif selected_page == "Tactical Insights":
+        tactics.render(team_df)
+    elif selected_page == "Recovery Metrics":
+        recovery.render(filtered_df)
+    elif selected_page == "PlayerLoad Insights":
+        player_load.render(filtered_df)
+    elif selected_page == "Team Performance":
+        team.render(team_df)
 
 # --- Footer ---
 st.markdown("---")
@@ -155,4 +166,6 @@ st.markdown("""
         <p>Advanced Basketball Intelligence System v3.0 | Bauhaus Edition</p>
         <p>Developed for the Spanish National Team</p>
     </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+profile.finish()
@@ -0,0 +1,3 @@
+# Feature steps used by the pages (see feb_analytics.features.FEATURE_STEPS);
+# shared by app.py and report.py so the stored feature files are shared too
+DASHBOARD_STEPS = ['shot_outcomes', 'tactical_context', 'recovery_phase', 'efficiency']
@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from scipy import stats
-from sklearn.cluster import KMeans
+
+from feb_analytics.figure_cache import cached_plotly_chart
+from feb_analytics.lazy import lazy_import
+from feb_analytics.shot_simulation import expected_fg
+
+# Loaded on first use so scipy is only imported when this page renders
+stats = lazy_import('scipy.stats')
 
 # --- Color Definitions ---
 THEME_PRIMARY = "#FF6B6B"
@@ -32,21 +36,25 @@ def render(df, selected_player):
         with st.container():
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown("<h4>Heart Rate with Game Context</h4>", unsafe_allow_html=True)
-            fig_hr = px.line(player_df, x='time', y='heart_rate', markers=True, template="plotly_white",
-                             hover_data=['action', 'tactical_situation', 'zone'])
-            fig_hr.update_traces(line_color=THEME_PRIMARY)
-
-            for situation in player_df['tactical_situation'].unique():
-                sit_df = player_df[player_df['tactical_situation'] == situation]
-                if not sit_df.empty:
-                    fig_hr.add_vrect(
-                        x0=sit_df['time'].min(), x1=sit_df['time'].max(),
-                        fillcolor=SPAIN_YELLOW if situation == "Pick-and-Roll" else SPAIN_BLUE,
-                        opacity=0.15, line_width=0, annotation_text=situation, annotation_position="top left"
-                    )
-            
-            fig_hr.update_layout(xaxis_title="Time (seconds)", yaxis_title="Heart Rate (bpm)", hovermode="x unified")
-            st.plotly_chart(fig_hr, use_container_width=True)
+
+            def build_hr():
+                fig_hr = px.line(player_df, x='time', y='heart_rate', markers=True, template="plotly_white",
+                                 hover_data=['action', 'tactical_situation', 'zone'])
+                fig_hr.update_traces(line_color=THEME_PRIMARY)
+
+                for situation in player_df['tactical_situation'].unique():
+                    sit_df = player_df[player_df['tactical_situation'] == situation]
+                    if not sit_df.empty:
+                        fig_hr.add_vrect(
+                            x0=sit_df['time'].min(), x1=sit_df['time'].max(),
+                            fillcolor=SPAIN_YELLOW if situation == "Pick-and-Roll" else SPAIN_BLUE,
+                            opacity=0.15, line_width=0, annotation_text=situation, annotation_position="top left"
+                        )
+
+                fig_hr.update_layout(xaxis_title="Time (seconds)", yaxis_title="Heart Rate (bpm)", hovermode="x unified")
+                return fig_hr
+
+            cached_plotly_chart(player_df, 'biometrics', 'hr_context', build_hr, use_container_width=True)
             
             st.markdown("---")
             st.markdown("<h4>Performance Analysis by HR Zone</h4>", unsafe_allow_html=True)
@@ -54,40 +62,51 @@ def render(df, selected_player):
             hr_zones_labels = ['Optimal (<140)', 'Effective (140-160)', 'High Stress (160-180)', 'Critical (>180)']
             player_df['hr_zone'] = pd.cut(player_df['heart_rate'], bins=hr_zones_bins, labels=hr_zones_labels)
             
-            zone_stats = player_df.groupby('hr_zone').agg(
+            zone_stats = player_df.groupby('hr_zone', observed=False).agg(
                 Avg_Velocity=('velocity', 'mean'), Max_Acceleration=('acceleration', 'max'),
-                Shooting_Pct=('success', lambda x: x[x != -1].mean() if len(x[x != -1]) > 0 else np.nan),
                 Avg_PlayerLoad=('player_load', 'mean')
             ).reset_index()
+            # Expected FG% with a 95% interval over Monte Carlo replications of the shots
+            shooting = expected_fg(player_df[player_df['success'] >= 0], 'hr_zone').rename(columns={
+                'fg_expected': 'Shooting_Pct', 'fg_lo': 'Shooting_Pct_Lo', 'fg_hi': 'Shooting_Pct_Hi'})
+            zone_stats = zone_stats.merge(shooting.drop(columns='shots'), on='hr_zone', how='left')
             
             st.dataframe(zone_stats.style.format({
                 'Avg_Velocity': '{:.2f}', 'Max_Acceleration': '{:.2f}',
-                'Shooting_Pct': '{:.1%}', 'Avg_PlayerLoad': '{:.2f}'
-            }), use_container_width=True)
+                'Shooting_Pct': '{:.1%}', 'Shooting_Pct_Lo': '{:.1%}', 'Shooting_Pct_Hi': '{:.1%}',
+                'Avg_PlayerLoad': '{:.2f}'
+            }, na_rep='-'), use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
     with tab2:
         with st.container():
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown("<h4>Velocity & Acceleration Profile</h4>", unsafe_allow_html=True)
-            fig_vel = go.Figure()
-            fig_vel.add_trace(go.Scatter(x=player_df['time'], y=player_df['velocity'], name='Velocity', line=dict(color=THEME_PRIMARY)))
-            fig_vel.add_trace(go.Scatter(x=player_df['time'], y=player_df['acceleration'], name='Acceleration', yaxis='y2', line=dict(color=THEME_SECONDARY, dash='dash')))
-            
-            fig_vel.update_layout(template="plotly_white", xaxis_title="Time (seconds)",
-                                  yaxis=dict(title='Velocity (m/s)'),
-                                  yaxis2=dict(title='Acceleration (m/s²)', overlaying='y', side='right'),
-                                  hovermode="x unified", legend=dict(x=0, y=1.1, orientation='h'))
-            st.plotly_chart(fig_vel, use_container_width=True)
+
+            def build_velocity():
+                fig_vel = go.Figure()
+                fig_vel.add_trace(go.Scatter(x=player_df['time'], y=player_df['velocity'], name='Velocity', line=dict(color=THEME_PRIMARY)))
+                fig_vel.add_trace(go.Scatter(x=player_df['time'], y=player_df['acceleration'], name='Acceleration', yaxis='y2', line=dict(color=THEME_SECONDARY, dash='dash')))
+
+                fig_vel.update_layout(template="plotly_white", xaxis_title="Time (seconds)",
+                                      yaxis=dict(title='Velocity (m/s)'),
+                                      yaxis2=dict(title='Acceleration (m/s²)', overlaying='y', side='right'),
+                                      hovermode="x unified", legend=dict(x=0, y=1.1, orientation='h'))
+                return fig_vel
+
+            cached_plotly_chart(player_df, 'biometrics', 'velocity', build_velocity, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
     with tab3:
         with st.container():
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown("<h4>Acceleration by Game Situation</h4>", unsafe_allow_html=True)
-            fig_acc_box = px.box(player_df, x='tactical_situation', y='acceleration', color='tactical_situation',
-                                 points="all", template="plotly_white")
-            st.plotly_chart(fig_acc_box, use_container_width=True)
+            cached_plotly_chart(
+                player_df, 'biometrics', 'acceleration_box',
+                lambda: px.box(player_df, x='tactical_situation', y='acceleration', color='tactical_situation',
+                               points="all", template="plotly_white"),
+                use_container_width=True
+            )
 
             st.markdown("---")
             st.markdown("<h4>Statistical Significance (ANOVA)</h4>", unsafe_allow_html=True)
@@ -109,11 +128,15 @@ def render(df, selected_player):
         with st.container():
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown("<h4>PlayerLoad vs. Performance Metrics</h4>", unsafe_allow_html=True)
-            fig_pl_perf = px.scatter(
-                player_df, x='player_load', y='velocity', size='acceleration',
-                color='heart_rate', trendline='ols', template="plotly_white",
-                color_continuous_scale=px.colors.sequential.OrRd,
-                hover_data=['time', 'tactical_situation']
+            # OLS trendline fit: the most expensive figure of the page
+            cached_plotly_chart(
+                player_df, 'biometrics', 'load_vs_performance',
+                lambda: px.scatter(
+                    player_df, x='player_load', y='velocity', size='acceleration',
+                    color='heart_rate', trendline='ols', template="plotly_white",
+                    color_continuous_scale=px.colors.sequential.OrRd,
+                    hover_data=['time', 'tactical_situation']
+                ),
+                use_container_width=True
             )
-            st.plotly_chart(fig_pl_perf, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
@@ -2,16 +2,32 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from sklearn.cluster import KMeans
+import plotly.graph_objects as go
+
+from feb_analytics.epochs import epoch_signal, own_epochs, peri_event_average
+from feb_analytics.event_windows import event_windows
+from feb_analytics.figure_cache import cached_plotly_chart
+from feb_analytics.lazy import lazy_import
+from feb_analytics.profiling import plotly_chart
+from feb_analytics.thresholds import expected_threshold_sweep
+
+# Loaded on first use so sklearn is only imported when this page renders
+sk_cluster = lazy_import('sklearn.cluster')
 
 # --- Color Definitions ---
 THEME_PRIMARY = "#FF6B6B"
 THEME_SECONDARY = "#4ECDC4"
 
-def render(df, time_range):
-    """Renders the Heart Rate Analysis page."""
+# Signals and lags (s) of the peri-event response chart
+RESPONSE_SIGNALS = {'Heart Rate': 'heart_rate', 'Velocity': 'velocity', 'PlayerLoad': 'player_load'}
+RESPONSE_LAGS = np.arange(-10, 10.5, 0.5)
+
+# Sweep columns shown in the threshold chart
+THRESHOLD_METRICS = {'fg_below': 'FG% Below', 'fg_above': 'FG% Above', 'difference': 'Difference'}
+
+def render(df_filtered):
+    """Renders the Heart Rate Analysis page for all players within the selected time range."""
     st.markdown("<h3>Advanced Heart Rate Performance Intelligence</h3>", unsafe_allow_html=True)
-    df_filtered = df[(df['time'] >= time_range[0]) & (df['time'] <= time_range[1])]
 
     col1, col2 = st.columns(2)
 
@@ -21,31 +37,44 @@ def render(df, time_range):
             st.markdown("<h4>Heart Rate vs. Shooting Efficiency</h4>", unsafe_allow_html=True)
             shots_df = df_filtered[df_filtered['success'] >= 0]
             if not shots_df.empty:
-                fig_hr_shot = px.scatter(
-                    shots_df, x='heart_rate', y='success', color='zone', facet_col='player',
-                    facet_col_wrap=4, trendline='ols', template="plotly_white",
-                    labels={'success': 'Shot Success (1=Made)', 'heart_rate': 'Heart Rate (bpm)'},
-                    title="Shooting Success by Heart Rate and Court Zone"
-                )
-                fig_hr_shot.update_traces(marker=dict(size=8, opacity=0.7))
-                st.plotly_chart(fig_hr_shot, use_container_width=True)
+                def build_hr_shot():
+                    fig_hr_shot = px.scatter(
+                        shots_df, x='heart_rate', y='success', color='zone', facet_col='player',
+                        facet_col_wrap=4, trendline='ols', template="plotly_white",
+                        labels={'success': 'Shot Success (1=Made)', 'heart_rate': 'Heart Rate (bpm)'},
+                        title="Shooting Success by Heart Rate and Court Zone"
+                    )
+                    fig_hr_shot.update_traces(marker=dict(size=8, opacity=0.7))
+                    return fig_hr_shot
+
+                cached_plotly_chart(shots_df, 'heart_rate', 'hr_vs_shooting', build_hr_shot, use_container_width=True)
 
                 st.markdown("<h4>Optimal HR Threshold Analysis</h4>", unsafe_allow_html=True)
-                thresholds, results = np.arange(140, 190, 5), []
-                for thresh in thresholds:
-                    below = shots_df[shots_df['heart_rate'] < thresh]['success'].mean()
-                    above = shots_df[shots_df['heart_rate'] >= thresh]['success'].mean()
-                    results.append({'Threshold': thresh, 'FG% Below': below, 'FG% Above': above, 'Difference': below - above})
-
-                results_df = pd.DataFrame(results)
-                fig_thresh = px.line(
-                    results_df.melt(id_vars='Threshold'), x='Threshold', y='value', color='variable',
-                    template="plotly_white", title="Shooting Efficiency by HR Threshold",
-                    labels={'value': 'Field Goal %', 'variable': 'Metric'}
-                )
-                st.plotly_chart(fig_thresh, use_container_width=True)
-                optimal_thresh = results_df.iloc[results_df['Difference'].idxmax()]
-                st.success(f"**Optimal Performance Threshold:** Shooting efficiency drops most significantly above **{optimal_thresh['Threshold']} bpm**.")
+                # Expected FG% at every 1 bpm threshold over Monte Carlo replications of
+                # every shot outcome, with 95% bands
+                sweep = expected_threshold_sweep(shots_df['heart_rate'], shots_df['shot_prob'], step=1)
+                results_df = sweep.rename(columns={'threshold': 'Threshold', **THRESHOLD_METRICS})[['Threshold', *THRESHOLD_METRICS.values()]]
+
+                def build_thresholds():
+                    fig_thresh = px.line(
+                        results_df.melt(id_vars='Threshold'), x='Threshold', y='value', color='variable',
+                        template="plotly_white", title="Shooting Efficiency by HR Threshold",
+                        labels={'value': 'Field Goal %', 'variable': 'Metric'}
+                    )
+                    for trace in list(fig_thresh.data):
+                        metric = next(key for key, label in THRESHOLD_METRICS.items() if label == trace.name)
+                        fig_thresh.add_trace(go.Scatter(
+                            x=np.concatenate([sweep['threshold'], sweep['threshold'][::-1]]),
+                            y=np.concatenate([sweep[f'{metric}_hi'], sweep[f'{metric}_lo'][::-1]]),
+                            fill='toself', fillcolor=trace.line.color, opacity=0.15, line=dict(width=0),
+                            hoverinfo='skip', showlegend=False, legendgroup=trace.name
+                        ))
+                    return fig_thresh
+
+                cached_plotly_chart(shots_df, 'heart_rate', 'hr_thresholds', build_thresholds, use_container_width=True)
+                if results_df['Difference'].notna().any():
+                    optimal_thresh = results_df.loc[results_df['Difference'].idxmax()]
+                    st.success(f"**Optimal Performance Threshold:** Shooting efficiency drops most significantly above **{optimal_thresh['Threshold']:.0f} bpm**.")
 
             else:
                 st.warning("No shot data available in selected time range.")
@@ -57,27 +86,55 @@ def render(df, time_range):
             st.markdown("<h4>Heart Rate Response to Game Events</h4>", unsafe_allow_html=True)
             events = df_filtered[df_filtered['action'].isin(['shot', 'foul', 'turnover', 'steal'])].copy()
             if not events.empty:
-                event_hr_data = []
-                for _, event in events.iterrows():
-                    player, event_time = event['player'], event['time']
-                    pre_hr = df_filtered[(df_filtered['player'] == player) & (df_filtered['time'].between(event_time - 5, event_time - 1))]['heart_rate'].mean()
-                    post_hr = df_filtered[(df_filtered['player'] == player) & (df_filtered['time'].between(event_time + 1, event_time + 5))]['heart_rate'].mean()
-                    if pd.notna(pre_hr) and pd.notna(post_hr):
-                        event_hr_data.append({'Player': player, 'Event': event['action'], 'HR_Change': post_hr - pre_hr, 'Pre_HR': pre_hr})
-
-                if event_hr_data:
-                    event_hr_df = pd.DataFrame(event_hr_data)
-                    fig_hr_event = px.box(
-                        event_hr_df, x='Event', y='HR_Change', color='Event',
-                        template="plotly_white", title="Heart Rate Change After Key Events",
-                        labels={'HR_Change': 'HR Change (bpm)'}
+                # Mean HR in [t-5, t-1] and [t+1, t+5] around every event, in one pass
+                windows = event_windows(df_filtered, events, {'pre': (-5, -1), 'post': (1, 5)})
+                event_hr_df = pd.DataFrame({
+                    'Player': events['player'], 'Event': events['action'],
+                    'HR_Change': windows['post_mean'] - windows['pre_mean'], 'Pre_HR': windows['pre_mean']
+                }).dropna(subset=['HR_Change'])
+
+                if not event_hr_df.empty:
+                    cached_plotly_chart(
+                        df_filtered, 'heart_rate', 'hr_change_after_events',
+                        lambda: px.box(
+                            event_hr_df, x='Event', y='HR_Change', color='Event',
+                            template="plotly_white", title="Heart Rate Change After Key Events",
+                            labels={'HR_Change': 'HR Change (bpm)'}
+                        ),
+                        use_container_width=True
                     )
-                    st.plotly_chart(fig_hr_event, use_container_width=True)
+
+                    st.markdown("<h4>Peri-Event Response</h4>", unsafe_allow_html=True)
+                    signal = st.selectbox("Signal", list(RESPONSE_SIGNALS), key='peri_event_signal')
+
+                    def build_response():
+                        # Signal of the acting player around every event, relative to its pre-event level
+                        epochs, players = epoch_signal(df_filtered, events, RESPONSE_SIGNALS[signal], RESPONSE_LAGS)
+                        response = peri_event_average(own_epochs(epochs, events, players), events['action'],
+                                                      RESPONSE_LAGS, baseline=(-5, -1))
+                        fig_response = px.line(
+                            response, x='lag', y='mean', color='label', template="plotly_white",
+                            title=f"Average {signal} Response Around Key Events",
+                            labels={'lag': 'Time From Event (s)', 'mean': f'Change in {signal}', 'label': 'Event'}
+                        )
+                        for trace in list(fig_response.data):
+                            band = response[response['label'] == trace.name]
+                            fig_response.add_trace(go.Scatter(
+                                x=np.concatenate([band['lag'], band['lag'][::-1]]),
+                                y=np.concatenate([band['mean'] + band['sem'], (band['mean'] - band['sem'])[::-1]]),
+                                fill='toself', fillcolor=trace.line.color, opacity=0.15, line=dict(width=0),
+                                hoverinfo='skip', showlegend=False, legendgroup=trace.name
+                            ))
+                        fig_response.add_vline(x=0, line_dash='dash', line_color='gray')
+                        return fig_response
+
+                    cached_plotly_chart(df_filtered, 'heart_rate', 'peri_event_response', build_response,
+                                        state=(signal,), use_container_width=True)
 
                     st.markdown("<h4>Player Recovery Profiles</h4>", unsafe_allow_html=True)
                     recovery_df = event_hr_df.groupby('Player').agg({'HR_Change': 'mean', 'Pre_HR': 'mean'}).reset_index()
                     if len(recovery_df) > 2:
-                        kmeans = KMeans(n_clusters=min(3, len(recovery_df)), random_state=42, n_init=10)
+                        kmeans = sk_cluster.KMeans(n_clusters=min(3, len(recovery_df)), random_state=42, n_init=10)
                         recovery_df['cluster'] = kmeans.fit_predict(recovery_df[['HR_Change', 'Pre_HR']]).astype(str)
                         fig_recovery_cluster = px.scatter(
                             recovery_df, x='Pre_HR', y='HR_Change', color='cluster', text='Player',
@@ -85,7 +142,7 @@ def render(df, time_range):
                             labels={'Pre_HR': 'Average Pre-Event HR', 'HR_Change': 'Average HR Change'}
                         )
                         fig_recovery_cluster.update_traces(textposition='top center')
-                        st.plotly_chart(fig_recovery_cluster, use_container_width=True)
+                        plotly_chart(fig_recovery_cluster, name='heart_rate/recovery_clusters', use_container_width=True)
                 else:
                     st.info("Not enough data to calculate HR change around events.")
             else:
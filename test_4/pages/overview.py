@@ -2,7 +2,14 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from sklearn.preprocessing import StandardScaler
+
+from feb_analytics.embeddings import get_model_result, is_pending
+from feb_analytics.figure_cache import cached_plotly_chart
+from feb_analytics.lazy import lazy_import
+from feb_analytics.profiling import plotly_chart
+
+# Loaded on first use so sklearn is only imported when the clustering panel renders
+preprocessing = lazy_import('sklearn.preprocessing')
 
 # --- Color Definitions ---
 THEME_PRIMARY = "#FF6B6B"
@@ -12,6 +19,12 @@ SPAIN_RED = "#C60B1E"
 SPAIN_BLUE = "#004D98"
 SPAIN_YELLOW = "#FFC400"
 
+@st.fragment(run_every=1.0)
+def _wait_for_model(kind, params, features, rows):
+    # Polls a background model fit and reruns the app once its result is ready
+    if not is_pending(kind, params, features, rows):
+        st.rerun()
+
 def render(df, ai_models, selected_model_name):
     """Renders the complete overview page, merging original analysis with new design."""
     st.subheader("Game Performance Summary")
@@ -51,14 +64,17 @@ def render(df, ai_models, selected_model_name):
             st.markdown("<h4>Player Efficiency Analysis</h4>", unsafe_allow_html=True)
             eff_df = df.groupby('player').agg(offensive_eff=('offensive_eff', 'mean'), defensive_eff=('defensive_eff', 'mean')).reset_index().melt(id_vars='player', var_name='efficiency_type', value_name='efficiency')
             if not eff_df.dropna().empty:
-                fig_eff = px.bar(
-                    eff_df.dropna(), x='player', y='efficiency', color='efficiency_type', barmode='group',
-                    color_discrete_map={'offensive_eff': SPAIN_RED, 'defensive_eff': SPAIN_BLUE},
-                    labels={'efficiency': 'Efficiency Score', 'efficiency_type': 'Efficiency Type', 'player': 'Player'},
-                    template="plotly_white"
-                )
-                fig_eff.update_layout(legend_title_text='')
-                st.plotly_chart(fig_eff, use_container_width=True)
+                def build_efficiency():
+                    fig_eff = px.bar(
+                        eff_df.dropna(), x='player', y='efficiency', color='efficiency_type', barmode='group',
+                        color_discrete_map={'offensive_eff': SPAIN_RED, 'defensive_eff': SPAIN_BLUE},
+                        labels={'efficiency': 'Efficiency Score', 'efficiency_type': 'Efficiency Type', 'player': 'Player'},
+                        template="plotly_white"
+                    )
+                    fig_eff.update_layout(legend_title_text='')
+                    return fig_eff
+
+                cached_plotly_chart(df, 'overview', 'player_efficiency', build_efficiency, use_container_width=True)
             else:
                 st.info("No efficiency data to display for the current selection.")
             st.markdown('</div>', unsafe_allow_html=True)
@@ -93,14 +109,17 @@ def render(df, ai_models, selected_model_name):
             st.markdown("<h4>Player Load Distribution</h4>", unsafe_allow_html=True)
             pl_df = df.groupby('player')['player_load'].sum().reset_index()
             if not pl_df.empty:
-                fig_pl = px.pie(
-                    pl_df, names='player', values='player_load', hole=0.4,
-                    color_discrete_sequence=[THEME_PRIMARY, THEME_SECONDARY, THEME_ACCENT, SPAIN_YELLOW, "#264653"],
-                    template="plotly_white"
-                )
-                fig_pl.update_layout(legend_title_text='Player', showlegend=False)
-                fig_pl.update_traces(textinfo='percent+label', textposition='inside')
-                st.plotly_chart(fig_pl, use_container_width=True)
+                def build_load_share():
+                    fig_pl = px.pie(
+                        pl_df, names='player', values='player_load', hole=0.4,
+                        color_discrete_sequence=[THEME_PRIMARY, THEME_SECONDARY, THEME_ACCENT, SPAIN_YELLOW, "#264653"],
+                        template="plotly_white"
+                    )
+                    fig_pl.update_layout(legend_title_text='Player', showlegend=False)
+                    fig_pl.update_traces(textinfo='percent+label', textposition='inside')
+                    return fig_pl
+
+                cached_plotly_chart(df, 'overview', 'load_distribution', build_load_share, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
     # --- AI Clustering Section ---
@@ -113,16 +132,22 @@ def render(df, ai_models, selected_model_name):
         }).reset_index().dropna()
 
         if len(cluster_df) > 2:
-            scaler = StandardScaler()
+            scaler = preprocessing.StandardScaler()
             # Ensure we only scale numeric columns, excluding 'player'
             numeric_cols = cluster_df.select_dtypes(include=np.number).columns
             scaled_data = scaler.fit_transform(cluster_df[numeric_cols])
             
-            model = ai_models[selected_model_name]
+            kind, params = ai_models[selected_model_name]
+            # Fit once per (model, hyperparameters, features); t-SNE runs in the
+            # background and the last embedding is shown until the new one is ready
+            rows = cluster_df['player']  # the rows of the fit, before the join below
+            result, pending = get_model_result(kind, params, scaled_data, rows)
+            if result is not None:
+                cluster_df = cluster_df.join(result, on='player', how='inner')
 
-            if selected_model_name in ["PCA", "t-SNE"]:
-                transformed = model.fit_transform(scaled_data)
-                cluster_df['dim1'], cluster_df['dim2'] = transformed[:, 0], transformed[:, 1]
+            if result is None:
+                st.info(f"Computing {selected_model_name} embedding...")
+            elif selected_model_name in ["PCA", "t-SNE"]:
                 fig_cluster = px.scatter(
                     cluster_df, x='dim1', y='dim2', text='player', color='player',
                     title=f"{selected_model_name} Player Profiling", template="plotly_white",
@@ -130,14 +155,17 @@ def render(df, ai_models, selected_model_name):
                 )
                 fig_cluster.update_traces(textposition='top center')
             else:  # KMeans or DBSCAN
-                clusters = model.fit_predict(scaled_data)
-                cluster_df['cluster'] = clusters.astype(str)
+                cluster_df['cluster'] = cluster_df['cluster'].astype(str)
                 fig_cluster = px.scatter(
                     cluster_df, x='heart_rate', y='player_load', color='cluster',
                     size='velocity', hover_name='player', title=f"{selected_model_name} Player Clustering",
                     template="plotly_white", color_discrete_sequence=px.colors.qualitative.Bold
                 )
-            st.plotly_chart(fig_cluster, use_container_width=True)
+            if result is not None:
+                plotly_chart(fig_cluster, name='overview/player_profiling', use_container_width=True)
+            if pending:
+                st.caption(f"Updating {selected_model_name} in the background...")
+                _wait_for_model(kind, params, scaled_data, rows)
         else:
             st.warning("Insufficient unique player data for AI clustering. Select 'All Players' or a larger time range.")
         st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from feb_analytics.figure_cache import cached_plotly_chart
+
 # --- Color Definitions ---
 THEME_PRIMARY = "#FF6B6B"
 THEME_SECONDARY = "#4ECDC4"
@@ -19,17 +21,19 @@ def render(df):
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown("<h4>Role-Based PlayerLoad Efficiency</h4>", unsafe_allow_html=True)
-        eff_df = df[['player', 'offensive_eff', 'defensive_eff', 'role']].melt(
-            id_vars=['player', 'role'], var_name='type', value_name='efficiency'
-        ).dropna()
-        if not eff_df.empty:
-            fig_eff = px.box(
-                eff_df, x='role', y='efficiency', color='type', points='all',
-                template="plotly_white", title="PlayerLoad Efficiency by Role",
-                labels={'efficiency': 'Efficiency Score', 'type': 'Efficiency Type', 'role': 'Role'},
-                color_discrete_map={'offensive_eff': SPAIN_RED, 'defensive_eff': SPAIN_BLUE}
-            )
-            st.plotly_chart(fig_eff, use_container_width=True)
+        if df[['offensive_eff', 'defensive_eff']].notna().any().any():
+            def build_efficiency():
+                eff_df = df[['player', 'offensive_eff', 'defensive_eff', 'role']].melt(
+                    id_vars=['player', 'role'], var_name='type', value_name='efficiency'
+                ).dropna()
+                return px.box(
+                    eff_df, x='role', y='efficiency', color='type', points='all',
+                    template="plotly_white", title="PlayerLoad Efficiency by Role",
+                    labels={'efficiency': 'Efficiency Score', 'type': 'Efficiency Type', 'role': 'Role'},
+                    color_discrete_map={'offensive_eff': SPAIN_RED, 'defensive_eff': SPAIN_BLUE}
+                )
+
+            cached_plotly_chart(df, 'player_load', 'efficiency_by_role', build_efficiency, use_container_width=True)
         else:
             st.info("No efficiency data available for this selection.")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -37,20 +41,21 @@ def render(df):
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown("<h4>PlayerLoad Accumulation Patterns</h4>", unsafe_allow_html=True)
-        pl_df = df.groupby(['player', 'role']).agg(
-            total_load=('player_load', 'sum'),
-            time_played=('time', 'nunique')
-        ).reset_index()
-        pl_df['load_per_sec'] = pl_df['total_load'] / pl_df['time_played']
+        if df[['player', 'role']].notna().all(axis=1).any():
+            def build_accumulation():
+                pl_df = df.groupby(['player', 'role']).agg(
+                    total_load=('player_load', 'sum'),
+                    time_played=('time', 'nunique')
+                ).reset_index()
+                pl_df['load_per_sec'] = pl_df['total_load'] / pl_df['time_played']
+                return px.bar(
+                    pl_df, x='player', y='load_per_sec', color='role',
+                    template="plotly_white", title="PlayerLoad per Second of Activity",
+                    hover_data=['total_load'],
+                    color_discrete_map={'Offense': THEME_PRIMARY, 'Defense': THEME_SECONDARY}
+                )
 
-        if not pl_df.empty:
-            fig_pl = px.bar(
-                pl_df, x='player', y='load_per_sec', color='role',
-                template="plotly_white", title="PlayerLoad per Second of Activity",
-                hover_data=['total_load'],
-                color_discrete_map={'Offense': THEME_PRIMARY, 'Defense': THEME_SECONDARY}
-            )
-            st.plotly_chart(fig_pl, use_container_width=True)
+            cached_plotly_chart(df, 'player_load', 'load_accumulation', build_accumulation, use_container_width=True)
         else:
             st.info("No PlayerLoad data to display.")
         st.markdown('</div>', unsafe_allow_html=True)
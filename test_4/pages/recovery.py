@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from sklearn.cluster import KMeans
+
+from feb_analytics.figure_cache import cached_plotly_chart
+from feb_analytics.lazy import lazy_import
+from feb_analytics.profiling import plotly_chart
+
+# Loaded on first use so sklearn is only imported when this page renders
+sk_cluster = lazy_import('sklearn.cluster')
 
 # --- Color Definitions ---
 THEME_PRIMARY = "#FF6B6B"
@@ -21,14 +27,17 @@ def render(df):
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown("<h4>Player Recovery Profiles</h4>", unsafe_allow_html=True)
-        fig_recovery = px.scatter(
-            recovery_df, x='time', y='heart_rate', color='recovery_phase',
-            size='exertion_index', facet_row='player', template="plotly_white",
-            title="Recovery & High Exertion Phases by Player",
-            hover_data=['tactical_situation'],
-            color_discrete_map={'High Exertion': THEME_PRIMARY, 'Recovery Phase': THEME_SECONDARY}
+        cached_plotly_chart(
+            recovery_df, 'recovery', 'recovery_profiles',
+            lambda: px.scatter(
+                recovery_df, x='time', y='heart_rate', color='recovery_phase',
+                size='exertion_index', facet_row='player', template="plotly_white",
+                title="Recovery & High Exertion Phases by Player",
+                hover_data=['tactical_situation'],
+                color_discrete_map={'High Exertion': THEME_PRIMARY, 'Recovery Phase': THEME_SECONDARY}
+            ),
+            use_container_width=True
         )
-        st.plotly_chart(fig_recovery, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
     with st.container():
@@ -41,25 +50,25 @@ def render(df):
         ).reset_index()
 
         fig_metrics = px.bar(
-            metrics_df, x='Player', y=['Recovery_Rate', 'Recovery_Events'], barmode='group',
+            metrics_df, x='player', y=['Recovery_Rate', 'Recovery_Events'], barmode='group',
             template="plotly_white", title="Recovery Metrics Comparison"
         )
-        st.plotly_chart(fig_metrics, use_container_width=True)
+        plotly_chart(fig_metrics, name='recovery/recovery_metrics', use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown("<h4>Recovery Profile Clustering (AI)</h4>", unsafe_allow_html=True)
         if len(metrics_df) > 2:
-            kmeans = KMeans(n_clusters=min(3, len(metrics_df)), random_state=42, n_init=10)
+            kmeans = sk_cluster.KMeans(n_clusters=min(3, len(metrics_df)), random_state=42, n_init=10)
             metrics_df['cluster'] = kmeans.fit_predict(metrics_df[['Recovery_Rate', 'Recovery_Events', 'Avg_Exertion']]).astype(str)
             fig_cluster = px.scatter_3d(
                 metrics_df, x='Recovery_Rate', y='Recovery_Events', z='Avg_Exertion',
-                color='cluster', text='Player', title="3D Recovery Profile Clusters",
+                color='cluster', text='player', title="3D Recovery Profile Clusters",
                 template="plotly_white"
             )
             fig_cluster.update_traces(textposition='top center')
-            st.plotly_chart(fig_cluster, use_container_width=True)
+            plotly_chart(fig_cluster, name='recovery/recovery_clusters', use_container_width=True)
         else:
             st.warning("Not enough data to perform clustering on recovery profiles.")
         st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
@@ -3,7 +3,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-def render(df, time_range):
+from feb_analytics.profiling import plotly_chart
+
+def render(df):
     """Renders the Team Performance page."""
     st.markdown("<h3>Advanced Team Performance Intelligence</h3>", unsafe_allow_html=True)
 
@@ -25,7 +27,7 @@ def render(df, time_range):
             x=metrics_df['Metric'], y=metrics_df['League Avg'],
             mode='markers', marker=dict(size=12, color='black', symbol='diamond'), name='League Avg'
         ))
-        st.plotly_chart(fig_metrics, use_container_width=True)
+        plotly_chart(fig_metrics, name='team/team_metrics', use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -48,7 +50,7 @@ def render(df, time_range):
         )
         # Invert y-axis because lower defensive rating is better
         fig_lineup.update_yaxes(autorange="reversed")
-        st.plotly_chart(fig_lineup, use_container_width=True)
+        plotly_chart(fig_lineup, name='team/lineups', use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
     with st.container():
@@ -0,0 +1,143 @@
+"""
+Headless post-game report: every dashboard page for every player, as HTML.
+
+Runs the same render() functions as the Streamlit app without a browser.
+The dataset is loaded once per game and attached from the feature store by
+every worker; per-player pages (overview, biometrics, recovery, PlayerLoad)
+and team pages (heart rate, tactics, team) are then rendered in parallel
+across a process pool and written as a static HTML bundle:
+
+    <out>/index.html            links to every report
+    <out>/team.html             team-level pages
+    <out>/players/<player>.html per-player pages
+    <out>/plotly.min.js
+
+Pages that fail to render are reported in place and listed on the index,
+and the run exits with status 1.
+
+Usage (from test_4/):
+    python report.py [--out reports] [--players A1 D1 ...] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from streamlit import config as st_config, logger as st_logger
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
+for path in (ROOT_DIR, BASE_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from feb_analytics.data_view import PlayerTimeIndex
+from feb_analytics.feature_store import load_features
+from feb_analytics.report import capture_figures, error_html, figure_html, write_page, write_plotly_js
+from pages import DASHBOARD_STEPS
+
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'integrated_dataset.csv')
+# Overview profiling model (the app's default selection)
+REPORT_MODEL = ('KMeans Clustering', ('kmeans', {'n_clusters': 3, 'random_state': 42, 'n_init': 10}))
+
+PLAYER_PAGES = ['Overview', 'Player Biometrics', 'Recovery Metrics', 'PlayerLoad Insights']
+TEAM_PAGES = ['Heart Rate Analysis', 'Tactical Insights', 'Team Performance']
+
+_view = None
+
+
+def _init_worker():
+    """Attaches the worker to the game data (memory-mapped from the feature store)."""
+    global _view
+    # Streamlit warns about every st.* call outside `streamlit run`
+    # (the config option keeps the level when Streamlit parses its config lazily)
+    st_config.set_option('logger.level', 'error')
+    st_logger.set_log_level('error')
+    _view = PlayerTimeIndex(load_features(DATA_PATH, steps=DASHBOARD_STEPS))
+
+
+def _render(page, player):
+    from pages import overview, biometrics, heart_rate, tactics, recovery, player_load, team
+
+    df = _view.select(player) if player else _view.frame
+    model_name, spec = REPORT_MODEL
+    renderers = {
+        'Overview': lambda: overview.render(df, {model_name: spec}, model_name),
+        'Player Biometrics': lambda: biometrics.render(df, player),
+        'Recovery Metrics': lambda: recovery.render(df),
+        'PlayerLoad Insights': lambda: player_load.render(df),
+        'Heart Rate Analysis': lambda: heart_rate.render(df),
+        'Tactical Insights': lambda: tactics.render(df),
+        'Team Performance': lambda: team.render(df),
+    }
+    with capture_figures() as figures:
+        renderers[page]()
+    return [figure_html(name, fig) for name, fig in figures]
+
+
+def _render_task(task):
+    """Renders one (page, player) task; failures are reported, not raised."""
+    page, player = task
+    try:
+        return task, _render(page, player), None
+    except Exception as exc:
+        return task, [], f"{type(exc).__name__}: {exc}"
+
+
+def build_report(out_dir, players=None, workers=None, log=print):
+    """
+    Renders every page and writes the HTML bundle.
+
+    Returns:
+        (results, failures): chart fragments per (page, player) task, and the
+        error message of every task that failed.
+    """
+    start = time.perf_counter()
+    # Populates the feature store once per game; workers only attach to it
+    _init_worker()
+    players = players or _view.players
+    tasks = [(page, None) for page in TEAM_PAGES] + [(page, player) for player in players for page in PLAYER_PAGES]
+
+    results, failures = {}, {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for task, fragments, error in pool.map(_render_task, tasks):
+            results[task] = fragments
+            if error:
+                failures[task] = error
+                results[task] = fragments + [error_html(error)]
+                log(f"  {task[0]} ({task[1] or 'team'}) failed: {error}")
+
+    write_plotly_js(out_dir)
+    links = [('Index', 'index.html'), ('Team', 'team.html')]
+    write_page(os.path.join(out_dir, 'team.html'), 'Team Report',
+               [(page, results[(page, None)]) for page in TEAM_PAGES], links)
+    for player in players:
+        write_page(os.path.join(out_dir, 'players', f'{player}.html'), f'Player Report: {player}',
+                   [(page, results[(page, player)]) for page in PLAYER_PAGES],
+                   [(label, f'../{href}') for label, href in links], plotly_js='../plotly.min.js')
+    failed = [error_html(f"{page} ({player or 'team'}): {error}") for (page, player), error in failures.items()]
+    write_page(os.path.join(out_dir, 'index.html'), 'Post-Game Report',
+               [('Failed pages', failed)] if failed else [],
+               links + [(player, f'players/{player}.html') for player in players])
+
+    charts = sum(len(fragments) for task, fragments in results.items() if task not in failures)
+    log(f"{len(tasks)} pages ({len(failures)} failed), {charts} charts for {len(players)} players "
+        f"in {time.perf_counter() - start:.1f} s -> {out_dir}")
+    return results, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default=os.path.join(BASE_DIR, 'reports'))
+    parser.add_argument('--players', nargs='+', help='players to report (default: all)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+    _, failures = build_report(args.out, args.players, args.workers)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
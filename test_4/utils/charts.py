@@ -50,7 +50,7 @@ def create_court_figure():
     # Right side
     fig.add_shape(type="path",
                   path=f"M {court_length - three_point_radius - basket_to_baseline} {0} L {court_length - key_height} {0} L {court_length - key_height} {(court_width-key_width)/2} M {court_length - key_height} {(court_width+key_width)/2} L {court_length - key_height} {court_width} L {court_length - three_point_radius - basket_to_baseline} {court_width}",
-                  line_color="black", width=2)
+                  line=dict(color="black", width=2))
     angles = np.linspace(np.arcsin((court_width/2)/three_point_radius), -np.arcsin((court_width/2)/three_point_radius), 100)
     three_pt_x_right = court_length - basket_to_baseline - three_point_radius * np.cos(angles)
     three_pt_y_right = court_width/2 + three_point_radius * np.sin(angles)